@@ -8,6 +8,11 @@ from typing import Optional
 
 from .server import mcp
 
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -29,13 +34,21 @@ async def main_async() -> None:
     
     logger.info(f"Starting Claude MCP Scaffold Server")
     
+    # Tasks that finish without suspending (e.g. cached CDP lookups) skip a loop iteration
+    if sys.version_info >= (3, 12):
+        asyncio.get_running_loop().set_task_factory(asyncio.eager_task_factory)
+    
     # Run the server using stdio transport
     await mcp.run_stdio_async()
 
 def main() -> None:
     """Main entry point."""
     try:
-        asyncio.run(main_async())
+        # uvloop lowers per-await overhead for the browser and monitoring tasks when available
+        if uvloop is not None:
+            uvloop.run(main_async())
+        else:
+            asyncio.run(main_async())
     except KeyboardInterrupt:
         logger.info("Server stopped by user")
         sys.exit(0)
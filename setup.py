@@ -19,6 +19,14 @@ setup(
             "mypy>=1.5.1",
             "black>=23.7.0",
         ],
+        "speedups": [
+            "numpy>=1.21.0",
+            "orjson>=3.8.0",
+            "pybase64>=1.3.0",
+            "selectolax>=0.3.17",
+            "zstandard>=0.21.0",
+            "uvloop>=0.18.0; sys_platform != 'win32'",
+        ],
     },
     python_requires=">=3.9",
     entry_points={
@@ -0,0 +1,33 @@
+"""Shared fixtures for the web_interaction tests."""
+
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+WEB_INTERACTION_DIR = Path(__file__).resolve().parent.parent / "web_interaction"
+
+
+def load_module(name):
+    """
+    Load a web_interaction module straight from its file.
+    
+    Importing through the package would run web_interaction/__init__.py, which
+    sets up browser managers and pulls in modules these tests do not need.
+    """
+    spec = importlib.util.spec_from_file_location(f"web_interaction_{name}", WEB_INTERACTION_DIR / f"{name}.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture(scope="session")
+def diagnostic_module():
+    """The web_diagnostic_toolkit module."""
+    return load_module("web_diagnostic_toolkit")
+
+
+@pytest.fixture(scope="session")
+def workflows_module():
+    """The workflows module."""
+    return load_module("workflows")
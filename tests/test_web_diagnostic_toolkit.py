@@ -0,0 +1,814 @@
+"""Tests for WebDiagnosticToolkit."""
+
+import asyncio
+import inspect
+import json
+import threading
+import time
+from collections import deque
+from pathlib import Path
+
+import pytest
+
+DAY_NS = 86400 * 1_000_000_000
+
+
+class FakeBrowserManager:
+    """Browser manager stand-in that only provides a storage directory."""
+    
+    def __init__(self, storage_dir):
+        self.storage_dir = str(storage_dir)
+        self.active_pages = {}
+        self.page_metadata = {}
+
+
+class FakeMCP:
+    """MCP server stand-in whose tool() decorator registers functions unchanged."""
+    
+    def __init__(self):
+        self.tools = {}
+    
+    def tool(self):
+        def register(function):
+            self.tools[function.__name__] = function
+            return function
+        return register
+
+
+class FakeCDPSession:
+    """CDP session reporting fixed Performance.getMetrics values."""
+    
+    def __init__(self):
+        self.detached = False
+    
+    async def send(self, method, params=None):
+        if method == "Performance.getMetrics":
+            return {"metrics": [{"name": "JSHeapUsedSize", "value": 2_000_000},
+                                {"name": "JSHeapTotalSize", "value": 4_000_000},
+                                {"name": "Nodes", "value": 321}]}
+        return {}
+    
+    async def detach(self):
+        self.detached = True
+
+
+class FakeContext:
+    """Browser context that hands out fake CDP sessions (None when CDP is unsupported)."""
+    
+    def __init__(self, cdp_supported=True):
+        self.cdp_supported = cdp_supported
+        self.cdp_sessions = []
+    
+    async def new_cdp_session(self, page):
+        if not self.cdp_supported:
+            raise RuntimeError("CDP session is only available in Chromium")
+        cdp = FakeCDPSession()
+        self.cdp_sessions.append(cdp)
+        return cdp
+
+
+class FakeFrame:
+    """Frame with a URL."""
+    
+    def __init__(self, url):
+        self.url = url
+
+
+class FakePage:
+    """Page with event listeners whose evaluate calls answer like the installed diagnostic scripts."""
+    
+    def __init__(self, url="https://example.com/", cdp_supported=True):
+        self.url = url
+        self.main_frame = FakeFrame(url)
+        self.context = FakeContext(cdp_supported)
+        self.listeners = {}
+        self.evaluate_args = []
+        self.metrics_taken = 0
+    
+    def on(self, event, handler):
+        self.listeners.setdefault(event, []).append(handler)
+    
+    def once(self, event, handler):
+        def once_handler(*args):
+            self.remove_listener(event, once_handler)
+            handler(*args)
+        self.on(event, once_handler)
+    
+    def remove_listener(self, event, handler):
+        self.listeners[event].remove(handler)
+    
+    def emit(self, event, *args):
+        for handler in list(self.listeners.get(event, ())):
+            handler(*args)
+    
+    def navigate(self, url):
+        self.url = self.main_frame.url = url
+        self.emit("framenavigated", self.main_frame)
+    
+    async def add_init_script(self, script):
+        pass
+    
+    async def evaluate(self, script, arg=None):
+        self.evaluate_args.append(arg)
+        if "__diag_perf" in script:
+            metrics = {"timing": {"loadEventEnd": 200}, "layout": {"elementCount": 42}}
+            if not arg:
+                metrics["memory"] = {"usedJSHeapSize": 1_000_000, "totalJSHeapSize": 3_000_000}
+            return metrics
+        if "__collectMetrics" in script:
+            # Load time grows with every sample so window statistics differ from all-time ones
+            self.metrics_taken += 1
+            return {"memory": {"usedJSHeapSize": 1_000_000},
+                    "timing": {"loadTime": 100 + self.metrics_taken, "domContentLoaded": 80},
+                    "resources": {"count": 7}, "layout": {"elementCount": 42}}
+        return None
+
+
+@pytest.fixture
+def make_toolkit(diagnostic_module, tmp_path):
+    """Factory for toolkits storing their data under tmp_path."""
+    toolkits = []
+    
+    def make(**kwargs):
+        toolkit = diagnostic_module.WebDiagnosticToolkit(FakeBrowserManager(tmp_path), **kwargs)
+        toolkits.append(toolkit)
+        return toolkit
+    
+    yield make
+    for toolkit in toolkits:
+        asyncio.run(toolkit.close())
+
+
+def create_session_at(toolkit, diagnostic_module, monkeypatch, created_at_ns, name=None):
+    """Create a diagnostic session as if it had been created at created_at_ns."""
+    with monkeypatch.context() as patch:
+        patch.setattr(diagnostic_module.time, "time_ns", lambda: created_at_ns)
+        return asyncio.run(toolkit.create_diagnostic_session(name=name))
+
+
+NETWORK_REQUESTS = [
+    {"url": "https://example.com/static/app.js", "method": "GET", "headers": {"accept": "*/*"}},
+    {"url": "https://example.com/static/app.js", "method": "GET", "headers": {"accept": "*/*"}},
+    {"url": "https://example.com/api/items", "method": "POST", "body": {"$": 3}},
+    {"url": "https://example.com/api/items", "method": "POST", "body": {"$$": {"$": "https://example.com/api/items"}}}
+]
+
+# Well over _STREAM_MIN_SIZE once encoded
+LARGE_NETWORK_REQUESTS = [
+    {"url": f"https://example.com/static/chunk-{i % 50}.js", "method": "GET", "status": 200,
+     "headers": {"accept": "*/*", "user-agent": "Mozilla/5.0 (X11; Linux x86_64) " + "x" * 400}}
+    for i in range(5000)
+]
+
+PERFORMANCE_METRICS = {
+    "memory": {"usedJSHeapSize": 1_500_000},
+    "timing": {"loadTime": 120, "domContentLoaded": 80},
+    "resources": {"count": 7, "byType": {"script": 3}},
+    "layout": {"elementCount": 42}
+}
+
+
+class TestArtifactRoundTrip:
+    """Artifacts written by _persist_artifact load back unchanged."""
+    
+    @pytest.mark.parametrize("artifact_type, payload", [
+        ("network_requests", NETWORK_REQUESTS),
+        ("performance_metrics", PERFORMANCE_METRICS)
+    ])
+    @pytest.mark.parametrize("compress, zstd_available, suffix", [
+        (False, False, ".json"),
+        (True, False, ".json.gz"),
+        (True, True, ".json.zst")
+    ])
+    def test_round_trip(self, diagnostic_module, make_toolkit, tmp_path, monkeypatch,
+                        artifact_type, payload, compress, zstd_available, suffix):
+        if zstd_available:
+            if diagnostic_module.zstandard is None:
+                pytest.skip("zstandard is not installed")
+        else:
+            monkeypatch.setattr(diagnostic_module, "zstandard", None)
+        
+        toolkit = make_toolkit(compress_artifacts=compress)
+        metadata = asyncio.run(
+            toolkit._persist_artifact(artifact_type, payload, "page1", "session_1", str(tmp_path), 1000)
+        )
+        
+        assert metadata["path"].endswith(suffix)
+        assert toolkit._load_artifact_file(metadata["path"]) == payload
+
+
+class TestArtifactStreaming:
+    """Only large network and DOM payloads are streamed to disk."""
+    
+    def test_large_payload_streamed(self, make_toolkit, tmp_path):
+        toolkit = make_toolkit(compress_artifacts=False, human_readable=True)
+        metadata = asyncio.run(toolkit._persist_artifact(
+            "network_requests", LARGE_NETWORK_REQUESTS, "page1", "session_1", str(tmp_path), 1000
+        ))
+        
+        # Streamed payloads are written compact, whatever the output settings
+        raw = Path(metadata["path"]).read_bytes()
+        assert raw.startswith(b'{"s":')
+        assert b"\n" not in raw
+        assert toolkit._load_artifact_file(metadata["path"]) == LARGE_NETWORK_REQUESTS
+    
+    def test_small_payload_encoded_at_once(self, make_toolkit, tmp_path):
+        toolkit = make_toolkit(compress_artifacts=False, human_readable=True)
+        metadata = asyncio.run(toolkit._persist_artifact(
+            "network_requests", NETWORK_REQUESTS, "page1", "session_1", str(tmp_path), 1000
+        ))
+        
+        raw = Path(metadata["path"]).read_bytes()
+        assert raw.startswith(b"[")
+        assert b"\n" in raw
+        assert json.loads(raw) == NETWORK_REQUESTS
+    
+    @pytest.mark.parametrize("payload", [
+        NETWORK_REQUESTS,
+        LARGE_NETWORK_REQUESTS,
+        {"root": {"tagName": "HTML", "children": [{"tagName": "DIV", "className": "x" * 200}] * 40}}
+    ])
+    def test_size_estimate(self, diagnostic_module, payload):
+        size = len(json.dumps(payload, separators=(",", ":")))
+        
+        assert diagnostic_module._exceeds_json_size(payload, size // 2)
+        assert not diagnostic_module._exceeds_json_size(payload, size * 2)
+
+
+class TestStringInterning:
+    """_intern_strings and _uninterned are inverses, including for payloads that look interned."""
+    
+    @pytest.mark.parametrize("payload", [
+        NETWORK_REQUESTS,
+        {"$": 0},
+        {"$": "https://example.com/long"},
+        {"$$": {"a": 1}},
+        {"$$": {"$": 1}},
+        [{"$": 1}, {"$": 1}, "repeated-value", "repeated-value"],
+        {"$": 1, "other": "value"},
+        "a plain string",
+        []
+    ])
+    def test_round_trip(self, diagnostic_module, payload):
+        document = diagnostic_module._intern_strings(payload)
+        assert diagnostic_module._uninterned(document) == payload
+    
+    def test_repeated_strings_are_interned(self, diagnostic_module):
+        document = diagnostic_module._intern_strings(["https://example.com/a", "https://example.com/a", "short", "short"])
+        
+        assert document["s"] == ["https://example.com/a"]
+        assert document["d"] == [{"$": 0}, {"$": 0}, "short", "short"]
+    
+    def test_string_table_in_first_seen_order(self, diagnostic_module):
+        table, refs = diagnostic_module._string_table(
+            {"b": ["second-string", "first-string"], "a": "first-string", "c": "second-string", "d": "only-once"}
+        )
+        
+        assert table == ["second-string", "first-string"]
+        assert refs == {"second-string": 0, "first-string": 1}
+
+
+class TestPerformanceMetrics:
+    """Collected performance metrics take heap sizes from CDP when the browser supports it."""
+    
+    def test_heap_sizes_from_cdp(self, make_toolkit):
+        toolkit = make_toolkit()
+        page = FakePage()
+        
+        metrics = asyncio.run(toolkit._fetch_performance_metrics(page, "1", None, 1000, "now"))
+        
+        # The in-page script is told to skip performance.memory
+        assert page.evaluate_args[-1] is True
+        assert metrics["memory"] == {"usedJSHeapSize": 2_000_000, "totalJSHeapSize": 4_000_000}
+        assert metrics["layout"]["elementCount"] == 42
+        assert metrics["cdp"]["Nodes"] == 321
+    
+    def test_heap_sizes_in_page_without_cdp(self, make_toolkit):
+        toolkit = make_toolkit()
+        page = FakePage(cdp_supported=False)
+        
+        metrics = asyncio.run(toolkit._fetch_performance_metrics(page, "1", None, 1000, "now"))
+        
+        assert page.evaluate_args[-1] is False
+        assert metrics["memory"]["usedJSHeapSize"] == 1_000_000
+        assert "cdp" not in metrics
+    
+    def test_cdp_session_dropped_when_page_closes(self, make_toolkit):
+        toolkit = make_toolkit()
+        page = FakePage()
+        asyncio.run(toolkit._fetch_performance_metrics(page, "1", None, 1000, "now"))
+        asyncio.run(toolkit._fetch_performance_metrics(page, "1", None, 2000, "now"))
+        
+        assert len(page.context.cdp_sessions) == 1
+        page.emit("close", page)
+        
+        assert "1" not in toolkit._cdp_sessions
+        assert not page.listeners["close"]
+    
+    def test_close_detaches_cdp_sessions(self, make_toolkit):
+        toolkit = make_toolkit()
+        page = FakePage()
+        asyncio.run(toolkit._fetch_performance_metrics(page, "1", None, 1000, "now"))
+        
+        asyncio.run(toolkit.close())
+        
+        assert page.context.cdp_sessions[0].detached
+        assert toolkit._cdp_sessions == {}
+
+
+async def run_monitoring(toolkit, page_id, sample_count):
+    """Monitor a page with no sampling delay until it has sample_count samples, then stop sampling."""
+    await toolkit.start_performance_monitoring(page_id, 0)
+    while toolkit._samples_version.get(page_id, 0) < sample_count:
+        await asyncio.sleep(0)
+    toolkit.metrics_tracking = False
+    await asyncio.sleep(0.01)
+
+
+class TestPerformanceMonitoring:
+    """Reports describe the in-memory sample window and cached statistics follow cleanup."""
+    
+    def test_page_report_covers_window(self, make_toolkit, diagnostic_module):
+        toolkit = make_toolkit()
+        toolkit.browser_manager.active_pages["1"] = FakePage()
+        
+        async def scenario():
+            await run_monitoring(toolkit, "1", diagnostic_module.MAX_PERFORMANCE_SAMPLES + 30)
+            window = list(toolkit.performance_samples["1"])
+            return window, await toolkit.get_performance_report("1")
+        window, report = asyncio.run(scenario())
+        
+        assert report["sample_count"] == len(window) == diagnostic_module.MAX_PERFORMANCE_SAMPLES
+        expected = toolkit._calculate_performance_stats(window)
+        assert report["stats"].keys() == expected.keys()
+        for name, values in expected.items():
+            assert report["stats"][name] == pytest.approx(values)
+        assert report["stats"]["load_time_ms"]["min"] > 130
+    
+    def test_session_report_covers_window(self, make_toolkit, diagnostic_module):
+        toolkit = make_toolkit()
+        toolkit.browser_manager.active_pages["1"] = FakePage()
+        
+        async def scenario():
+            session_id = await toolkit.create_diagnostic_session()
+            await run_monitoring(toolkit, "1", diagnostic_module.MAX_SESSION_PERFORMANCE_SAMPLES + 10)
+            ring = toolkit.diagnostic_sessions[session_id]["performance_samples"]["1"]
+            return list(ring), await toolkit.get_performance_report(session_id=session_id)
+        window, report = asyncio.run(scenario())
+        
+        assert report["sample_count"] == len(window) == diagnostic_module.MAX_SESSION_PERFORMANCE_SAMPLES
+        assert report["stats"]["load_time_ms"] == pytest.approx(
+            toolkit._calculate_performance_stats(window)["load_time_ms"]
+        )
+    
+    def test_stop_drops_cached_stats(self, make_toolkit):
+        toolkit = make_toolkit()
+        toolkit.browser_manager.active_pages["1"] = FakePage()
+        
+        async def scenario():
+            session_id = await toolkit.create_diagnostic_session()
+            await run_monitoring(toolkit, "1", 3)
+            await toolkit.get_performance_report(session_id=session_id)
+            assert toolkit._stats_cache and toolkit._samples_version
+            await toolkit.stop_performance_monitoring("1")
+        asyncio.run(scenario())
+        
+        assert "1" not in toolkit._samples_version
+        assert toolkit._stats_cache == {}
+    
+    def test_cleanup_and_page_close_drop_cached_stats(self, make_toolkit):
+        toolkit = make_toolkit()
+        page = toolkit.browser_manager.active_pages["1"] = FakePage()
+        
+        async def scenario():
+            session_id = await toolkit.create_diagnostic_session()
+            await run_monitoring(toolkit, "1", 3)
+            await toolkit.get_performance_report(session_id=session_id)
+            await toolkit.clean_up_sessions(session_ids=[session_id])
+        asyncio.run(scenario())
+        
+        assert toolkit._stats_cache == {}
+        page.emit("close", page)
+        assert "1" not in toolkit._samples_version
+
+
+class TestPageUrlTracking:
+    """Only monitored pages get a navigation listener, removed when monitoring stops or the page closes."""
+    
+    def test_monitored_page_url_follows_navigation(self, make_toolkit):
+        toolkit = make_toolkit()
+        page = toolkit.browser_manager.active_pages["1"] = FakePage()
+        
+        async def scenario():
+            await toolkit.start_performance_monitoring("1", 0)
+            while not toolkit._samples_version.get("1"):
+                await asyncio.sleep(0)
+            page.navigate("https://example.com/cart")
+            await run_monitoring(toolkit, "1", toolkit._samples_version["1"] + 1)
+        asyncio.run(scenario())
+        
+        assert len(page.listeners["framenavigated"]) == 1
+        assert toolkit.performance_samples["1"][-1]["url"] == "https://example.com/cart"
+    
+    def test_unmonitored_page_not_tracked(self, make_toolkit):
+        toolkit = make_toolkit()
+        monitored = toolkit.browser_manager.active_pages["1"] = FakePage()
+        other = toolkit.browser_manager.active_pages["2"] = FakePage("https://example.com/other")
+        
+        async def scenario():
+            session_id = await toolkit.create_diagnostic_session()
+            await run_monitoring(toolkit, "1", 2)
+            return toolkit.diagnostic_sessions[session_id]["performance_samples"]["2"]
+        other_samples = asyncio.run(scenario())
+        
+        assert monitored.listeners["framenavigated"]
+        assert "framenavigated" not in other.listeners
+        assert "2" not in toolkit._url_listeners
+        assert list(other_samples)[-1]["url"] == "https://example.com/other"
+    
+    def test_stop_removes_listener(self, make_toolkit):
+        toolkit = make_toolkit()
+        page = toolkit.browser_manager.active_pages["1"] = FakePage()
+        
+        async def scenario():
+            await run_monitoring(toolkit, "1", 1)
+            await toolkit.stop_performance_monitoring("1")
+        asyncio.run(scenario())
+        
+        assert page.listeners["framenavigated"] == []
+        assert toolkit._url_listeners == {} and toolkit._page_urls == {}
+    
+    def test_page_close_removes_listener(self, make_toolkit):
+        toolkit = make_toolkit()
+        page = toolkit.browser_manager.active_pages["1"] = FakePage()
+        asyncio.run(run_monitoring(toolkit, "1", 1))
+        
+        page.emit("close", page)
+        
+        assert page.listeners["framenavigated"] == []
+        assert "1" not in toolkit._url_listeners
+
+
+def reference_performance_stats(samples):
+    """Statistics as computed by the original multi-pass implementation."""
+    fields = [
+        ('memory_used_mb', 'memory', 'usedJSHeapSize', 1024 * 1024),
+        ('load_time_ms', 'timing', 'loadTime', 1),
+        ('dom_ready_time_ms', 'timing', 'domContentLoaded', 1),
+        ('element_count', 'layout', 'elementCount', 1),
+        ('resource_count', 'resources', 'count', 1)
+    ]
+    stats = {}
+    for name, section, field, divisor in fields:
+        values = [s.get(section, {}).get(field, 0) for s in samples if section in s]
+        values = [v for v in values if v > 0]
+        if values:
+            stats[name] = {
+                'min': min(values) / divisor,
+                'max': max(values) / divisor,
+                'avg': sum(values) / len(values) / divisor
+            }
+    return stats
+
+
+class TestPerformanceStats:
+    """Single-pass statistics match the original min/max/avg output."""
+    
+    SAMPLES = [
+        {"memory": {"usedJSHeapSize": 1_500_000 + i * 7919}, "timing": {"loadTime": 100 + i % 13, "domContentLoaded": 60 + i % 5},
+         "layout": {"elementCount": 400 + i % 3}, "resources": {"count": 10 + i % 4}}
+        for i in range(200)
+    ] + [
+        # Sections missing or reported as zero are left out of the statistics
+        {"timing": {"loadTime": 0, "domContentLoaded": 75}},
+        {"memory": {}, "layout": {"elementCount": 0}},
+        {}
+    ]
+    
+    def test_matches_reference(self, make_toolkit):
+        stats = make_toolkit()._calculate_performance_stats(self.SAMPLES)
+        expected = reference_performance_stats(self.SAMPLES)
+        
+        assert stats.keys() == expected.keys()
+        for name, values in expected.items():
+            assert stats[name] == pytest.approx(values)
+    
+    def test_incremental_matches_batch(self, diagnostic_module, make_toolkit):
+        accumulators = {name: diagnostic_module._new_stat_accumulator()
+                        for name, _, _, _ in diagnostic_module._PERF_STAT_FIELDS}
+        for sample in self.SAMPLES:
+            diagnostic_module._accumulate_sample(accumulators, sample)
+        
+        assert diagnostic_module._project_stats(accumulators) == make_toolkit()._calculate_performance_stats(self.SAMPLES)
+    
+    def test_eviction_tracks_window(self, diagnostic_module, make_toolkit):
+        window = deque(maxlen=20)
+        accumulators = {name: diagnostic_module._new_stat_accumulator()
+                        for name, _, _, _ in diagnostic_module._PERF_STAT_FIELDS}
+        for sample in self.SAMPLES:
+            evicted = window[0] if len(window) == window.maxlen else None
+            window.append(sample)
+            diagnostic_module._accumulate_sample(accumulators, sample)
+            if evicted is not None:
+                diagnostic_module._evict_sample(accumulators, evicted, window)
+        
+        stats = diagnostic_module._project_stats(accumulators)
+        expected = make_toolkit()._calculate_performance_stats(list(window))
+        assert stats.keys() == expected.keys()
+        for name, values in expected.items():
+            assert stats[name] == pytest.approx(values)
+    
+    def test_missing_metrics(self, make_toolkit):
+        toolkit = make_toolkit()
+        
+        assert toolkit._calculate_performance_stats([]) == {}
+        assert toolkit._calculate_performance_stats([{"timing": {"loadTime": 50}}]) == {
+            "load_time_ms": {"min": 50, "max": 50, "avg": 50}
+        }
+
+
+class TestPerfRing:
+    """Session sample windows, with numpy-reduced statistics when numpy is installed."""
+    
+    def fill(self, diagnostic_module, samples, capacity=20):
+        ring = diagnostic_module.PerfRing(capacity)
+        for sample in samples:
+            ring.append(sample)
+        return ring
+    
+    def test_keeps_most_recent_samples(self, diagnostic_module):
+        samples = TestPerformanceStats.SAMPLES[:50]
+        ring = self.fill(diagnostic_module, samples)
+        
+        assert len(ring) == 20
+        assert list(ring) == samples[-20:]
+    
+    def test_numpy_stats_match_reference(self, diagnostic_module):
+        pytest.importorskip("numpy")
+        samples = TestPerformanceStats.SAMPLES
+        rings = [self.fill(diagnostic_module, samples[:120]), self.fill(diagnostic_module, samples[120:])]
+        
+        stats = diagnostic_module._ring_stats(rings)
+        expected = reference_performance_stats(samples[100:120] + samples[-20:])
+        
+        assert stats.keys() == expected.keys()
+        for name, values in expected.items():
+            assert stats[name] == pytest.approx(values)
+    
+    def test_numpy_stats_of_partial_ring(self, diagnostic_module):
+        pytest.importorskip("numpy")
+        ring = self.fill(diagnostic_module, [{"timing": {"loadTime": 50}}, {"timing": {"loadTime": 70}}])
+        
+        assert diagnostic_module._ring_stats([ring]) == {"load_time_ms": {"min": 50, "max": 70, "avg": 60}}
+        assert diagnostic_module._ring_stats([]) == {}
+    
+    def test_session_stats_without_numpy(self, diagnostic_module, make_toolkit, monkeypatch):
+        monkeypatch.setattr(diagnostic_module, "np", None)
+        toolkit = make_toolkit()
+        session_id = asyncio.run(toolkit.create_diagnostic_session())
+        samples = TestPerformanceStats.SAMPLES[:30]
+        ring = self.fill(diagnostic_module, samples)
+        toolkit.diagnostic_sessions[session_id]["performance_samples"] = {"1": ring}
+        
+        stats = toolkit._session_performance_stats(session_id)
+        
+        assert ring.arrays is None
+        assert stats == toolkit._calculate_performance_stats(samples[-20:])
+
+
+class TestHtmlReport:
+    """HTML reports are framed by the static prefix and suffix, compressed or not."""
+    
+    def create_report(self, toolkit, **kwargs):
+        async def scenario():
+            session_id = await toolkit.create_diagnostic_session("Checkout")
+            return await toolkit.create_diagnostic_report(session_id=session_id, **kwargs)
+        return asyncio.run(scenario())
+    
+    def test_plain_report(self, diagnostic_module, make_toolkit):
+        toolkit = make_toolkit()
+        
+        html = Path(self.create_report(toolkit)["html_report_path"]).read_bytes()
+        
+        assert html.startswith(diagnostic_module._REPORT_PREFIX_BYTES)
+        assert html.endswith(diagnostic_module._REPORT_SUFFIX_BYTES)
+        assert b"Checkout" in html
+        assert not list(toolkit.diagnostic_dir.glob("_report_*.html"))
+    
+    def test_compressed_report(self, diagnostic_module, make_toolkit):
+        toolkit = make_toolkit()
+        
+        html_path = self.create_report(toolkit, compress_html=True)["html_report_path"]
+        with diagnostic_module.WebDiagnosticToolkit._open_artifact(html_path, 'rb') as f:
+            html = f.read()
+        
+        assert html_path.endswith((".zst", ".gz"))
+        assert html.startswith(diagnostic_module._REPORT_PREFIX_BYTES)
+        assert html.endswith(diagnostic_module._REPORT_SUFFIX_BYTES)
+
+
+class TestSessionMetadata:
+    """Session metadata is written off the event loop and flushed when the toolkit closes."""
+    
+    def read_metadata(self, toolkit, session_id):
+        return json.loads((toolkit.diagnostic_dir / session_id / "metadata.json").read_bytes())
+    
+    def test_close_flushes_pending_metadata(self, make_toolkit):
+        toolkit = make_toolkit()
+        
+        async def scenario():
+            session_id = await toolkit.create_diagnostic_session("Checkout")
+            toolkit.diagnostic_sessions[session_id]["summary"] = {"errors": 3}
+            toolkit._mark_session_dirty(session_id)
+            await toolkit.close()
+            return session_id
+        session_id = asyncio.run(scenario())
+        
+        assert self.read_metadata(toolkit, session_id)["summary"] == {"errors": 3}
+        assert toolkit._metadata_flush_handle is None
+    
+    def test_close_on_another_loop_flushes_pending_metadata(self, make_toolkit):
+        # At exit the toolkit is closed with asyncio.run, after the serving loop is gone
+        toolkit = make_toolkit()
+        
+        async def scenario():
+            session_id = await toolkit.create_diagnostic_session("Checkout")
+            toolkit.diagnostic_sessions[session_id]["summary"] = {"errors": 3}
+            toolkit._mark_session_dirty(session_id)
+            return session_id
+        session_id = asyncio.run(scenario())
+        asyncio.run(toolkit.close())
+        
+        assert self.read_metadata(toolkit, session_id)["summary"] == {"errors": 3}
+    
+    def test_delayed_flush_writes_in_worker_thread(self, diagnostic_module, make_toolkit, monkeypatch):
+        monkeypatch.setattr(diagnostic_module, "METADATA_FLUSH_DELAY_SECONDS", 0)
+        toolkit = make_toolkit()
+        writer_threads = []
+        write_session_metadata = toolkit._write_session_metadata
+        
+        def record_thread(records):
+            writer_threads.append(threading.current_thread())
+            write_session_metadata(records)
+        monkeypatch.setattr(toolkit, "_write_session_metadata", record_thread)
+        
+        async def scenario():
+            session_id = await toolkit.create_diagnostic_session("Checkout")
+            toolkit.diagnostic_sessions[session_id]["summary"] = {"errors": 3}
+            toolkit._mark_session_dirty(session_id)
+            await asyncio.sleep(0.01)
+            await toolkit._wait_for_metadata_writes()
+            return session_id
+        session_id = asyncio.run(scenario())
+        
+        assert self.read_metadata(toolkit, session_id)["summary"] == {"errors": 3}
+        assert len(writer_threads) == 2
+        assert threading.main_thread() not in writer_threads
+        assert not toolkit._dirty_sessions
+
+
+class TestSessionIndex:
+    """Session listing and cleanup go through the SQLite index."""
+    
+    def test_sessions_listed_newest_first(self, diagnostic_module, make_toolkit, monkeypatch):
+        toolkit = make_toolkit()
+        now = time.time_ns()
+        older = create_session_at(toolkit, diagnostic_module, monkeypatch, now - 2 * DAY_NS, "older")
+        newer = create_session_at(toolkit, diagnostic_module, monkeypatch, now - DAY_NS, "newer")
+        
+        result = asyncio.run(toolkit.get_all_sessions())
+        
+        assert [s["id"] for s in result["sessions"]] == [newer, older]
+        assert result["active_session_id"] == newer
+        assert [s["is_active"] for s in result["sessions"]] == [True, False]
+    
+    def test_sessions_from_earlier_runs_are_listed(self, diagnostic_module, make_toolkit, monkeypatch):
+        session_id = create_session_at(make_toolkit(), diagnostic_module, monkeypatch, time.time_ns(), "earlier run")
+        
+        result = asyncio.run(make_toolkit().get_all_sessions())
+        
+        assert result["count"] == 1
+        assert result["sessions"][0]["id"] == session_id
+        assert result["sessions"][0]["name"] == "earlier run"
+        assert result["active_session_id"] is None
+    
+    def test_clean_up_older_than(self, diagnostic_module, make_toolkit, monkeypatch):
+        toolkit = make_toolkit()
+        now = time.time_ns()
+        old = create_session_at(toolkit, diagnostic_module, monkeypatch, now - 10 * DAY_NS)
+        recent = create_session_at(toolkit, diagnostic_module, monkeypatch, now - DAY_NS)
+        
+        result = asyncio.run(toolkit.clean_up_sessions(older_than_days=7))
+        
+        assert result["cleaned_count"] == 1
+        assert old not in toolkit.diagnostic_sessions
+        assert not (toolkit.diagnostic_dir / old).exists()
+        assert [s["id"] for s in asyncio.run(toolkit.get_all_sessions())["sessions"]] == [recent]
+    
+    def test_clean_up_older_than_keeps_active_session(self, diagnostic_module, make_toolkit, monkeypatch):
+        toolkit = make_toolkit()
+        active = create_session_at(toolkit, diagnostic_module, monkeypatch, time.time_ns() - 10 * DAY_NS)
+        
+        result = asyncio.run(toolkit.clean_up_sessions(older_than_days=7))
+        
+        assert result["cleaned_count"] == 0
+        assert toolkit.active_session_id == active
+    
+    def test_clean_up_by_id(self, diagnostic_module, make_toolkit, monkeypatch):
+        toolkit = make_toolkit()
+        now = time.time_ns()
+        first = create_session_at(toolkit, diagnostic_module, monkeypatch, now - DAY_NS)
+        second = create_session_at(toolkit, diagnostic_module, monkeypatch, now)
+        toolkit._dirty_sessions.add(second)
+        
+        result = asyncio.run(toolkit.clean_up_sessions(session_ids=[second, "session_unknown"]))
+        
+        assert result["cleaned_count"] == 1
+        assert toolkit.active_session_id is None
+        assert second not in toolkit._dirty_sessions
+        assert [s["id"] for s in asyncio.run(toolkit.get_all_sessions())["sessions"]] == [first]
+    
+    def test_clean_up_session_only_in_index(self, diagnostic_module, make_toolkit, monkeypatch):
+        session_id = create_session_at(make_toolkit(), diagnostic_module, monkeypatch, time.time_ns())
+        toolkit = make_toolkit()
+        
+        result = asyncio.run(toolkit.clean_up_sessions(session_ids=[session_id]))
+        
+        assert result["cleaned_count"] == 1
+        assert not (toolkit.diagnostic_dir / session_id).exists()
+        assert asyncio.run(toolkit.get_all_sessions())["count"] == 0
+
+
+@pytest.fixture
+def diagnostic_tools(diagnostic_module, tmp_path, monkeypatch):
+    """Diagnostic tools registered with a FakeMCP, without the atexit cleanup hook."""
+    monkeypatch.setattr(diagnostic_module.atexit, "register", lambda function: function)
+    mcp = FakeMCP()
+    registered = diagnostic_module.register_web_diagnostic_tools(mcp, FakeBrowserManager(tmp_path))
+    yield mcp.tools, registered["diagnostic_toolkit"]
+    asyncio.run(registered["diagnostic_toolkit"].close())
+
+
+class TestDiagnosticTools:
+    def test_tools_keep_their_signatures(self, diagnostic_tools):
+        tools, _ = diagnostic_tools
+        
+        assert set(tools) == {
+            "create_diagnostic_session", "collect_web_diagnostics", "start_performance_monitoring",
+            "stop_performance_monitoring", "get_performance_report", "create_web_diagnostic_report",
+            "list_diagnostic_sessions"
+        }
+        assert list(inspect.signature(tools["start_performance_monitoring"]).parameters) == [
+            "page_id", "interval_seconds"
+        ]
+        assert tools["create_diagnostic_session"].__doc__.strip().startswith("Create a new diagnostic session")
+    
+    def test_success_response(self, diagnostic_tools):
+        tools, _ = diagnostic_tools
+        
+        response = asyncio.run(tools["create_diagnostic_session"](name="Checkout"))
+        
+        assert response["success"] is True
+        assert response["name"] == "Checkout"
+        assert response["content"] == [
+            {"type": "text", "text": f"Diagnostic session created: {response['session_id']}"}
+        ]
+        listing = asyncio.run(tools["list_diagnostic_sessions"]())
+        assert listing["active_session_id"] == response["session_id"]
+        assert listing["content"][0]["text"] == "Found 1 diagnostic sessions"
+    
+    def test_failure_response(self, diagnostic_tools):
+        tools, _ = diagnostic_tools
+        
+        response = asyncio.run(tools["start_performance_monitoring"]("missing"))
+        
+        assert response["success"] is False
+        assert response["error"] == "Page not found or monitoring already active"
+        assert response["content"][0]["text"] == "Failed to start performance monitoring for page missing"
+    
+    def test_responses_do_not_share_template_state(self, diagnostic_tools, diagnostic_module):
+        tools, _ = diagnostic_tools
+        
+        first = asyncio.run(tools["list_diagnostic_sessions"]())
+        first["content"][0]["text"] = "changed"
+        first["extra"] = True
+        second = asyncio.run(tools["list_diagnostic_sessions"]())
+        
+        assert second["content"][0]["text"] == "Found 0 diagnostic sessions"
+        assert "extra" not in second
+        assert dict(diagnostic_module._OK_TEMPLATE) == {"content": None, "success": True}
+    
+    def test_exception_response(self, diagnostic_tools, monkeypatch):
+        tools, toolkit = diagnostic_tools
+        
+        async def fail(page_id, session_id):
+            raise RuntimeError("boom")
+        monkeypatch.setattr(toolkit, "get_performance_report", fail)
+        
+        response = asyncio.run(tools["get_performance_report"]())
+        
+        assert response == {
+            "content": [{"type": "text", "text": "Error generating performance report: boom"}],
+            "success": False,
+            "error": "boom"
+        }
@@ -0,0 +1,372 @@
+"""Tests for the web workflow tool."""
+
+import asyncio
+
+import pytest
+
+
+class FakeLocator:
+    """Locator over a FakePage, recording the actions performed through it."""
+    
+    def __init__(self, page, selector):
+        self.page = page
+        self.selector = selector
+    
+    @property
+    def first(self):
+        return self
+    
+    async def count(self):
+        return 1 if self.page.matches(self.selector) else 0
+    
+    async def wait_for(self, state="visible", timeout=None):
+        self.page.waits.append((self.selector, state, timeout))
+        if not self.page.render(self.selector, timeout / 1000):
+            raise TimeoutError(f"Timeout {timeout}ms exceeded waiting for {self.selector}")
+    
+    async def click(self, **kwargs):
+        self.page.actions.append(("click", self.selector))
+    
+    async def fill(self, value, **kwargs):
+        self.page.actions.append(("fill", self.selector, value))
+
+
+class FakeHandle:
+    """JS handle for a text-scan result that found no element."""
+    
+    def as_element(self):
+        return None
+    
+    async def dispose(self):
+        pass
+
+
+class FakePage:
+    """
+    Page whose elements are plain CSS selectors.
+    
+    Selectors in attached exist from the start; selectors in late are attached once a
+    wait for them lasts at least their delay in seconds, like elements rendered by scripts.
+    evaluate returns structured (or raises it, if it is an exception) and content returns html.
+    """
+    
+    def __init__(self, attached=(), late=None, structured=None, html=""):
+        self.attached = set(attached)
+        self.late = dict(late or {})
+        self.url = "about:blank"
+        self.waits = []
+        self.actions = []
+        self.navigations = []
+        self.closed = False
+        self.structured = structured
+        self.html = html
+        self.content_reads = 0
+    
+    def matches(self, selector):
+        return any(part in self.attached for part in selector.split(", "))
+    
+    def render(self, selector, seconds):
+        for part in selector.split(", "):
+            if self.late.get(part, float("inf")) <= seconds:
+                self.attached.add(part)
+        return self.matches(selector)
+    
+    def locator(self, selector):
+        return FakeLocator(self, selector)
+    
+    async def goto(self, url, wait_until=None):
+        self.navigations.append((url, wait_until))
+        self.url = url
+    
+    async def title(self):
+        return "Example"
+    
+    async def evaluate_handle(self, script, arg=None):
+        return FakeHandle()
+    
+    async def evaluate(self, script, arg=None):
+        if isinstance(self.structured, Exception):
+            raise self.structured
+        return self.structured
+    
+    async def content(self):
+        self.content_reads += 1
+        return self.html
+    
+    async def close(self):
+        self.closed = True
+
+
+class FakeMCP:
+    """MCP server stand-in whose tool() decorator registers functions unchanged."""
+    
+    def __init__(self):
+        self.tools = {}
+    
+    def tool(self):
+        def register(function):
+            self.tools[function.__name__] = function
+            return function
+        return register
+
+
+class FakeBrowserManager:
+    """Browser manager handing out tracked pages built by a page factory."""
+    
+    def __init__(self, page_factory):
+        self.page_factory = page_factory
+        self.active_pages = {}
+        self.opened = 0
+    
+    async def get_page(self, page_id=None):
+        self.opened += 1
+        page_id = str(self.opened)
+        page = self.active_pages[page_id] = self.page_factory()
+        return page, page_id
+    
+    async def close_page(self, page_id):
+        page = self.active_pages.pop(page_id, None)
+        if page is None:
+            return False
+        await page.close()
+        return True
+
+
+class FakeContext:
+    """Browser context opening pages built by a page factory, recording them."""
+    
+    def __init__(self, page_factory):
+        self.page_factory = page_factory
+        self.pages = []
+    
+    async def new_page(self):
+        page = self.page_factory()
+        self.pages.append(page)
+        return page
+
+
+class FakeContextBrowserManager(FakeBrowserManager):
+    """Browser manager that also exposes its browser context."""
+    
+    def __init__(self, page_factory):
+        super().__init__(page_factory)
+        self.context = FakeContext(page_factory)
+    
+    async def get_context(self):
+        return self.context
+
+
+@pytest.fixture
+def make_workflow(workflows_module):
+    """Factory returning the run_web_workflow tool and its browser manager for a page factory."""
+    def make(page_factory, manager_class=FakeBrowserManager):
+        browser_manager = manager_class(page_factory)
+        tools = workflows_module.register_workflow_tools(FakeMCP(), browser_manager)
+        return tools["run_web_workflow"], browser_manager
+    return make
+
+
+class TestDescriptionKeywords:
+    """_description_keywords keeps the distinctive words of a description."""
+    
+    def test_repeated_words_dropped(self, workflows_module):
+        assert workflows_module._description_keywords("login login button") == ("login", "button")
+    
+    def test_stopwords_dropped(self, workflows_module):
+        assert workflows_module._description_keywords("the search box at the top") == ("search",)
+    
+    def test_only_stopwords_kept(self, workflows_module):
+        assert workflows_module._description_keywords("the top") == ("the", "top")
+    
+    def test_longest_keywords_kept_in_order(self, workflows_module):
+        keywords = workflows_module._description_keywords("red newsletter signup subscription form now")
+        
+        assert keywords == ("newsletter", "signup", "subscription")
+        assert len(keywords) == workflows_module._MAX_KEYWORDS
+
+
+class TestSelectorTiers:
+    """_selector_tiers generates element-type selectors first, then keyword selectors."""
+    
+    def test_type_selectors_match_punctuated_words(self, workflows_module):
+        type_selectors, _ = workflows_module._selector_tiers("submit (button)")
+        
+        assert type_selectors == workflows_module._ELEMENT_TYPES["button"]
+    
+    def test_type_selectors_fall_back_to_substrings(self, workflows_module):
+        type_selectors, _ = workflows_module._selector_tiers("searchbar")
+        
+        assert type_selectors == workflows_module._ELEMENT_TYPES["search"]
+    
+    @pytest.mark.parametrize("description", [
+        "login button",
+        "button button",
+        "submit button, next to the search input",
+        "searchbar",
+        "image link"
+    ])
+    def test_no_duplicates(self, workflows_module, description):
+        type_selectors, keyword_selectors = workflows_module._selector_tiers(description)
+        
+        assert len(set(type_selectors)) == len(type_selectors)
+        assert len(set(keyword_selectors)) == len(keyword_selectors)
+        assert not set(type_selectors) & set(keyword_selectors)
+    
+    def test_repeated_type_words(self, workflows_module):
+        assert workflows_module._selector_tiers("login button") == workflows_module._selector_tiers("login button button")
+    
+    def test_keyword_selectors(self, workflows_module):
+        _, keyword_selectors = workflows_module._selector_tiers("login button")
+        
+        assert "[aria-label*='login' i]" in keyword_selectors
+        assert "#login" in keyword_selectors
+        assert "[class*='login']" in keyword_selectors
+
+
+class TestFindElement:
+    """_find_element waits for late elements and reports a miss instead of falling back to the body."""
+    
+    def test_waits_for_element_rendered_after_load(self, workflows_module):
+        page = FakePage(late={"button": 1})
+        
+        element = asyncio.run(workflows_module._find_element(page, "login button", wait=2))
+        
+        assert element is not None
+        assert "button" in element.selector.split(", ")
+        assert page.waits[0][1] == "attached"
+    
+    def test_present_element_found_without_waiting_out_the_timeout(self, workflows_module):
+        page = FakePage(attached={"#login"})
+        
+        element = asyncio.run(workflows_module._find_element(page, "#login", wait=0))
+        
+        assert element.selector == "#login"
+        assert page.waits == []
+    
+    def test_missing_element(self, workflows_module):
+        page = FakePage(attached={"body"}, late={"button": 10})
+        
+        assert asyncio.run(workflows_module._find_element(page, "login button", wait=1)) is None
+    
+    def test_lower_tier_match_after_wait(self, workflows_module):
+        page = FakePage(attached={"#login"})
+        
+        element = asyncio.run(workflows_module._find_element(page, "login button", wait=1))
+        
+        assert element.selector.split(", ")[0] != "button"
+        assert "#login" in element.selector.split(", ")
+
+
+class TestWorkflowActions:
+    """Workflow steps act on the element found, or report that nothing matched."""
+    
+    def test_click_waits_for_target(self, make_workflow):
+        page = FakePage(late={"button": 1})
+        run_web_workflow, _ = make_workflow(lambda: page)
+        
+        result = asyncio.run(run_web_workflow(
+            ["example.com"], [{"type": "click", "target": "login button", "wait_after": 0, "element_wait": 2}]
+        ))
+        
+        assert page.navigations == [("https://example.com", "domcontentloaded")]
+        assert result["workflow_results"][1]["result"]["action_performed"] == "click"
+        assert page.actions and "button" in page.actions[0][1].split(", ")
+    
+    def test_missing_target_not_clicked(self, make_workflow):
+        page = FakePage(attached={"body"})
+        run_web_workflow, browser_manager = make_workflow(lambda: page)
+        
+        result = asyncio.run(run_web_workflow(
+            ["example.com"], [{"type": "click", "target": "login button", "wait_after": 0, "element_wait": 0.1}]
+        ))
+        
+        assert result["workflow_results"][1]["result"]["content"][0]["text"] == "No elements found matching 'login button'"
+        assert page.actions == []
+        assert page.closed and not browser_manager.active_pages
+
+
+JSON_LD_HTML = (
+    '<html><head><script type="application/ld+json">{"@type": "Product", "name": "Lamp"}</script>'
+    '<script type="application/ld+json">not json</script></head><body></body></html>'
+)
+
+
+class TestStructuredExtraction:
+    """Structured data comes from the page, with JSON-LD parsed from the HTML only if that fails."""
+    
+    def extract(self, make_workflow, page, data_type):
+        run_web_workflow, _ = make_workflow(lambda: page)
+        result = asyncio.run(run_web_workflow(
+            ["example.com"], [{"type": "extract", "target": "structured", "value": data_type, "wait_after": 0}]
+        ))
+        return result["workflow_results"][1]["result"]
+    
+    def test_in_page_result_kept_when_empty(self, make_workflow):
+        page = FakePage(structured={"microdata": []}, html=JSON_LD_HTML)
+        
+        result = self.extract(make_workflow, page, "microdata")
+        
+        assert result["structured_data"]["data"] == {"microdata": []}
+        assert page.content_reads == 0
+    
+    def test_json_ld_parsed_from_html_when_script_fails(self, make_workflow):
+        page = FakePage(structured=RuntimeError("CSP blocked evaluation"), html=JSON_LD_HTML)
+        
+        result = self.extract(make_workflow, page, "json-ld")
+        
+        assert result["structured_data"]["data"] == {"json-ld": [{"@type": "Product", "name": "Lamp"}]}
+    
+    def test_microdata_failure_reported(self, make_workflow):
+        page = FakePage(structured=RuntimeError("CSP blocked evaluation"), html=JSON_LD_HTML)
+        
+        result = self.extract(make_workflow, page, "microdata")
+        
+        assert result["content"][0]["text"] == "Error extracting structured data: CSP blocked evaluation"
+        assert page.content_reads == 0
+
+
+class TestWorkflowPages:
+    """Every workflow page is identified in the results and closed when its workflow ends."""
+    
+    URLS = ["example.com", "example.org", "example.net"]
+    
+    def test_parallel_context_pages(self, make_workflow):
+        run_web_workflow, browser_manager = make_workflow(FakePage, FakeContextBrowserManager)
+        
+        result = asyncio.run(run_web_workflow(self.URLS, [], parallel=True))
+        
+        pages = browser_manager.context.pages
+        page_ids = [url_result["page_id"] for url_result in result["workflow_results"]]
+        assert len(pages) == 3 and all(page.closed for page in pages)
+        assert len(set(page_ids)) == 3 and None not in page_ids
+        for page_id, url_result in zip(page_ids, result["workflow_results"]):
+            assert url_result["result"]["workflow_results"][0]["result"]["page_id"] == page_id
+        assert browser_manager.opened == 0
+    
+    def test_parallel_manager_pages(self, make_workflow):
+        pages = []
+        
+        def page_factory():
+            pages.append(FakePage())
+            return pages[-1]
+        run_web_workflow, browser_manager = make_workflow(page_factory)
+        
+        result = asyncio.run(run_web_workflow(self.URLS, [], parallel=True))
+        
+        assert sorted(url_result["page_id"] for url_result in result["workflow_results"]) == ["1", "2", "3"]
+        assert all(page.closed for page in pages)
+        assert not browser_manager.active_pages
+    
+    def test_context_page_closed_after_error(self, make_workflow):
+        page = FakePage()
+        
+        async def fail_navigation(url, wait_until=None):
+            raise RuntimeError("net::ERR_NAME_NOT_RESOLVED")
+        page.goto = fail_navigation
+        run_web_workflow, _ = make_workflow(lambda: page, FakeContextBrowserManager)
+        
+        result = asyncio.run(run_web_workflow(["example.invalid"], []))
+        
+        assert page.closed
+        assert result["page_id"].startswith("workflow-")
+        assert result["content"][0]["text"].startswith("Error running workflow: Failed to navigate")
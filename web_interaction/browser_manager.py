@@ -148,6 +148,19 @@ class BrowserManager:
             self._schedule_tab_cleanup()
         
         return new_page, new_id
+    
+    async def get_context(self):
+        """
+        Get the shared browser context, initializing the browser if needed.
+        
+        Pages opened directly on the context are not tracked as tabs; callers
+        that use them for short-lived work are responsible for closing them.
+        
+        Returns:
+            Browser context
+        """
+        await self.initialize()
+        return self.context
         
     async def _cleanup_inactive_tabs(self):
         """Close tabs that have been inactive for too long."""
@@ -579,6 +579,27 @@ class EnhancedBrowserManager:
         logger.info(f"Created new page with ID {new_id}, browser type: {browser_type}")
         return new_page, new_id
     
+    async def get_context(self, browser_type=None):
+        """
+        Get the default browser context for a browser type, initializing browsers if needed.
+        
+        Pages opened directly on the context are not tracked as pages of this manager;
+        callers that use them for short-lived work are responsible for closing them.
+        
+        Args:
+            browser_type: Optional browser type (chromium, firefox, webkit)
+            
+        Returns:
+            Browser context
+        """
+        await self.initialize(browser_type)
+        
+        browser_type = browser_type or self.default_browser
+        if browser_type not in self.contexts:
+            logger.warning(f"Browser type {browser_type} not available, using {self.default_browser}")
+            browser_type = self.default_browser
+        return self.contexts[browser_type]
+    
     async def update_page_metadata(self, page_id, url=None, title=None, extra_data=None):
         """Update page metadata."""
         if page_id in self.page_metadata:
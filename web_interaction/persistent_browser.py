@@ -299,6 +299,19 @@ class PersistentBrowserManager:
         
         logger.info(f"Created new page with ID {new_id}, active pages: {list(self.active_pages.keys())}")
         return new_page, new_id
+    
+    async def get_context(self):
+        """
+        Get the shared browser context, initializing the browser if needed.
+        
+        Pages opened directly on the context are not restored across restarts;
+        callers that use them for short-lived work are responsible for closing them.
+        
+        Returns:
+            Browser context
+        """
+        await self.initialize()
+        return self.context
         
     async def update_page_metadata(self, page_id, url):
         """Update page metadata with current URL."""
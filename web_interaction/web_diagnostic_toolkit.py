@@ -6,22 +6,806 @@ console logs, network traffic, DOM state, performance metrics, and visual snapsh
 """
 
 import asyncio
+import atexit
+import gzip
 import json
 import logging
 import os
+import shutil
+import sqlite3
+import threading
 import time
 import base64
+import mmap
+import weakref
+from collections import Counter, deque
+from dataclasses import dataclass, field
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
+from types import MappingProxyType
 from typing import Dict, List, Any, Optional, Tuple, Union
+from urllib.parse import quote
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# SIMD base64 encoder for inlining screenshots, with the stdlib as fallback
+try:
+    import pybase64
+    _b64encode = pybase64.b64encode
+except ImportError:
+    _b64encode = base64.b64encode
+
+# Pick the fastest available JSON backend; every encoder returns UTF-8 bytes and
+# every decoder accepts bytes or str
+try:
+    import msgspec
+    _json_dumps = msgspec.json.Encoder().encode
+    
+    def _json_dumps_pretty(obj):
+        return msgspec.json.format(_json_dumps(obj), indent=2)
+    
+    _json_loads = msgspec.json.decode
+except ImportError:
+    try:
+        import orjson
+        
+        def _json_dumps(obj):
+            return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+        
+        def _json_dumps_pretty(obj):
+            return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_INDENT_2)
+        
+        _json_loads = orjson.loads
+    except ImportError:
+        try:
+            import ujson
+            
+            def _json_dumps(obj):
+                return ujson.dumps(obj, ensure_ascii=False).encode('utf-8')
+            
+            def _json_dumps_pretty(obj):
+                return ujson.dumps(obj, ensure_ascii=False, indent=2).encode('utf-8')
+            
+            _json_loads = ujson.loads
+        except ImportError:
+            def _json_dumps(obj):
+                return json.dumps(obj, separators=(',', ':')).encode('utf-8')
+            
+            def _json_dumps_pretty(obj):
+                return json.dumps(obj, indent=2).encode('utf-8')
+            
+            _json_loads = json.loads
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Script to capture DOM structure
+_DOM_SCRIPT = """
+() => {
+    const maxNodes = 5000;
+    const maxDepth = 5;
+    const maxChildren = 50;
+    const foldLimit = window.innerHeight * 3;
+    const styleProps = ['display', 'visibility', 'position', 'z-index', 'width', 'height'];
+
+    // Phase 1: bounded depth-first walk collecting elements without touching layout
+    const elements = [];
+    const parents = [];
+    const truncatedChildren = [];
+    const stack = [[document.documentElement, -1, 0]];
+    while (stack.length && elements.length < maxNodes) {
+        const [element, parentIndex, depth] = stack.pop();
+        const index = elements.length;
+        elements.push(element);
+        parents.push(parentIndex);
+        truncatedChildren.push(0);
+
+        if (depth < maxDepth) {
+            const children = element.children;
+            const childCount = Math.min(children.length, maxChildren);
+            truncatedChildren[index] = children.length - childCount;
+            // Push in reverse so children are visited in document order
+            for (let i = childCount - 1; i >= 0; i--) {
+                stack.push([children[i], index, depth + 1]);
+            }
+        }
+    }
+
+    // Phase 2: static element properties
+    const nodes = elements.map((element, i) => {
+        const node = {
+            tagName: element.tagName,
+            id: element.id || null,
+            className: element.className || null,
+            textContent: element.textContent ? element.textContent.trim().substring(0, 100) : null,
+            attributes: {},
+            children: []
+        };
+        for (const attr of element.attributes) {
+            node.attributes[attr.name] = attr.value;
+        }
+        if (truncatedChildren[i] > 0) {
+            node.truncatedChildren = truncatedChildren[i];
+        }
+        return node;
+    });
+
+    // Phase 3: layout reads in one tight loop so the browser computes layout once
+    const rects = elements.map(element => element.getBoundingClientRect());
+    elements.forEach((element, i) => {
+        const rect = rects[i];
+        nodes[i].position = {
+            x: rect.x,
+            y: rect.y,
+            width: rect.width,
+            height: rect.height,
+            visible: rect.width > 0 && rect.height > 0
+        };
+        // Skip computed styles for nodes far below the fold
+        if (rect.top <= foldLimit) {
+            const styles = window.getComputedStyle(element);
+            const nodeStyles = {};
+            styleProps.forEach(prop => {
+                nodeStyles[prop] = styles[prop];
+            });
+            nodes[i].styles = nodeStyles;
+        }
+    });
+
+    // Phase 4: assemble the tree from parent indexes
+    for (let i = 1; i < nodes.length; i++) {
+        nodes[parents[i]].children.push(nodes[i]);
+    }
+
+    return {
+        url: window.location.href,
+        title: document.title,
+        doctype: document.doctype ? document.doctype.name : null,
+        nodeCount: nodes.length,
+        truncated: stack.length > 0,
+        root: nodes.length ? nodes[0] : null
+    };
+}
+"""
+
+# Script to collect detailed performance metrics; heap sizes are skipped when CDP reports them
+_PERF_SCRIPT = """
+(skipMemory) => {
+    const metrics = {};
+
+    // Navigation timing data
+    if (window.performance && window.performance.timing) {
+        const timing = window.performance.timing;
+        metrics.timing = {
+            navigationStart: timing.navigationStart,
+            unloadEventStart: timing.unloadEventStart,
+            unloadEventEnd: timing.unloadEventEnd,
+            redirectStart: timing.redirectStart,
+            redirectEnd: timing.redirectEnd,
+            fetchStart: timing.fetchStart,
+            domainLookupStart: timing.domainLookupStart,
+            domainLookupEnd: timing.domainLookupEnd,
+            connectStart: timing.connectStart,
+            connectEnd: timing.connectEnd,
+            secureConnectionStart: timing.secureConnectionStart,
+            requestStart: timing.requestStart,
+            responseStart: timing.responseStart,
+            responseEnd: timing.responseEnd,
+            domLoading: timing.domLoading,
+            domInteractive: timing.domInteractive,
+            domContentLoadedEventStart: timing.domContentLoadedEventStart,
+            domContentLoadedEventEnd: timing.domContentLoadedEventEnd,
+            domComplete: timing.domComplete,
+            loadEventStart: timing.loadEventStart,
+            loadEventEnd: timing.loadEventEnd
+        };
+
+        // Calculate durations
+        metrics.durations = {
+            total: timing.loadEventEnd - timing.navigationStart,
+            dns: timing.domainLookupEnd - timing.domainLookupStart,
+            tcp: timing.connectEnd - timing.connectStart,
+            request: timing.responseStart - timing.requestStart,
+            response: timing.responseEnd - timing.responseStart,
+            processing: timing.domComplete - timing.responseEnd,
+            onload: timing.loadEventEnd - timing.loadEventStart,
+            domContentLoaded: timing.domContentLoadedEventEnd - timing.domContentLoadedEventStart
+        };
+    }
+
+    // Resource timing data
+    if (window.performance && window.performance.getEntriesByType) {
+        const resources = window.performance.getEntriesByType('resource');
+
+        // Group resources by type
+        const resourcesByType = {};
+        resources.forEach(resource => {
+            const type = resource.initiatorType || 'other';
+            if (!resourcesByType[type]) {
+                resourcesByType[type] = [];
+            }
+
+            resourcesByType[type].push({
+                name: resource.name,
+                duration: resource.duration,
+                transferSize: resource.transferSize,
+                decodedBodySize: resource.decodedBodySize
+            });
+        });
+
+        metrics.resources = {
+            count: resources.length,
+            totalSize: resources.reduce((total, r) => total + (r.transferSize || 0), 0),
+            totalDuration: resources.reduce((total, r) => total + r.duration, 0),
+            byType: resourcesByType
+        };
+    }
+
+    // Memory info
+    if (!skipMemory && window.performance && window.performance.memory) {
+        metrics.memory = {
+            totalJSHeapSize: window.performance.memory.totalJSHeapSize,
+            usedJSHeapSize: window.performance.memory.usedJSHeapSize,
+            jsHeapSizeLimit: window.performance.memory.jsHeapSizeLimit
+        };
+    }
+
+    // Layout metrics
+    metrics.layout = {
+        viewport: {
+            width: window.innerWidth,
+            height: window.innerHeight
+        },
+        documentSize: {
+            width: document.documentElement.scrollWidth,
+            height: document.documentElement.scrollHeight
+        },
+        // The live collection's length is counted natively without building a static NodeList
+        elementCount: document.getElementsByTagName('*').length
+    };
+
+    return metrics;
+}
+"""
+
+# Minimal script sampled on every performance monitoring tick
+_METRICS_SCRIPT = """
+() => {
+    return {
+        memory: window.performance.memory ? {
+            usedJSHeapSize: window.performance.memory.usedJSHeapSize,
+            totalJSHeapSize: window.performance.memory.totalJSHeapSize
+        } : {},
+        timing: window.performance.timing ? {
+            loadTime: window.performance.timing.loadEventEnd - window.performance.timing.navigationStart,
+            domContentLoaded: window.performance.timing.domContentLoadedEventEnd - window.performance.timing.navigationStart
+        } : {},
+        resources: {
+            count: window.performance.getEntriesByType ? window.performance.getEntriesByType('resource').length : 0
+        },
+        layout: {
+            elementCount: document.getElementsByTagName('*').length
+        }
+    };
+}
+"""
+
+# Installed once per page so later collections only send a tiny call expression
+_SCRIPTS_BOOTSTRAP = (
+    "window.__diag_dom = " + _DOM_SCRIPT.strip() + ";\n"
+    "window.__diag_perf = " + _PERF_SCRIPT.strip() + ";\n"
+    "window.__collectMetrics = " + _METRICS_SCRIPT.strip() + ";\n"
+)
+_SCRIPTS_BOOTSTRAP_FUNCTION = "() => {\n" + _SCRIPTS_BOOTSTRAP + "}"
+
+# Static parts of the HTML report, kept out of the per-call rendering code
+_REPORT_STYLE = """\
+    <style>
+        body { font-family: Arial, sans-serif; margin: 20px; line-height: 1.6; }
+        h1, h2, h3 { color: #333; }
+        .container { max-width: 1200px; margin: 0 auto; }
+        .card { 
+            border: 1px solid #ddd; 
+            border-radius: 4px; 
+            padding: 15px; 
+            margin-bottom: 20px;
+            box-shadow: 0 2px 4px rgba(0,0,0,0.1);
+        }
+        .header { background-color: #f5f5f5; padding: 15px; border-radius: 4px; margin-bottom: 20px; }
+        .stats { display: flex; flex-wrap: wrap; gap: 10px; }
+        .stat-box { 
+            flex: 1; 
+            min-width: 200px; 
+            background-color: #f8f8f8; 
+            padding: 10px; 
+            border-radius: 4px;
+            border-left: 4px solid #007bff;
+        }
+        .artifacts { margin-top: 20px; }
+        .artifact-group { margin-bottom: 30px; }
+        .tables { border-collapse: collapse; width: 100%; }
+        .tables th, .tables td { 
+            border: 1px solid #ddd; 
+            padding: 8px; 
+            text-align: left;
+        }
+        .tables th { background-color: #f2f2f2; }
+        .tables tr:nth-child(even) { background-color: #f9f9f9; }
+        .screenshot { max-width: 300px; border: 1px solid #ddd; margin: 10px 0; }
+        .tab { overflow: hidden; border: 1px solid #ccc; background-color: #f1f1f1; }
+        .tab button { 
+            background-color: inherit; 
+            float: left; 
+            border: none; 
+            outline: none; 
+            cursor: pointer; 
+            padding: 14px 16px; 
+            transition: 0.3s;
+        }
+        .tab button:hover { background-color: #ddd; }
+        .tab button.active { background-color: #ccc; }
+        .tabcontent { 
+            display: none; 
+            padding: 6px 12px; 
+            border: 1px solid #ccc; 
+            border-top: none;
+        }
+    </style>
+"""
+
+# Static start of every report, up to and including the stylesheet
+_REPORT_PREFIX = """
+        <!DOCTYPE html>
+        <html>
+        <head>
+        """ + _REPORT_STYLE
+
+# Title, header and tab bar, filled with str.format_map
+_REPORT_HEAD = """
+            <title>Diagnostic Report - {title}</title>
+        </head>
+        <body>
+            <div class="container">
+                <div class="header">
+                    <h1>Diagnostic Report</h1>
+                    <p><strong>Session:</strong> {session_name}</p>
+                    <p><strong>Created:</strong> {created_at}</p>
+                    <p><strong>Report Generated:</strong> {generated_at}</p>
+                    {page_id_line}
+                </div>
+                
+                <div class="tab">
+                    <button class="tablinks active" onclick="openTab(event, 'Summary')">Summary</button>
+                    <button class="tablinks" onclick="openTab(event, 'Performance')">Performance</button>
+                    <button class="tablinks" onclick="openTab(event, 'Artifacts')">Artifacts</button>
+                    <button class="tablinks" onclick="openTab(event, 'Events')">Events</button>
+                    <button class="tablinks" onclick="openTab(event, 'Screenshots')">Screenshots</button>
+                </div>
+                
+                <div id="Summary" class="tabcontent" style="display: block;">
+                    <h2>Summary</h2>
+                    <div class="card">
+                        <h3>Artifact Counts</h3>
+                        <div class="stats">
+        """
+
+_REPORT_SCRIPT = """
+        </div>
+    </div>
+
+    <script>
+        function openTab(evt, tabName) {
+            var i, tabcontent, tablinks;
+            tabcontent = document.getElementsByClassName("tabcontent");
+            for (i = 0; i < tabcontent.length; i++) {
+                tabcontent[i].style.display = "none";
+            }
+            tablinks = document.getElementsByClassName("tablinks");
+            for (i = 0; i < tablinks.length; i++) {
+                tablinks[i].className = tablinks[i].className.replace(" active", "");
+            }
+            document.getElementById(tabName).style.display = "block";
+            evt.currentTarget.className += " active";
+        }
+    </script>
+</body>
+</html>
+"""
+
+# Static report prefix and suffix, encoded once and written as-is into every report
+_REPORT_PREFIX_BYTES = _REPORT_PREFIX.encode('utf-8')
+_REPORT_SUFFIX_BYTES = _REPORT_SCRIPT.encode('utf-8')
+
+# Artifact files read at once when a report includes artifact contents
+ARTIFACT_LOAD_CONCURRENCY = 32
+
+# Rows rendered per HTML report table; the JSON report always holds everything
+MAX_HTML_ROWS = 500
+
+# Event fields shown in their own HTML columns rather than in the details cell
+_EVENT_COLUMN_KEYS = frozenset({'timestamp', 'type', 'page_id'})
+
+# Most recent events kept in memory per session; older ones live in events.jsonl
+MAX_SESSION_EVENTS = 1000
+
+# Performance samples kept in memory per page; the full history is appended to <page_id>.jsonl
+MAX_PERFORMANCE_SAMPLES = 100
+MAX_SESSION_PERFORMANCE_SAMPLES = 20
+_PERF_LOG_BUFFER_SIZE = 1024 * 1024
+
+# Delay used to coalesce session metadata writes
+METADATA_FLUSH_DELAY_SECONDS = 2.0
+
+# Artifact types whose payloads can reach tens of MB; past _STREAM_MIN_SIZE of estimated JSON
+# they are streamed to disk in batches instead of being encoded in one piece
+_STREAMED_ARTIFACT_TYPES = frozenset({"network_requests", "dom_snapshot"})
+_STREAM_MIN_SIZE = 1024 * 1024
+_STREAM_BATCH_ITEMS = 1024
+_STREAM_CHUNK_SIZE = 256 * 1024
+
+# Items sampled from a long list when estimating the encoded size of a payload
+_SIZE_SAMPLE_ITEMS = 32
+
+# Write buffer for JSON reports, so each report reaches the file in a few large writes
+_REPORT_BUFFER_SIZE = 1024 * 1024
+
+# Characters of HTML text joined and encoded per write
+_HTML_ENCODE_BATCH_SIZE = 256 * 1024
+
+# Screenshot bytes encoded per step when inlining into HTML; a multiple of 3 so chunks need no padding
+_BASE64_CHUNK_SIZE = 3 * 64 * 1024
+
+# Screenshots up to this size keep their encoded form cached across reports; larger ones are streamed
+_BASE64_CACHE_MAX_FILE_SIZE = 1024 * 1024
+
+# Bits for the collect_full_diagnostic options that enable individual collectors
+_COLLECT_CONSOLE = 1 << 0
+_COLLECT_NETWORK = 1 << 1
+_COLLECT_DOM = 1 << 2
+_TAKE_SCREENSHOT = 1 << 3
+_COLLECT_PERFORMANCE = 1 << 4
+_COLLECT_ERRORS = 1 << 5
+_COLLECTOR_OPTION_BITS = {
+    "collect_console": _COLLECT_CONSOLE,
+    "collect_network": _COLLECT_NETWORK,
+    "collect_dom": _COLLECT_DOM,
+    "take_screenshot": _TAKE_SCREENSHOT,
+    "collect_performance": _COLLECT_PERFORMANCE,
+    "collect_errors": _COLLECT_ERRORS
+}
+_ALL_COLLECTORS = sum(_COLLECTOR_OPTION_BITS.values())
+
+# Shorter strings are not worth replacing with a {"$": index} reference
+_INTERN_MIN_LENGTH = 8
+
+
+def _exceeds_json_size(data, limit):
+    """
+    Estimate whether a payload's JSON encoding would be longer than limit bytes.
+    
+    Nothing is encoded: lists longer than _SIZE_SAMPLE_ITEMS are extrapolated from
+    evenly spaced items, and the walk stops as soon as the estimate passes the limit.
+    """
+    size = 0
+    stack = [(data, 1)]
+    while stack:
+        obj, weight = stack.pop()
+        if isinstance(obj, str):
+            size += (len(obj) + 2) * weight
+        elif isinstance(obj, dict):
+            size += (len(obj) * 4 + 2) * weight
+            for key, value in obj.items():
+                size += len(key) * weight if isinstance(key, str) else 8 * weight
+                stack.append((value, weight))
+        elif isinstance(obj, (list, tuple)):
+            size += (len(obj) + 2) * weight
+            if len(obj) > _SIZE_SAMPLE_ITEMS:
+                step = len(obj) / _SIZE_SAMPLE_ITEMS
+                stack.extend((obj[int(i * step)], weight * step) for i in range(_SIZE_SAMPLE_ITEMS))
+            else:
+                stack.extend((item, weight) for item in obj)
+        else:
+            size += 8 * weight
+        
+        if size > limit:
+            return True
+    return False
+
+
+# Performance statistics: (stat name, sample section, field, scale applied to the result)
+_PERF_STAT_FIELDS = (
+    ('memory_used_mb', 'memory', 'usedJSHeapSize', 1 / (1024 * 1024)),
+    ('load_time_ms', 'timing', 'loadTime', 1),
+    ('dom_ready_time_ms', 'timing', 'domContentLoaded', 1),
+    ('element_count', 'layout', 'elementCount', 1),
+    ('resource_count', 'resources', 'count', 1)
+)
+
+
+def _new_stat_accumulator():
+    """Running [count, mean, M2, min, max] for one metric."""
+    return [0, 0.0, 0.0, float('inf'), float('-inf')]
+
+
+def _accumulate_sample(accumulators, sample):
+    """
+    Fold one performance sample into per-metric accumulators (Welford's algorithm).
+    
+    Missing and non-positive values are skipped, as they mean the browser did
+    not report the metric.
+    """
+    for name, section, field_name, _ in _PERF_STAT_FIELDS:
+        values = sample.get(section)
+        if not values:
+            continue
+        x = values.get(field_name, 0)
+        if not x or x <= 0:
+            continue
+        
+        acc = accumulators[name]
+        acc[0] += 1
+        delta = x - acc[1]
+        acc[1] += delta / acc[0]
+        acc[2] += delta * (x - acc[1])
+        if x < acc[3]:
+            acc[3] = x
+        if x > acc[4]:
+            acc[4] = x
+
+
+def _evict_sample(accumulators, sample, window):
+    """
+    Remove a sample that left the window from per-metric accumulators (Welford in reverse).
+    
+    When the removed value was the metric's minimum or maximum, the extremes are
+    recomputed from the remaining samples in the window.
+    """
+    for name, section, field_name, _ in _PERF_STAT_FIELDS:
+        values = sample.get(section)
+        if not values:
+            continue
+        x = values.get(field_name, 0)
+        if not x or x <= 0:
+            continue
+        
+        acc = accumulators[name]
+        if acc[0] <= 1:
+            accumulators[name] = _new_stat_accumulator()
+            continue
+        
+        mean = acc[1]
+        acc[0] -= 1
+        acc[1] -= (x - mean) / acc[0]
+        acc[2] = max(acc[2] - (x - mean) * (x - acc[1]), 0.0)
+        if x <= acc[3] or x >= acc[4]:
+            remaining = [v for v in ((s.get(section) or {}).get(field_name, 0) for s in window) if v and v > 0]
+            acc[3] = min(remaining, default=float('inf'))
+            acc[4] = max(remaining, default=float('-inf'))
+
+
+def _project_stats(accumulators):
+    """Turn accumulators into the {'min', 'max', 'avg'} stats reported to callers."""
+    stats = {}
+    for name, _, _, scale in _PERF_STAT_FIELDS:
+        count, mean, _, minimum, maximum = accumulators[name]
+        if count:
+            stats[name] = {
+                'min': minimum * scale,
+                'max': maximum * scale,
+                'avg': mean * scale
+            }
+    return stats
+
+
+@dataclass
+class PerfRing:
+    """
+    Fixed-capacity window of a page's most recent performance samples.
+    
+    The sample dicts are kept in a deque. When numpy is installed each metric is
+    also written into its own array, so statistics can be reduced with numpy
+    instead of walking the nested sample dicts.
+    """
+    capacity: int
+    head: int = 0
+    samples: deque = field(init=False)
+    arrays: Optional[Dict[str, Any]] = field(init=False, default=None)
+    
+    def __post_init__(self):
+        self.samples = deque(maxlen=self.capacity)
+        if np is not None:
+            self.arrays = {name: np.zeros(self.capacity) for name, _, _, _ in _PERF_STAT_FIELDS}
+    
+    def __iter__(self):
+        return iter(self.samples)
+    
+    def __len__(self):
+        return len(self.samples)
+    
+    def append(self, sample):
+        """Add a sample, replacing the oldest one when the window is full."""
+        self.samples.append(sample)
+        if self.arrays is not None:
+            index = self.head % self.capacity
+            for name, section, field_name, _ in _PERF_STAT_FIELDS:
+                values = sample.get(section) or {}
+                self.arrays[name][index] = values.get(field_name) or 0
+        self.head += 1
+    
+    def values(self, name):
+        """Filled part of a metric's array (in slot order, which does not matter for stats)."""
+        return self.arrays[name][:min(self.head, self.capacity)]
+
+
+def _ring_stats(rings):
+    """Compute {'min', 'max', 'avg'} stats over PerfRings with vectorized reductions (requires numpy)."""
+    stats = {}
+    for name, _, _, scale in _PERF_STAT_FIELDS:
+        values = np.concatenate([ring.values(name) for ring in rings]) if rings else np.zeros(0)
+        
+        # Non-positive values mean the browser did not report the metric
+        values = values[values > 0]
+        if values.size:
+            stats[name] = {
+                'min': float(values.min()) * scale,
+                'max': float(values.max()) * scale,
+                'avg': float(values.mean()) * scale
+            }
+    return stats
+
+
+# Characters that must be escaped when interpolating values into HTML text and attributes
+_HTML_ESCAPE_TABLE = str.maketrans({
+    '&': '&amp;',
+    '<': '&lt;',
+    '>': '&gt;',
+    '"': '&quot;',
+    "'": '&#39;'
+})
+
+
+def _escape_html(value):
+    """Escape a value for HTML using a single str.translate pass."""
+    return str(value).translate(_HTML_ESCAPE_TABLE)
+
+
+# Local-time format of timestamps shown in HTML reports
+_TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+@lru_cache(maxsize=8192)
+def _format_timestamp(timestamp_ms):
+    """Format a millisecond timestamp for reports ('Unknown' when missing)."""
+    if not timestamp_ms:
+        return 'Unknown'
+    # time.localtime skips building a datetime object for each new timestamp
+    return time.strftime(_TIMESTAMP_FORMAT, time.localtime(timestamp_ms / 1000))
+
+
+@dataclass(frozen=True)
+class _InlineBase64:
+    """HTML report fragment standing for a file that is base64-encoded while the report is written."""
+    path: str
+
+
+def _write_base64_file(src_path, dst):
+    """Stream a file into a binary stream as unbroken base64, one bounded chunk at a time."""
+    with open(src_path, 'rb') as src:
+        if os.fstat(src.fileno()).st_size == 0:
+            return
+        # Chunks are zero-copy views into the mapped file
+        with mmap.mmap(src.fileno(), 0, access=mmap.ACCESS_READ) as mapped, memoryview(mapped) as view:
+            for offset in range(0, len(view), _BASE64_CHUNK_SIZE):
+                dst.write(_b64encode(view[offset:offset + _BASE64_CHUNK_SIZE]))
+
+
+@lru_cache(maxsize=64)
+def _encode_file_base64(path, mtime_ns, size):
+    """
+    Base64-encode a file, memoized on its path, modification time and size.
+    
+    Screenshots are never rewritten once captured, so repeated reports for a session
+    reuse the encoded bytes; a changed mtime or size makes a new cache key.
+    """
+    with open(path, 'rb') as f:
+        return _b64encode(f.read())
+
+
+def _string_table(data):
+    """
+    Collect the strings of a payload worth replacing with references.
+    
+    Args:
+        data: JSON-compatible payload (dicts, lists and scalars)
+        
+    Returns:
+        Tuple of the string table (strings of at least _INTERN_MIN_LENGTH characters seen
+        more than once, in first-seen order) and a dict mapping each one to its index
+    """
+    counts = Counter()
+    
+    def count(obj):
+        if isinstance(obj, str):
+            if len(obj) >= _INTERN_MIN_LENGTH:
+                counts[obj] += 1
+        elif isinstance(obj, dict):
+            for value in obj.values():
+                count(value)
+        elif isinstance(obj, (list, tuple)):
+            for item in obj:
+                count(item)
+    
+    count(data)
+    table = [string for string, seen in counts.items() if seen > 1]
+    return table, {string: index for index, string in enumerate(table)}
+
+
+def _interned(data, refs):
+    """
+    Copy a payload, or part of one, with the strings in refs replaced by {"$": index}.
+    
+    Payload dicts that would otherwise look like a reference or an escape are wrapped
+    as {"$$": dict}.
+    """
+    if isinstance(data, str):
+        ref = refs.get(data)
+        return data if ref is None else {"$": ref}
+    if isinstance(data, dict):
+        replaced = {key: _interned(value, refs) for key, value in data.items()}
+        return {"$$": replaced} if len(data) == 1 and ("$" in data or "$$" in data) else replaced
+    if isinstance(data, (list, tuple)):
+        return [_interned(item, refs) for item in data]
+    return data
+
+
+def _intern_strings(data):
+    """
+    Replace repeated strings in a payload with references into a string table.
+    
+    Args:
+        data: JSON-compatible payload (dicts, lists and scalars)
+        
+    Returns:
+        Dict with the string table under "s" and the rewritten payload under "d";
+        every repeated string value becomes {"$": index}
+    """
+    table, refs = _string_table(data)
+    return {"s": table, "d": _interned(data, refs)}
+
+
+def _uninterned(document):
+    """Restore a payload written by _intern_strings."""
+    table = document["s"]
+    
+    def restore(obj):
+        if isinstance(obj, dict):
+            if len(obj) == 1:
+                if "$" in obj:
+                    return table[obj["$"]]
+                if "$$" in obj:
+                    return {key: restore(value) for key, value in obj["$$"].items()}
+            return {key: restore(value) for key, value in obj.items()}
+        if isinstance(obj, list):
+            return [restore(item) for item in obj]
+        return obj
+    
+    return restore(document["d"])
+
 class WebDiagnosticToolkit:
     """Comprehensive toolkit for web application diagnostics and debugging."""
     
-    def __init__(self, browser_manager, console_monitor=None, visual_debugger=None, error_handler=None):
+    def __init__(self, browser_manager, console_monitor=None, visual_debugger=None, error_handler=None,
+                 compress_artifacts=True, human_readable=False, screenshot_format="png",
+                 screenshot_quality=80):
         """
         Initialize the web diagnostic toolkit.
         
@@ -30,11 +814,23 @@ class WebDiagnosticToolkit:
             console_monitor: Optional console monitor instance 
             visual_debugger: Optional visual debugger instance
             error_handler: Optional error handler instance
+            compress_artifacts: Whether to compress JSON artifacts on disk
+                (zstd when the zstandard package is installed, gzip otherwise)
+            human_readable: Whether to pretty-print JSON metadata and artifacts (apart from
+                large streamed artifacts), and to write an extra .pretty.json copy of each
+                report (compact output from the fastest available encoder otherwise)
+            screenshot_format: Image format for diagnostic screenshots ("png" or "jpeg");
+                JPEG full-page captures are typically several times smaller
+            screenshot_quality: JPEG quality (0-100), ignored for PNG
         """
         self.browser_manager = browser_manager
         self.console_monitor = console_monitor
         self.visual_debugger = visual_debugger
         self.error_handler = error_handler
+        self.compress_artifacts = compress_artifacts
+        self.human_readable = human_readable
+        self.screenshot_format = screenshot_format
+        self.screenshot_quality = screenshot_quality
         
         # Initialize storage directory
         self.storage_dir = Path(browser_manager.storage_dir) if hasattr(browser_manager, 'storage_dir') else Path(os.path.expanduser("~")) / '.claude_web_interaction'
@@ -45,10 +841,45 @@ class WebDiagnosticToolkit:
         self.diagnostic_sessions = {}
         self.active_session_id = None
         
+        # Persistent index of session summaries, so listing and cleanup are indexed queries
+        # that also cover sessions from earlier runs; diagnostic_sessions stays the warm cache.
+        # Metadata writes update it from worker threads, so every use holds the lock
+        self._session_index = self._open_session_index(self.diagnostic_dir / 'index.sqlite')
+        self._session_index_lock = threading.Lock()
+        
+        # Sessions whose metadata file is out of date, flushed on a short timer, and the
+        # latest queued metadata write (each write waits for the one queued before it)
+        self._dirty_sessions = set()
+        self._metadata_flush_handle = None
+        self._metadata_write_task = None
+        
+        # Pages that already have the diagnostic scripts installed
+        self._pages_with_scripts = weakref.WeakSet()
+        
+        # CDP sessions used for performance metrics, keyed by page ID (None if unsupported)
+        self._cdp_sessions = {}
+        
+        # Pages with a close listener that drops their cached per-page state
+        self._pages_watched_for_close = weakref.WeakSet()
+        
         # Performance metrics tracking
         self.metrics_tracking = False
         self.performance_samples = {}
         
+        # Open JSON-lines sample logs, keyed by page ID
+        self._perf_logs = {}
+        
+        # Running statistics per monitored page, covering the samples in its in-memory window
+        self.performance_stats = {}
+        
+        # Last known URL per sampled page, updated by framenavigated listeners (page, handler)
+        self._page_urls = {}
+        self._url_listeners = {}
+        
+        # Samples recorded per page, and session statistics cached against those versions
+        self._samples_version = {}
+        self._stats_cache = {}
+        
         # Create core diagnostic directories
         self.screenshots_dir = self.diagnostic_dir / 'screenshots'
         self.screenshots_dir.mkdir(exist_ok=True)
@@ -62,8 +893,67 @@ class WebDiagnosticToolkit:
         self.network_dir = self.diagnostic_dir / 'network'
         self.network_dir.mkdir(exist_ok=True)
         
+        # Collectors usable with the wired collaborators, built once: (option bit, artifact type, factory).
+        # Each factory takes (page, page_id, session_id, session_dir, timestamp, now_iso).
+        candidate_collectors = [
+            (console_monitor, _COLLECT_CONSOLE, "console_logs",
+             lambda page, page_id, *_: self._fetch_console_logs(page_id)),
+            (console_monitor, _COLLECT_NETWORK, "network_requests",
+             lambda page, page_id, *_: self._fetch_network_requests(page_id)),
+            (visual_debugger, _COLLECT_DOM, "dom_snapshot",
+             lambda page, *_: self._fetch_dom_snapshot(page)),
+            (True, _TAKE_SCREENSHOT, "screenshot",
+             lambda page, page_id, session_id, session_dir, timestamp, now_iso:
+                 self._take_page_screenshot(page, page_id, session_id, session_dir, timestamp)),
+            (True, _COLLECT_PERFORMANCE, "performance_metrics",
+             lambda page, page_id, session_id, session_dir, timestamp, now_iso:
+                 self._fetch_performance_metrics(page, page_id, session_id, timestamp, now_iso)),
+            (error_handler, _COLLECT_ERRORS, "error_information",
+             lambda page, page_id, session_id, session_dir, timestamp, now_iso:
+                 self._fetch_error_information(page_id, timestamp, now_iso))
+        ]
+        self._collectors = [
+            (bit, artifact_type, factory)
+            for available, bit, artifact_type, factory in candidate_collectors
+            if available
+        ]
+        
         logger.info(f"Web Diagnostic Toolkit initialized. Storage directory: {self.diagnostic_dir}")
     
+    @staticmethod
+    def _open_session_index(index_path):
+        """
+        Open the SQLite session index, creating or upgrading its schema.
+        
+        Args:
+            index_path: Path of the index database
+            
+        Returns:
+            sqlite3 connection in autocommit mode
+        """
+        index = sqlite3.connect(str(index_path), isolation_level=None, check_same_thread=False)
+        index.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            "id TEXT PRIMARY KEY, name TEXT, description TEXT, created_at TEXT, "
+            "artifact_count INTEGER, artifact_counts TEXT, event_count INTEGER, created_at_ns INTEGER)"
+        )
+        
+        # Indexes written before created_at_ns existed get the column, backfilled from created_at
+        columns = {row[1] for row in index.execute("PRAGMA table_info(sessions)")}
+        if "created_at_ns" not in columns:
+            index.execute("ALTER TABLE sessions ADD COLUMN created_at_ns INTEGER")
+            index.executemany(
+                "UPDATE sessions SET created_at_ns = ? WHERE id = ?",
+                [
+                    (int(datetime.fromisoformat(created_at).timestamp() * 1e9), session_id)
+                    for session_id, created_at in index.execute("SELECT id, created_at FROM sessions")
+                    if created_at
+                ]
+            )
+            index.execute("DROP INDEX IF EXISTS sessions_created_at")
+        index.execute("CREATE INDEX IF NOT EXISTS sessions_created_at_ns ON sessions (created_at_ns)")
+        return index
+    
     async def create_diagnostic_session(self, name=None, description=None, context=None):
         """
         Create a new diagnostic session to group related diagnostics.
@@ -76,7 +966,8 @@ class WebDiagnosticToolkit:
         Returns:
             Session ID
         """
-        session_id = f"session_{int(time.time())}"
+        created_at_ns = time.time_ns()
+        session_id = f"session_{created_at_ns // 1_000_000_000}"
         session_name = name or f"Diagnostic Session {session_id}"
         
         # Create session structure
@@ -84,42 +975,184 @@ class WebDiagnosticToolkit:
             "id": session_id,
             "name": session_name,
             "description": description or "Web application diagnostic session",
-            "created_at": datetime.now().isoformat(),
+            # ISO string for display; epoch nanoseconds for ordering and age checks
+            "created_at": datetime.fromtimestamp(created_at_ns / 1e9).isoformat(),
+            "created_at_ns": created_at_ns,
             "context": context or {},
             "artifacts": [],
-            "events": [],
+            # Indexes over "artifacts", maintained as artifacts are added
+            "artifacts_by_type": {},
+            "artifacts_by_page": {},
+            # Running totals; "events" only keeps the latest MAX_SESSION_EVENTS
+            "artifact_counts": Counter(),
+            "event_count": 0,
+            "events": deque(maxlen=MAX_SESSION_EVENTS),
             "metrics": {},
-            "summary": {}
+            "summary": {},
+            # Cached directory path, reused by every artifact written to the session
+            "_dir": os.path.join(self.diagnostic_dir, session_id)
         }
         
         # Store session
         self.diagnostic_sessions[session_id] = session
         self.active_session_id = session_id
         
-        # Create session directory
-        session_dir = self.diagnostic_dir / session_id
-        session_dir.mkdir(exist_ok=True)
-        
-        # Save session metadata
-        self._save_session_metadata(session_id)
+        # Create the session directory and save its metadata in a worker thread
+        await self._queue_metadata_write([self._session_metadata_record(session)])
         
         logger.info(f"Created diagnostic session {session_id}: {session_name}")
         return session_id
     
-    def _save_session_metadata(self, session_id):
-        """Save session metadata to file."""
-        if session_id in self.diagnostic_sessions:
-            session_dir = self.diagnostic_dir / session_id
-            session_dir.mkdir(exist_ok=True)
-            
-            metadata_file = session_dir / 'metadata.json'
-            with open(metadata_file, 'w') as f:
-                # Create a copy to avoid modifying the original
-                metadata = dict(self.diagnostic_sessions[session_id])
-                # Remove artifacts list as it might be too large
-                metadata['artifacts_count'] = len(metadata.get('artifacts', []))
-                metadata['artifacts'] = []
-                json.dump(metadata, f, indent=2)
+    def _session_metadata_record(self, session):
+        """
+        Snapshot what is persisted for a session, on the event loop while nothing mutates it.
+        
+        Args:
+            session: Session dict
+            
+        Returns:
+            (session directory, encoded metadata.json contents, session index row)
+        """
+        # Only the summary fields are written; artifacts and events can be large
+        metadata = {
+            "id": session["id"],
+            "name": session["name"],
+            "description": session["description"],
+            "created_at": session["created_at"],
+            "context": session["context"],
+            "artifacts_count": len(session["artifacts"]),
+            "events_count": session.get("event_count", len(session["events"])),
+            "metrics": session["metrics"],
+            "summary": session["summary"]
+        }
+        index_row = (
+            session["id"],
+            session.get("name"),
+            session.get("description"),
+            session.get("created_at"),
+            len(session.get("artifacts", ())),
+            _json_dumps(dict(session.get("artifact_counts", ()))).decode('utf-8'),
+            session.get("event_count", 0),
+            session.get("created_at_ns")
+        )
+        session_dir = session.get("_dir") or self._session_dir(session["id"])
+        return session_dir, self._encode_json(metadata), index_row
+    
+    def _write_session_metadata(self, records):
+        """
+        Write metadata files and session index rows (blocking; run via asyncio.to_thread).
+        
+        Args:
+            records: Records from _session_metadata_record
+        """
+        if not records:
+            return
+        
+        for session_dir, metadata, _ in records:
+            os.makedirs(session_dir, exist_ok=True)
+            with open(f"{session_dir}/metadata.json", 'wb') as f:
+                f.write(metadata)
+        
+        with self._session_index_lock:
+            self._session_index.executemany(
+                "INSERT OR REPLACE INTO sessions "
+                "(id, name, description, created_at, artifact_count, artifact_counts, event_count, created_at_ns) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [index_row for _, _, index_row in records]
+            )
+    
+    def _take_dirty_metadata(self):
+        """Snapshot the metadata of every session changed since the last flush and mark them clean."""
+        records = []
+        for session_id in self._dirty_sessions:
+            session = self.diagnostic_sessions.get(session_id)
+            if session is None:
+                continue
+            try:
+                records.append(self._session_metadata_record(session))
+            except Exception as e:
+                logger.error(f"Error saving metadata for session {session_id}: {str(e)}")
+        self._dirty_sessions.clear()
+        return records
+    
+    def _queue_metadata_write(self, records):
+        """
+        Write metadata records in a worker thread once earlier queued writes are done.
+        
+        Args:
+            records: Records from _session_metadata_record
+            
+        Returns:
+            Task completing when the records are written
+        """
+        self._metadata_write_task = asyncio.ensure_future(
+            self._write_metadata_after(records, self._metadata_write_task)
+        )
+        return self._metadata_write_task
+    
+    async def _write_metadata_after(self, records, previous):
+        """Write metadata records after a previous write task, so older snapshots never win."""
+        if previous is not None and not previous.done():
+            await previous
+        try:
+            await asyncio.to_thread(self._write_session_metadata, records)
+        except Exception as e:
+            logger.error(f"Error saving session metadata: {str(e)}")
+    
+    async def _wait_for_metadata_writes(self):
+        """Wait for queued metadata writes started on the running event loop."""
+        task = self._metadata_write_task
+        if task is not None and not task.done() and task.get_loop() is asyncio.get_running_loop():
+            await asyncio.shield(task)
+    
+    def _append_event_to_log(self, session_id, event):
+        """Append an event to the session's events.jsonl so history survives the in-memory cap."""
+        try:
+            with open(f"{self._session_dir(session_id)}/events.jsonl", 'ab') as f:
+                f.write(_json_dumps(event) + b'\n')
+        except Exception as e:
+            logger.error(f"Error logging event for session {session_id}: {str(e)}")
+    
+    @staticmethod
+    def _add_session_artifacts(session, artifacts):
+        """Add artifacts to a session, keeping its by-type and by-page indexes up to date."""
+        session['artifacts'].extend(artifacts)
+        by_type = session.setdefault('artifacts_by_type', {})
+        by_page = session.setdefault('artifacts_by_page', {})
+        counts = session.setdefault('artifact_counts', Counter())
+        for artifact in artifacts:
+            artifact_type = artifact.get('type', 'unknown')
+            counts[artifact_type] += 1
+            by_type.setdefault(artifact_type, []).append(artifact)
+            by_page.setdefault(artifact.get('page_id'), {}).setdefault(artifact_type, []).append(artifact)
+    
+    def _add_session_event(self, session_id, event):
+        """Record an event in a session's recent-events deque, running count and events.jsonl."""
+        session = self.diagnostic_sessions[session_id]
+        session['events'].append(event)
+        session['event_count'] = session.get('event_count', 0) + 1
+        self._append_event_to_log(session_id, event)
+    
+    def _session_dir(self, session_id):
+        """Directory of a session as a string, cached on the session when it exists."""
+        session = self.diagnostic_sessions.get(session_id)
+        if session is not None and "_dir" in session:
+            return session["_dir"]
+        return os.path.join(self.diagnostic_dir, session_id)
+    
+    def _mark_session_dirty(self, session_id):
+        """Schedule a coalesced metadata write for a session."""
+        self._dirty_sessions.add(session_id)
+        if self._metadata_flush_handle is None:
+            loop = asyncio.get_running_loop()
+            self._metadata_flush_handle = loop.call_later(METADATA_FLUSH_DELAY_SECONDS, self._flush_session_metadata)
+    
+    def _flush_session_metadata(self):
+        """Timer callback: write metadata for every session changed since the last flush in a worker thread."""
+        self._metadata_flush_handle = None
+        records = self._take_dirty_metadata()
+        if records:
+            self._queue_metadata_write(records)
     
     async def collect_full_diagnostic(self, page_id, options=None):
         """
@@ -135,21 +1168,14 @@ class WebDiagnosticToolkit:
         if page_id is not None:
             page_id = str(page_id)
         
-        # Default options
-        default_options = {
-            "collect_console": True,
-            "collect_network": True,
-            "collect_dom": True,
-            "collect_visual": True,
-            "collect_performance": True,
-            "collect_errors": True,
-            "take_screenshot": True,
-            "session_id": self.active_session_id
-        }
-        
-        # Merge with provided options
-        opts = {**default_options, **(options or {})}
-        session_id = opts["session_id"]
+        # Every collector is enabled by default; options can only switch them off
+        enabled = _ALL_COLLECTORS
+        session_id = self.active_session_id
+        if options:
+            for option, bit in _COLLECTOR_OPTION_BITS.items():
+                if not options.get(option, True):
+                    enabled &= ~bit
+            session_id = options.get("session_id", session_id)
         
         # Ensure we have an active session
         if not session_id:
@@ -160,9 +1186,11 @@ class WebDiagnosticToolkit:
         
         logger.info(f"Collecting comprehensive diagnostics for page {page_id} in session {session_id}")
         
-        # Start timestamp
-        start_time = time.time()
-        timestamp = int(start_time * 1000)
+        # Monotonic clock for the duration, integer wall clock for the timestamp
+        start_ns = time.monotonic_ns()
+        wall_ns = time.time_ns()
+        timestamp = wall_ns // 1_000_000
+        now_iso = datetime.fromtimestamp(wall_ns / 1e9).isoformat()
         
         # Get the page
         page = self.browser_manager.active_pages.get(page_id)
@@ -199,236 +1227,417 @@ class WebDiagnosticToolkit:
         if hasattr(self.browser_manager, 'page_metadata') and page_id in self.browser_manager.page_metadata:
             results["page_metadata"] = self.browser_manager.page_metadata[page_id]
         
-        # Collect diagnostics in parallel
-        collection_tasks = []
-        
-        # Console logs
-        if opts["collect_console"] and self.console_monitor:
-            collection_tasks.append(self._collect_console_logs(page_id, session_id, timestamp))
-        
-        # Network requests
-        if opts["collect_network"] and self.console_monitor:
-            collection_tasks.append(self._collect_network_requests(page_id, session_id, timestamp))
-        
-        # DOM snapshot
-        if opts["collect_dom"] and self.visual_debugger:
-            collection_tasks.append(self._collect_dom_snapshot(page, page_id, session_id, timestamp))
+        session_dir = self._session_dir(session_id)
         
-        # Visual snapshot (screenshot)
-        if opts["take_screenshot"]:
-            collection_tasks.append(self._take_page_screenshot(page, page_id, session_id, timestamp))
+        # Fetch diagnostics in parallel; each task yields an in-memory payload
+        fetch_tasks = [
+            (artifact_type, factory(page, page_id, session_id, session_dir, timestamp, now_iso))
+            for bit, artifact_type, factory in self._collectors
+            if enabled & bit
+        ]
         
-        # Performance metrics
-        if opts["collect_performance"]:
-            collection_tasks.append(self._collect_performance_metrics(page, page_id, session_id, timestamp))
-        
-        # Error information
-        if opts["collect_errors"] and self.error_handler:
-            collection_tasks.append(self._collect_error_information(page_id, session_id, timestamp))
-        
-        # Execute all collection tasks concurrently
-        if collection_tasks:
-            collection_results = await asyncio.gather(*collection_tasks, return_exceptions=True)
+        # Execute all fetch tasks concurrently, then persist every payload in one batch
+        if fetch_tasks:
+            payloads = await asyncio.gather(*(task for _, task in fetch_tasks), return_exceptions=True)
             
-            # Process results
-            for result in collection_results:
-                if isinstance(result, Exception):
-                    logger.error(f"Error in diagnostic collection: {str(result)}")
+            persist_tasks = []
+            for (artifact_type, _), payload in zip(fetch_tasks, payloads):
+                if isinstance(payload, Exception):
+                    logger.error(f"Error collecting {artifact_type.replace('_', ' ')}: {str(payload)}")
                     continue
-                    
-                if isinstance(result, dict) and 'artifact' in result:
-                    # Add to session artifacts
-                    if session_id in self.diagnostic_sessions:
-                        self.diagnostic_sessions[session_id]['artifacts'].append(result['artifact'])
-                    
-                    # Add to results
-                    if 'artifacts' in results:
-                        results['artifacts'].append(result['artifact'])
+                
+                if artifact_type == "screenshot":
+                    if isinstance(payload, dict) and 'artifact' in payload:
+                        results['artifacts'].append(payload['artifact'])
+                    continue
+                
+                persist_tasks.append(self._persist_artifact(artifact_type, payload, page_id, session_id, session_dir, timestamp))
+            
+            persisted = await asyncio.gather(*persist_tasks, return_exceptions=True)
+            for artifact in persisted:
+                if isinstance(artifact, Exception):
+                    logger.error(f"Error saving diagnostic artifact: {str(artifact)}")
+                    continue
+                results['artifacts'].append(artifact)
+            
+            # Add to session artifacts
+            if session_id in self.diagnostic_sessions:
+                self._add_session_artifacts(self.diagnostic_sessions[session_id], results['artifacts'])
         
         # Calculate total time
-        end_time = time.time()
-        results["collection_time_ms"] = int((end_time - start_time) * 1000)
+        results["collection_time_ms"] = (time.monotonic_ns() - start_ns) // 1_000_000
         
         # Add to session events
         if session_id in self.diagnostic_sessions:
-            self.diagnostic_sessions[session_id]['events'].append({
+            event = {
                 "type": "diagnostic_collection",
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": now_iso,
                 "page_id": page_id,
                 "url": url,
                 "artifacts_count": len(results.get('artifacts', []))
-            })
+            }
+            self._add_session_event(session_id, event)
             
-            # Save updated session metadata
-            self._save_session_metadata(session_id)
+            # Save updated session metadata (coalesced with other recent updates)
+            self._mark_session_dirty(session_id)
         
         logger.info(f"Comprehensive diagnostics collection completed in {results['collection_time_ms']}ms with {len(results.get('artifacts', []))} artifacts")
         return results
     
-    async def _collect_console_logs(self, page_id, session_id, timestamp):
-        """Collect console logs for a page."""
-        try:
-            console_logs = await self.console_monitor.get_console_logs(page_id)
-            
-            # Create artifact
-            artifact = {
-                "type": "console_logs",
-                "timestamp": timestamp,
-                "page_id": page_id,
-                "session_id": session_id,
-                "content": console_logs
-            }
+    # File name prefix used for each persisted artifact type
+    _ARTIFACT_FILE_PREFIXES = {
+        "console_logs": "console_logs",
+        "network_requests": "network_requests",
+        "dom_snapshot": "dom_snapshot",
+        "performance_metrics": "performance",
+        "error_information": "errors"
+    }
+    
+    @staticmethod
+    def _summarize_artifact(artifact_type, payload):
+        """Build the short in-memory summary kept in place of an artifact's content."""
+        if artifact_type == "console_logs":
+            return f"{len(payload)} console log entries"
+        if artifact_type == "network_requests":
+            return f"{len(payload)} network requests"
+        if artifact_type == "performance_metrics":
+            return (f"{len(payload.get('resources', {}).get('byType', {}))} resource types, "
+                    f"{payload.get('layout', {}).get('elementCount', 0)} elements")
+        if artifact_type == "error_information":
+            return f"{len(payload.get('page_errors') or [])} page errors"
+        return "DOM structure snapshot with element properties and styles"
+    
+    @staticmethod
+    def _dumps(data, human_readable=False):
+        """Encode JSON data to bytes, pretty-printed only when asked for."""
+        if human_readable:
+            return _json_dumps_pretty(data)
+        return _json_dumps(data)
+    
+    def _encode_json(self, data):
+        """Encode JSON data to bytes using this toolkit's output settings."""
+        return self._dumps(data, self.human_readable)
+    
+    @staticmethod
+    def _write_samples_file(samples_file, samples):
+        """Write samples as JSON lines (blocking; run via asyncio.to_thread)."""
+        with open(samples_file, 'wb', buffering=_REPORT_BUFFER_SIZE) as f:
+            f.writelines(_json_dumps(sample) + b'\n' for sample in samples)
+    
+    def _write_report_file(self, report_file, report):
+        """
+        Write a JSON report compactly through a large write buffer (blocking; run via asyncio.to_thread).
+        
+        Args:
+            report_file: Path of the report file
+            report: Report data
+        """
+        with open(report_file, 'wb', buffering=_REPORT_BUFFER_SIZE) as f:
+            f.write(_json_dumps(report))
+        
+        # Pretty-printing roughly doubles the output, so it is only done on demand
+        if self.human_readable:
+            with open(report_file.with_suffix('.pretty.json'), 'wb', buffering=_REPORT_BUFFER_SIZE) as f:
+                f.write(self._dumps(report, True))
+    
+    @staticmethod
+    def _stream_dump(f, data, transform=None):
+        """
+        Write JSON data to a binary stream without encoding the whole document at once.
+        
+        Lists are encoded _STREAM_BATCH_ITEMS items at a time with the fast JSON backend,
+        so peak memory holds one batch's bytes instead of a full encoded copy; anything
+        else is encoded in one piece.
+        
+        Args:
+            f: Binary stream to write to
+            data: JSON-compatible data
+            transform: Optional function applied to each batch (or to data when it is
+                encoded in one piece) just before it is encoded
+        """
+        if transform is None:
+            def transform(part):
+                return part
+        
+        if not isinstance(data, list) or len(data) <= _STREAM_BATCH_ITEMS:
+            f.write(_json_dumps(transform(data)))
+            return
+        
+        f.write(b'[')
+        for start in range(0, len(data), _STREAM_BATCH_ITEMS):
+            if start:
+                f.write(b',')
+            # Compact encodings of a list start with "[" and end with "]"
+            f.write(memoryview(_json_dumps(transform(data[start:start + _STREAM_BATCH_ITEMS])))[1:-1])
+        f.write(b']')
+    
+    def _artifact_suffix(self):
+        """File suffix for JSON artifacts, reflecting the compression in use."""
+        if not self.compress_artifacts:
+            return ".json"
+        return ".json.zst" if zstandard else ".json.gz"
+    
+    @staticmethod
+    def _open_artifact(path, mode='wb', threads=0):
+        """
+        Open an artifact file as a binary stream, (de)compressing based on its suffix.
+        
+        Args:
+            path: Path of the artifact file
+            mode: 'wb' to write or 'rb' to read
+            threads: zstd compression worker threads (0 compresses inline, -1 uses every core)
             
-            # Save to file
-            artifact_file = self.diagnostic_dir / session_id / f"console_logs_{page_id}_{timestamp}.json"
-            with open(artifact_file, 'w') as f:
-                json.dump(console_logs, f, indent=2)
+        Returns:
+            Binary file object
+        """
+        path = str(path)
+        if path.endswith('.zst'):
+            if mode == 'wb':
+                return zstandard.ZstdCompressor(level=3, threads=threads).stream_writer(open(path, 'wb'))
+            return zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'))
+        if path.endswith('.gz'):
+            return gzip.open(path, mode, compresslevel=3) if mode == 'wb' else gzip.open(path, mode)
+        return open(path, mode, buffering=_STREAM_CHUNK_SIZE)
+    
+    @classmethod
+    def _write_artifact_file(cls, artifact_type, path, payload, human_readable=False):
+        """Serialize an artifact payload to disk (blocking; run via asyncio.to_thread)."""
+        if artifact_type in _STREAMED_ARTIFACT_TYPES and _exceeds_json_size(payload, _STREAM_MIN_SIZE):
+            # Large payloads repeat URLs, tag names and class names heavily; they are always
+            # written compact, as pretty-printing would roughly double them. Strings are
+            # replaced batch by batch while streaming, so no interned copy of the whole
+            # payload is built (see _intern_strings for the format)
+            table, refs = _string_table(payload)
+            with cls._open_artifact(path, 'wb') as f:
+                f.write(b'{"s":')
+                f.write(_json_dumps(table))
+                f.write(b',"d":')
+                cls._stream_dump(f, payload, lambda part: _interned(part, refs))
+                f.write(b'}')
+        else:
+            with cls._open_artifact(path, 'wb') as f:
+                f.write(cls._dumps(payload, human_readable))
+    
+    @classmethod
+    def _load_artifact_file(cls, path):
+        """
+        Load an artifact payload previously written by _persist_artifact.
+        
+        Args:
+            path: Path of the artifact file (plain, .gz or .zst)
             
-            artifact["path"] = str(artifact_file)
+        Returns:
+            The original payload, with interned strings restored
+        """
+        with cls._open_artifact(path, 'rb') as f:
+            document = _json_loads(f.read())
+        
+        if isinstance(document, dict) and document.keys() == {"s", "d"}:
+            return _uninterned(document)
+        return document
+    
+    async def _persist_artifact(self, artifact_type, payload, page_id, session_id, session_dir, timestamp):
+        """
+        Write a collected payload to the session directory.
+        
+        Args:
+            artifact_type: Type of the artifact (e.g. "console_logs")
+            payload: JSON-serializable data collected for the artifact
+            page_id: ID of the page the data was collected from
+            session_id: ID of the session the artifact belongs to
+            session_dir: Directory of the session, as a string
+            timestamp: Collection timestamp in milliseconds
             
-            return {"artifact": artifact}
-        except Exception as e:
-            logger.error(f"Error collecting console logs: {str(e)}")
-            return {"error": str(e)}
+        Returns:
+            Artifact metadata dict; the payload itself is only kept on disk
+        """
+        file_prefix = self._ARTIFACT_FILE_PREFIXES[artifact_type]
+        artifact_file = f"{session_dir}/{file_prefix}_{page_id}_{timestamp}{self._artifact_suffix()}"
+        await asyncio.to_thread(self._write_artifact_file, artifact_type, artifact_file, payload,
+                                self.human_readable)
+        
+        return {
+            "type": artifact_type,
+            "timestamp": timestamp,
+            "page_id": page_id,
+            "session_id": session_id,
+            "content_summary": self._summarize_artifact(artifact_type, payload),
+            "path": artifact_file
+        }
+    
+    async def _fetch_console_logs(self, page_id):
+        """Fetch console logs for a page."""
+        return await self.console_monitor.get_console_logs(page_id)
+    
+    async def _fetch_network_requests(self, page_id):
+        """Fetch network requests for a page."""
+        return await self.console_monitor.get_network_requests(page_id)
+    
+    async def _fetch_dom_snapshot(self, page):
+        """Fetch a DOM snapshot for a page."""
+        # Use visual debugger if available, otherwise do it directly
+        if self.visual_debugger:
+            snapshot_path = await self.visual_debugger.capture_dom_snapshot(page, include_styles=True)
+            
+            # Read the captured snapshot off the event loop
+            if snapshot_path:
+                return await asyncio.to_thread(self._read_json_file, snapshot_path)
+        
+        # Direct capture (or fallback if the visual debugger capture failed)
+        return await self._capture_dom_directly(page)
+    
+    @staticmethod
+    def _read_json_file(path):
+        """Read and decode a JSON file (blocking; run via asyncio.to_thread)."""
+        with open(path, 'rb') as f:
+            return _json_loads(f.read())
+    
+    async def _ensure_scripts_installed(self, page):
+        """Install the diagnostic scripts on a page once, for current and future documents."""
+        if page in self._pages_with_scripts:
+            return
+        
+        # The init script covers future navigations; evaluate it now for the current document
+        await page.add_init_script(_SCRIPTS_BOOTSTRAP)
+        await page.evaluate(_SCRIPTS_BOOTSTRAP_FUNCTION)
+        self._pages_with_scripts.add(page)
     
-    async def _collect_network_requests(self, page_id, session_id, timestamp):
-        """Collect network requests for a page."""
+    async def _evaluate_diagnostic_script(self, page, function_name, fallback_script, arg=None):
+        """Run an installed diagnostic script, falling back to sending the full source."""
         try:
-            network_requests = await self.console_monitor.get_network_requests(page_id)
+            await self._ensure_scripts_installed(page)
+            result = await page.evaluate(f"(arg) => window.{function_name} ? window.{function_name}(arg) : null", arg)
+            if result is not None:
+                return result
             
-            # Create artifact
-            artifact = {
-                "type": "network_requests",
-                "timestamp": timestamp,
-                "page_id": page_id,
-                "session_id": session_id,
-                "content": network_requests
-            }
-            
-            # Save to file
-            artifact_file = self.diagnostic_dir / session_id / f"network_requests_{page_id}_{timestamp}.json"
-            with open(artifact_file, 'w') as f:
-                json.dump(network_requests, f, indent=2)
-            
-            artifact["path"] = str(artifact_file)
+            # The document lost the installed scripts; reinstall on the next call
+            self._pages_with_scripts.discard(page)
+        except Exception as e:
+            logger.debug(f"Installed diagnostic script {function_name} unavailable: {str(e)}")
+        
+        return await page.evaluate(fallback_script, arg)
+    
+    async def _get_cdp_session(self, page, page_id):
+        """
+        Get a cached CDP session with the Performance domain enabled.
+        
+        Args:
+            page: Page object
+            page_id: ID of the page
             
-            return {"artifact": artifact}
+        Returns:
+            CDP session, or None when the browser does not support CDP (non-Chromium)
+        """
+        if page_id in self._cdp_sessions:
+            return self._cdp_sessions[page_id]
+        
+        cdp = None
+        try:
+            cdp = await page.context.new_cdp_session(page)
+            await cdp.send('Performance.enable')
         except Exception as e:
-            logger.error(f"Error collecting network requests: {str(e)}")
-            return {"error": str(e)}
+            logger.debug(f"CDP performance metrics unavailable for page {page_id}: {str(e)}")
+            cdp = None
+        
+        self._cdp_sessions[page_id] = cdp
+        self._watch_page_close(page_id, page)
+        return cdp
     
-    async def _collect_dom_snapshot(self, page, page_id, session_id, timestamp):
-        """Collect DOM snapshot for a page."""
+    async def _detach_cdp_session(self, page_id):
+        """Detach and forget the cached CDP session of a page, if any."""
+        cdp = self._cdp_sessions.pop(page_id, None)
+        if cdp is None:
+            return
+        
         try:
-            # Use visual debugger if available, otherwise do it directly
-            if self.visual_debugger:
-                snapshot_path = await self.visual_debugger.capture_dom_snapshot(page, include_styles=True)
-                
-                # Read the captured snapshot
-                if snapshot_path:
-                    with open(snapshot_path, 'r') as f:
-                        dom_snapshot = json.load(f)
-                else:
-                    # Fallback if capture failed
-                    dom_snapshot = await self._capture_dom_directly(page)
-            else:
-                # Direct capture
-                dom_snapshot = await self._capture_dom_directly(page)
-            
-            # Create artifact
-            artifact = {
-                "type": "dom_snapshot",
-                "timestamp": timestamp,
-                "page_id": page_id,
-                "session_id": session_id,
-                "content_summary": "DOM structure snapshot with element properties and styles"
-            }
-            
-            # Save to file
-            artifact_file = self.diagnostic_dir / session_id / f"dom_snapshot_{page_id}_{timestamp}.json"
-            with open(artifact_file, 'w') as f:
-                json.dump(dom_snapshot, f, indent=2)
-            
-            artifact["path"] = str(artifact_file)
-            
-            return {"artifact": artifact}
+            await cdp.detach()
         except Exception as e:
-            logger.error(f"Error collecting DOM snapshot: {str(e)}")
-            return {"error": str(e)}
+            logger.debug(f"Error detaching CDP session for page {page_id}: {str(e)}")
     
-    async def _capture_dom_directly(self, page):
-        """Capture DOM structure directly."""
-        # Script to capture DOM structure
-        dom_script = """
-        () => {
-            function processElement(element, maxDepth = 10, currentDepth = 0) {
-                if (currentDepth > maxDepth) return null;
-                
-                // Basic element info
-                const result = {
-                    tagName: element.tagName,
-                    id: element.id || null,
-                    className: element.className || null,
-                    textContent: element.textContent ? element.textContent.trim().substring(0, 100) : null,
-                    attributes: {},
-                    children: []
-                };
-                
-                // Add attributes
-                for (const attr of element.attributes) {
-                    result.attributes[attr.name] = attr.value;
-                }
-                
-                // Add computed styles (selected important ones)
-                const styles = window.getComputedStyle(element);
-                result.styles = {};
-                ['display', 'visibility', 'position', 'z-index', 'width', 'height'].forEach(prop => {
-                    result.styles[prop] = styles[prop];
-                });
-                
-                // Add position
-                const rect = element.getBoundingClientRect();
-                result.position = {
-                    x: rect.x,
-                    y: rect.y,
-                    width: rect.width,
-                    height: rect.height,
-                    visible: rect.width > 0 && rect.height > 0
-                };
-                
-                // Process children (limit to avoid too large objects)
-                if (currentDepth < maxDepth) {
-                    for (const child of element.children) {
-                        const childResult = processElement(child, maxDepth, currentDepth + 1);
-                        if (childResult) {
-                            result.children.push(childResult);
-                        }
-                    }
-                }
-                
-                return result;
-            }
-            
-            return {
-                url: window.location.href,
-                title: document.title,
-                doctype: document.doctype ? document.doctype.name : null,
-                root: processElement(document.documentElement, 5) // Limit depth to 5 levels
-            };
-        }
+    def _watch_page_close(self, page_id, page):
+        """Forget a page's cached per-page state once it closes (registered once per page)."""
+        if page in self._pages_watched_for_close:
+            return
+        
+        def on_close(_):
+            self._forget_page(page_id)
+        
+        try:
+            page.once('close', on_close)
+        except Exception as e:
+            logger.debug(f"Could not watch page {page_id} for close: {str(e)}")
+            return
+        self._pages_watched_for_close.add(page)
+    
+    def _forget_page(self, page_id):
+        """Drop per-page state kept for a closed page."""
+        # The browser tears down a closed page's CDP sessions itself
+        self._cdp_sessions.pop(page_id, None)
+        self._untrack_page_url(page_id)
+        self._drop_cached_stats(page_id)
+    
+    def _drop_cached_stats(self, page_id=None):
         """
+        Drop a page's sample version and the cached session statistics that may include it.
+        
+        Args:
+            page_id: ID of the page, or None to drop every version and cached statistic
+        """
+        if page_id is None:
+            self._samples_version.clear()
+            self._stats_cache.clear()
+            return
+        
+        self._samples_version.pop(page_id, None)
+        for cache_key in [key for key in self._stats_cache if key[1] in (page_id, None)]:
+            del self._stats_cache[cache_key]
+    
+    async def _get_cdp_performance_metrics(self, page, page_id):
+        """Read Performance.getMetrics for a page, or None if CDP is unavailable."""
+        cdp = await self._get_cdp_session(page, page_id)
+        if cdp is None:
+            return None
+        
+        try:
+            response = await cdp.send('Performance.getMetrics')
+        except Exception as e:
+            # The session is stale (e.g. the page was closed); retry with a new one next time
+            logger.debug(f"Error reading CDP performance metrics for page {page_id}: {str(e)}")
+            self._cdp_sessions.pop(page_id, None)
+            return None
         
-        return await page.evaluate(dom_script)
+        return {metric['name']: metric['value'] for metric in response.get('metrics', [])}
     
-    async def _take_page_screenshot(self, page, page_id, session_id, timestamp):
+    async def _capture_dom_directly(self, page):
+        """Capture DOM structure directly."""
+        return await self._evaluate_diagnostic_script(page, "__diag_dom", _DOM_SCRIPT)
+    
+    @staticmethod
+    def _write_bytes(path, data):
+        """Write bytes to a file (blocking; run via asyncio.to_thread)."""
+        with open(path, 'wb') as f:
+            f.write(data)
+    
+    async def _take_page_screenshot(self, page, page_id, session_id, session_dir, timestamp):
         """Take a screenshot of the page."""
         try:
             # Create screenshot filename
-            screenshot_filename = f"screenshot_{page_id}_{timestamp}.png"
-            screenshot_path = str(self.screenshots_dir / screenshot_filename)
-            
-            # Take screenshot
-            await page.screenshot(path=screenshot_path, full_page=True)
+            extension = "jpg" if self.screenshot_format == "jpeg" else "png"
+            screenshot_filename = f"screenshot_{page_id}_{timestamp}.{extension}"
+            screenshot_path = f"{self.screenshots_dir}/{screenshot_filename}"
+            session_screenshot_path = f"{session_dir}/{screenshot_filename}"
+            
+            # Take screenshot in memory, encoded natively by the browser
+            screenshot_options = {"full_page": True, "type": self.screenshot_format}
+            if self.screenshot_format == "jpeg":
+                screenshot_options["quality"] = self.screenshot_quality
+            data = await page.screenshot(**screenshot_options)
+            
+            # Write both copies from memory instead of re-reading the file
+            await asyncio.gather(
+                asyncio.to_thread(self._write_bytes, screenshot_path, data),
+                asyncio.to_thread(self._write_bytes, session_screenshot_path, data)
+            )
             
             # Create artifact
             artifact = {
@@ -436,205 +1645,73 @@ class WebDiagnosticToolkit:
                 "timestamp": timestamp,
                 "page_id": page_id,
                 "session_id": session_id,
+                "format": self.screenshot_format,
                 "path": screenshot_path
             }
             
-            # Create a copy in the session directory
-            session_screenshot_path = self.diagnostic_dir / session_id / screenshot_filename
-            import shutil
-            shutil.copy2(screenshot_path, session_screenshot_path)
-            
             return {"artifact": artifact}
         except Exception as e:
             logger.error(f"Error taking page screenshot: {str(e)}")
             return {"error": str(e)}
     
-    async def _collect_performance_metrics(self, page, page_id, session_id, timestamp):
-        """Collect performance metrics for a page."""
-        try:
-            # Get performance metrics using JavaScript
-            metrics_script = """
-            () => {
-                const metrics = {};
-                
-                // Navigation timing data
-                if (window.performance && window.performance.timing) {
-                    const timing = window.performance.timing;
-                    metrics.timing = {
-                        navigationStart: timing.navigationStart,
-                        unloadEventStart: timing.unloadEventStart,
-                        unloadEventEnd: timing.unloadEventEnd,
-                        redirectStart: timing.redirectStart,
-                        redirectEnd: timing.redirectEnd,
-                        fetchStart: timing.fetchStart,
-                        domainLookupStart: timing.domainLookupStart,
-                        domainLookupEnd: timing.domainLookupEnd,
-                        connectStart: timing.connectStart,
-                        connectEnd: timing.connectEnd,
-                        secureConnectionStart: timing.secureConnectionStart,
-                        requestStart: timing.requestStart,
-                        responseStart: timing.responseStart,
-                        responseEnd: timing.responseEnd,
-                        domLoading: timing.domLoading,
-                        domInteractive: timing.domInteractive,
-                        domContentLoadedEventStart: timing.domContentLoadedEventStart,
-                        domContentLoadedEventEnd: timing.domContentLoadedEventEnd,
-                        domComplete: timing.domComplete,
-                        loadEventStart: timing.loadEventStart,
-                        loadEventEnd: timing.loadEventEnd
-                    };
-                    
-                    // Calculate durations
-                    metrics.durations = {
-                        total: timing.loadEventEnd - timing.navigationStart,
-                        dns: timing.domainLookupEnd - timing.domainLookupStart,
-                        tcp: timing.connectEnd - timing.connectStart,
-                        request: timing.responseStart - timing.requestStart,
-                        response: timing.responseEnd - timing.responseStart,
-                        processing: timing.domComplete - timing.responseEnd,
-                        onload: timing.loadEventEnd - timing.loadEventStart,
-                        domContentLoaded: timing.domContentLoadedEventEnd - timing.domContentLoadedEventStart
-                    };
+    async def _fetch_performance_metrics(self, page, page_id, session_id, timestamp, now_iso):
+        """Fetch performance metrics for a page and record a summary in the session."""
+        # Heap sizes come from CDP when available; CDP's Nodes counter also includes text,
+        # comment and detached nodes, so elementCount stays the in-page element count
+        cdp_metrics = await self._get_cdp_performance_metrics(page, page_id)
+        cdp_heap = cdp_metrics is not None and 'JSHeapUsedSize' in cdp_metrics
+        
+        # Execute the pre-installed performance script (timings, resources, layout)
+        metrics = await self._evaluate_diagnostic_script(page, "__diag_perf", _PERF_SCRIPT, cdp_heap)
+        
+        if cdp_metrics is not None:
+            metrics['cdp'] = cdp_metrics
+            if cdp_heap:
+                metrics['memory'] = {
+                    'usedJSHeapSize': int(cdp_metrics['JSHeapUsedSize']),
+                    'totalJSHeapSize': int(cdp_metrics.get('JSHeapTotalSize', 0))
                 }
-                
-                // Resource timing data
-                if (window.performance && window.performance.getEntriesByType) {
-                    const resources = window.performance.getEntriesByType('resource');
-                    
-                    // Group resources by type
-                    const resourcesByType = {};
-                    resources.forEach(resource => {
-                        const type = resource.initiatorType || 'other';
-                        if (!resourcesByType[type]) {
-                            resourcesByType[type] = [];
-                        }
-                        
-                        resourcesByType[type].push({
-                            name: resource.name,
-                            duration: resource.duration,
-                            transferSize: resource.transferSize,
-                            decodedBodySize: resource.decodedBodySize
-                        });
-                    });
-                    
-                    metrics.resources = {
-                        count: resources.length,
-                        totalSize: resources.reduce((total, r) => total + (r.transferSize || 0), 0),
-                        totalDuration: resources.reduce((total, r) => total + r.duration, 0),
-                        byType: resourcesByType
-                    };
-                }
-                
-                // Memory info
-                if (window.performance && window.performance.memory) {
-                    metrics.memory = {
-                        totalJSHeapSize: window.performance.memory.totalJSHeapSize,
-                        usedJSHeapSize: window.performance.memory.usedJSHeapSize,
-                        jsHeapSizeLimit: window.performance.memory.jsHeapSizeLimit
-                    };
+        
+        # Add timestamp
+        metrics['timestamp'] = timestamp
+        metrics['collected_at'] = now_iso
+        
+        # Store in session metrics
+        if session_id in self.diagnostic_sessions:
+            if 'metrics' not in self.diagnostic_sessions[session_id]:
+                self.diagnostic_sessions[session_id]['metrics'] = {}
+            
+            # Store the latest metrics
+            self.diagnostic_sessions[session_id]['metrics'][page_id] = {
+                'timestamp': timestamp,
+                'url': page.url,
+                'summary': {
+                    'loadTime': metrics.get('durations', {}).get('total', 0),
+                    'resourceCount': metrics.get('resources', {}).get('count', 0),
+                    'resourceSize': metrics.get('resources', {}).get('totalSize', 0),
+                    'elementCount': metrics.get('layout', {}).get('elementCount', 0)
                 }
-                
-                // Layout metrics
-                metrics.layout = {
-                    viewport: {
-                        width: window.innerWidth,
-                        height: window.innerHeight
-                    },
-                    documentSize: {
-                        width: document.documentElement.scrollWidth,
-                        height: document.documentElement.scrollHeight
-                    },
-                    elementCount: document.querySelectorAll('*').length
-                };
-                
-                return metrics;
             }
-            """
-            
-            # Execute the script
-            metrics = await page.evaluate(metrics_script)
-            
-            # Add timestamp
-            metrics['timestamp'] = timestamp
-            metrics['collected_at'] = datetime.now().isoformat()
-            
-            # Create artifact
-            artifact = {
-                "type": "performance_metrics",
-                "timestamp": timestamp,
-                "page_id": page_id,
-                "session_id": session_id,
-                "content": metrics
-            }
-            
-            # Save to file
-            artifact_file = self.diagnostic_dir / session_id / f"performance_{page_id}_{timestamp}.json"
-            with open(artifact_file, 'w') as f:
-                json.dump(metrics, f, indent=2)
-            
-            artifact["path"] = str(artifact_file)
-            
-            # Store in session metrics
-            if session_id in self.diagnostic_sessions:
-                if 'metrics' not in self.diagnostic_sessions[session_id]:
-                    self.diagnostic_sessions[session_id]['metrics'] = {}
-                
-                # Store the latest metrics
-                self.diagnostic_sessions[session_id]['metrics'][page_id] = {
-                    'timestamp': timestamp,
-                    'url': page.url,
-                    'summary': {
-                        'loadTime': metrics.get('durations', {}).get('total', 0),
-                        'resourceCount': metrics.get('resources', {}).get('count', 0),
-                        'resourceSize': metrics.get('resources', {}).get('totalSize', 0),
-                        'elementCount': metrics.get('layout', {}).get('elementCount', 0)
-                    }
-                }
-            
-            return {"artifact": artifact}
-        except Exception as e:
-            logger.error(f"Error collecting performance metrics: {str(e)}")
-            return {"error": str(e)}
+        
+        return metrics
     
-    async def _collect_error_information(self, page_id, session_id, timestamp):
-        """Collect error information for a page."""
-        try:
-            # Get page errors from console monitor
-            page_errors = await self.console_monitor.get_page_errors(page_id)
-            
-            # Get error statistics from error handler
-            error_stats = {}
-            if self.error_handler:
-                error_stats = self.error_handler.get_error_stats()
-            
-            # Combine the data
-            error_data = {
-                "page_errors": page_errors,
-                "error_stats": error_stats,
-                "timestamp": timestamp,
-                "collected_at": datetime.now().isoformat()
-            }
-            
-            # Create artifact
-            artifact = {
-                "type": "error_information",
-                "timestamp": timestamp,
-                "page_id": page_id,
-                "session_id": session_id,
-                "content": error_data
-            }
-            
-            # Save to file
-            artifact_file = self.diagnostic_dir / session_id / f"errors_{page_id}_{timestamp}.json"
-            with open(artifact_file, 'w') as f:
-                json.dump(error_data, f, indent=2)
-            
-            artifact["path"] = str(artifact_file)
-            
-            return {"artifact": artifact}
-        except Exception as e:
-            logger.error(f"Error collecting error information: {str(e)}")
-            return {"error": str(e)}
+    async def _fetch_error_information(self, page_id, timestamp, now_iso):
+        """Fetch error information for a page."""
+        # Get page errors from console monitor
+        page_errors = await self.console_monitor.get_page_errors(page_id)
+        
+        # Get error statistics from error handler
+        error_stats = {}
+        if self.error_handler:
+            error_stats = self.error_handler.get_error_stats()
+        
+        # Combine the data
+        return {
+            "page_errors": page_errors,
+            "error_stats": error_stats,
+            "timestamp": timestamp,
+            "collected_at": now_iso
+        }
     
     async def start_performance_monitoring(self, page_id, interval_seconds=5):
         """
@@ -696,7 +1773,17 @@ class WebDiagnosticToolkit:
         
         # Set up monitoring for this page
         if page_id not in self.performance_samples:
-            self.performance_samples[page_id] = []
+            self.performance_samples[page_id] = deque(maxlen=MAX_PERFORMANCE_SAMPLES)
+            self.performance_stats[page_id] = {name: _new_stat_accumulator() for name, _, _, _ in _PERF_STAT_FIELDS}
+        self._watch_page_close(page_id, page)
+        
+        # Every sample is appended to a per-page log; only a rolling window stays in memory
+        if page_id not in self._perf_logs:
+            try:
+                self._perf_logs[page_id] = open(self.performance_dir / f"{page_id}.jsonl", 'ab',
+                                                buffering=_PERF_LOG_BUFFER_SIZE)
+            except Exception as e:
+                logger.warning(f"Could not open performance sample log for page {page_id}: {str(e)}")
         
         # Start monitoring if not already started
         if not self.metrics_tracking:
@@ -715,71 +1802,81 @@ class WebDiagnosticToolkit:
         """Background task for performance monitoring."""
         while self.metrics_tracking:
             try:
-                # Sample metrics for all pages
-                for page_id in list(self.browser_manager.active_pages.keys()):
-                    page = self.browser_manager.active_pages.get(page_id)
-                    if not page:
+                # Nothing to sample while no pages are open
+                active_pages = self.browser_manager.active_pages
+                if not active_pages:
+                    await asyncio.sleep(interval_seconds)
+                    continue
+                
+                # Snapshot the pages to sample this tick, skipping a second lookup per page
+                pages = [(page_id, page) for page_id, page in tuple(active_pages.items()) if page]
+                
+                # Use session ID if active, otherwise None
+                session_id = self.active_session_id
+                
+                # Run the installed metrics script on all pages concurrently
+                timestamp = int(time.time() * 1000)
+                results = await asyncio.gather(
+                    *(self._evaluate_diagnostic_script(page, "__collectMetrics", _METRICS_SCRIPT)
+                      for _, page in pages),
+                    return_exceptions=True
+                )
+                
+                # Bind the containers once per tick (after the await, in case monitoring was reset)
+                samples_map = self.performance_samples
+                stats_map = self.performance_stats
+                perf_logs = self._perf_logs
+                samples_version = self._samples_version
+                page_urls = self._page_urls
+                url_listeners = self._url_listeners
+                session = self.diagnostic_sessions.get(session_id)
+                session_samples = session.setdefault('performance_samples', {}) if session is not None else None
+                
+                for (page_id, page), metrics in zip(pages, results):
+                    if isinstance(metrics, Exception):
+                        logger.debug(f"Error collecting performance sample for page {page_id}: {str(metrics)}")
                         continue
                     
-                    # Use session ID if active, otherwise None
-                    session_id = self.active_session_id
-                    
-                    # Collect metrics for this page
-                    timestamp = int(time.time() * 1000)
                     try:
-                        # Execute minimal performance script
-                        metrics_script = """
-                        () => {
-                            return {
-                                memory: window.performance.memory ? {
-                                    usedJSHeapSize: window.performance.memory.usedJSHeapSize,
-                                    totalJSHeapSize: window.performance.memory.totalJSHeapSize
-                                } : {},
-                                timing: window.performance.timing ? {
-                                    loadTime: window.performance.timing.loadEventEnd - window.performance.timing.navigationStart,
-                                    domContentLoaded: window.performance.timing.domContentLoadedEventEnd - window.performance.timing.navigationStart
-                                } : {},
-                                resources: {
-                                    count: window.performance.getEntriesByType ? window.performance.getEntriesByType('resource').length : 0
-                                },
-                                layout: {
-                                    elementCount: document.querySelectorAll('*').length
-                                }
-                            };
-                        }
-                        """
-                        
-                        metrics = await page.evaluate(metrics_script)
-                        
                         # Add timestamp and page info
                         metrics['timestamp'] = timestamp
                         metrics['page_id'] = page_id
-                        metrics['url'] = page.url
                         
-                        # Store the sample
-                        if page_id in self.performance_samples:
-                            # Limit to last 100 samples
-                            samples = self.performance_samples[page_id]
-                            samples.append(metrics)
-                            if len(samples) > 100:
-                                samples.pop(0)
+                        # Monitored pages cache their URL through a navigation listener; pages
+                        # only sampled for the active session read it directly
+                        page_samples = samples_map.get(page_id)
+                        if page_samples is None:
+                            metrics['url'] = page.url
+                        else:
+                            listener = url_listeners.get(page_id)
+                            if listener is None or listener[0] is not page:
+                                metrics['url'] = self._track_page_url(page_id, page)
+                            else:
+                                metrics['url'] = page_urls.get(page_id, '')
+                        samples_version[page_id] = samples_version.get(page_id, 0) + 1
                         
-                        # Add to session if active
-                        if session_id in self.diagnostic_sessions:
-                            if 'performance_samples' not in self.diagnostic_sessions[session_id]:
-                                self.diagnostic_sessions[session_id]['performance_samples'] = {}
-                            
-                            if page_id not in self.diagnostic_sessions[session_id]['performance_samples']:
-                                self.diagnostic_sessions[session_id]['performance_samples'][page_id] = []
+                        # Store the sample (the deque drops the oldest one when full), keeping the
+                        # running statistics in step with the window
+                        if page_samples is not None:
+                            evicted = page_samples[0] if len(page_samples) == page_samples.maxlen else None
+                            page_samples.append(metrics)
+                            _accumulate_sample(stats_map[page_id], metrics)
+                            if evicted is not None:
+                                _evict_sample(stats_map[page_id], evicted, page_samples)
                             
-                            # Add sample and limit to last 20 samples in session
-                            samples = self.diagnostic_sessions[session_id]['performance_samples'][page_id]
-                            samples.append(metrics)
-                            if len(samples) > 20:
-                                samples.pop(0)
+                            perf_log = perf_logs.get(page_id)
+                            if perf_log is not None:
+                                perf_log.write(_json_dumps(metrics) + b'\n')
+                        
+                        # Add to session if active; the ring keeps only the most recent samples
+                        if session_samples is not None:
+                            ring = session_samples.get(page_id)
+                            if ring is None:
+                                ring = session_samples[page_id] = PerfRing(MAX_SESSION_PERFORMANCE_SAMPLES)
+                            ring.append(metrics)
                     
                     except Exception as e:
-                        logger.debug(f"Error collecting performance sample for page {page_id}: {str(e)}")
+                        logger.debug(f"Error recording performance sample for page {page_id}: {str(e)}")
                 
                 # Sleep until next sample
                 await asyncio.sleep(interval_seconds)
@@ -804,6 +1901,10 @@ class WebDiagnosticToolkit:
             # Stop monitoring for specific page
             if page_id in self.performance_samples:
                 del self.performance_samples[page_id]
+                self.performance_stats.pop(page_id, None)
+                self._drop_cached_stats(page_id)
+                self._close_perf_log(page_id)
+                self._untrack_page_url(page_id)
                 logger.info(f"Stopped performance monitoring for page {page_id}")
                 
                 # If no more pages, stop the task
@@ -816,16 +1917,70 @@ class WebDiagnosticToolkit:
             # Stop all monitoring
             self.metrics_tracking = False
             self.performance_samples = {}
+            self.performance_stats = {}
+            self._drop_cached_stats()
+            for monitored_page_id in list(self._perf_logs):
+                self._close_perf_log(monitored_page_id)
+            for tracked_page_id in list(self._url_listeners):
+                self._untrack_page_url(tracked_page_id)
             logger.info("Stopped all performance monitoring")
             return True
     
-    async def get_performance_report(self, page_id=None, session_id=None):
+    def _track_page_url(self, page_id, page):
+        """
+        Start caching a page's URL, refreshed on main-frame navigations.
+        
+        Args:
+            page_id: ID of the page
+            page: Page object
+            
+        Returns:
+            The page's current URL
+        """
+        self._untrack_page_url(page_id)
+        
+        def on_navigated(frame):
+            if frame is page.main_frame:
+                self._page_urls[page_id] = frame.url
+        
+        page.on('framenavigated', on_navigated)
+        self._url_listeners[page_id] = (page, on_navigated)
+        url = self._page_urls[page_id] = page.url
+        return url
+    
+    def _untrack_page_url(self, page_id):
+        """Remove a page's navigation listener and cached URL, if any."""
+        self._page_urls.pop(page_id, None)
+        listener = self._url_listeners.pop(page_id, None)
+        if listener is None:
+            return
+        
+        page, handler = listener
+        try:
+            page.remove_listener('framenavigated', handler)
+        except Exception as e:
+            logger.debug(f"Error removing navigation listener for page {page_id}: {str(e)}")
+    
+    def _close_perf_log(self, page_id):
+        """Flush and close the JSON-lines sample log of a page, if open."""
+        perf_log = self._perf_logs.pop(page_id, None)
+        if perf_log is None:
+            return
+        
+        try:
+            perf_log.close()
+        except Exception as e:
+            logger.warning(f"Error closing performance sample log for page {page_id}: {str(e)}")
+    
+    async def get_performance_report(self, page_id=None, session_id=None, include_raw_samples=False):
         """
         Generate a performance report for a page or session.
         
         Args:
             page_id: Optional ID of the page to report on
             session_id: Optional ID of the session to report on
+            include_raw_samples: Whether to embed the samples in the report itself; by default
+                they are written to a sibling .samples.jsonl file referenced by samples_path
             
         Returns:
             Performance report data
@@ -839,12 +1994,11 @@ class WebDiagnosticToolkit:
         samples = []
         if page_id:
             # Get samples for specific page
-            samples = self.performance_samples.get(page_id, [])
+            samples = list(self.performance_samples.get(page_id, ()))
         elif session_id in self.diagnostic_sessions:
             # Get samples from session
-            for page_id, page_samples in self.diagnostic_sessions[session_id].get('performance_samples', {}).items():
-                for sample in page_samples:
-                    samples.append(sample)
+            for page_samples in self.diagnostic_sessions[session_id].get('performance_samples', {}).values():
+                samples.extend(page_samples)
         
         if not samples:
             return {
@@ -854,8 +2008,14 @@ class WebDiagnosticToolkit:
                 "session_id": session_id
             }
         
-        # Calculate statistics
-        stats = self._calculate_performance_stats(samples)
+        # Monitored pages keep running statistics over their in-memory window, so no
+        # recomputation is needed
+        if page_id in self.performance_stats:
+            stats = _project_stats(self.performance_stats[page_id])
+        elif page_id is None and session_id in self.diagnostic_sessions:
+            stats = self._session_performance_stats(session_id)
+        else:
+            stats = self._calculate_performance_stats(samples)
         
         # Create report
         report = {
@@ -864,86 +2024,86 @@ class WebDiagnosticToolkit:
             "page_id": page_id,
             "session_id": session_id,
             "sample_count": len(samples),
-            "stats": stats,
-            "samples": samples
+            "stats": stats
         }
         
-        # Save report
+        # The page's sample log holds the full history; flush it so readers can replay it
+        perf_log = self._perf_logs.get(page_id)
+        if perf_log is not None:
+            await asyncio.to_thread(perf_log.flush)
+            report["samples_log_path"] = perf_log.name
+        
+        # Save report, with the raw samples streamed to their own JSON-lines file unless embedded
         report_file = self.reports_dir / f"performance_report_{int(time.time())}.json"
-        with open(report_file, 'w') as f:
-            json.dump(report, f, indent=2)
+        if include_raw_samples:
+            report["samples"] = samples
+            await asyncio.to_thread(self._write_report_file, report_file, report)
+        else:
+            samples_file = report_file.with_suffix('.samples.jsonl')
+            report["samples_path"] = str(samples_file)
+            await asyncio.gather(
+                asyncio.to_thread(self._write_report_file, report_file, report),
+                asyncio.to_thread(self._write_samples_file, samples_file, samples)
+            )
         
         report["report_path"] = str(report_file)
         
         return report
     
+    def _session_performance_stats(self, session_id, page_id=None):
+        """
+        Statistics over a session's sample rings, reused until new samples arrive.
+        
+        Args:
+            session_id: ID of the session
+            page_id: Optional page ID to restrict the statistics to
+            
+        Returns:
+            Stats dict as returned by _calculate_performance_stats
+        """
+        session_samples = self.diagnostic_sessions[session_id].get('performance_samples', {})
+        page_ids = [p_id for p_id in session_samples if not page_id or p_id == page_id]
+        
+        # Versions only grow, so their sum changes whenever any included ring does
+        version = sum(self._samples_version.get(p_id, 0) for p_id in page_ids)
+        cache_key = (session_id, page_id)
+        cached = self._stats_cache.get(cache_key)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        
+        # Reduce the rings' per-metric arrays when numpy is installed
+        if np is not None:
+            stats = _ring_stats([session_samples[p_id] for p_id in page_ids])
+        else:
+            stats = self._calculate_performance_stats([s for p_id in page_ids for s in session_samples[p_id]])
+        self._stats_cache[cache_key] = (version, stats)
+        return stats
+    
     def _calculate_performance_stats(self, samples):
-        """Calculate statistics from performance samples."""
+        """Calculate statistics from performance samples in a single pass."""
         if not samples:
             return {}
         
-        # Extract metrics
-        memory_used = [s.get('memory', {}).get('usedJSHeapSize', 0) for s in samples if 'memory' in s]
-        load_times = [s.get('timing', {}).get('loadTime', 0) for s in samples if 'timing' in s]
-        dom_ready_times = [s.get('timing', {}).get('domContentLoaded', 0) for s in samples if 'timing' in s]
-        element_counts = [s.get('layout', {}).get('elementCount', 0) for s in samples if 'layout' in s]
-        resource_counts = [s.get('resources', {}).get('count', 0) for s in samples if 'resources' in s]
-        
-        # Clean up lists
-        memory_used = [m for m in memory_used if m > 0]
-        load_times = [t for t in load_times if t > 0]
-        dom_ready_times = [t for t in dom_ready_times if t > 0]
-        element_counts = [c for c in element_counts if c > 0]
-        resource_counts = [c for c in resource_counts if c > 0]
-        
-        # Calculate statistics
-        stats = {}
-        
-        if memory_used:
-            stats['memory_used_mb'] = {
-                'min': min(memory_used) / (1024 * 1024),
-                'max': max(memory_used) / (1024 * 1024),
-                'avg': sum(memory_used) / len(memory_used) / (1024 * 1024)
-            }
-        
-        if load_times:
-            stats['load_time_ms'] = {
-                'min': min(load_times),
-                'max': max(load_times),
-                'avg': sum(load_times) / len(load_times)
-            }
-        
-        if dom_ready_times:
-            stats['dom_ready_time_ms'] = {
-                'min': min(dom_ready_times),
-                'max': max(dom_ready_times),
-                'avg': sum(dom_ready_times) / len(dom_ready_times)
-            }
-        
-        if element_counts:
-            stats['element_count'] = {
-                'min': min(element_counts),
-                'max': max(element_counts),
-                'avg': sum(element_counts) / len(element_counts)
-            }
-        
-        if resource_counts:
-            stats['resource_count'] = {
-                'min': min(resource_counts),
-                'max': max(resource_counts),
-                'avg': sum(resource_counts) / len(resource_counts)
-            }
+        accumulators = {name: _new_stat_accumulator() for name, _, _, _ in _PERF_STAT_FIELDS}
+        for sample in samples:
+            _accumulate_sample(accumulators, sample)
         
-        return stats
+        return _project_stats(accumulators)
     
-    async def create_diagnostic_report(self, page_id=None, session_id=None, include_artifacts=False):
+    async def create_diagnostic_report(self, page_id=None, session_id=None, include_artifacts=False,
+                                       inline_images=False, compress_html=False):
         """
         Create a comprehensive diagnostic report.
         
         Args:
             page_id: Optional page ID to focus report on
             session_id: Optional session ID (uses active session if not specified)
-            include_artifacts: Whether to include full artifacts or just references
+            include_artifacts: Whether to include full artifacts, with their stored payloads,
+                or just references
+            inline_images: Whether to embed screenshots in the HTML report as base64 for a
+                self-contained file, instead of linking the screenshot files
+            compress_html: Whether to write the HTML report compressed (.html.zst when the
+                zstandard package is installed, .html.gz otherwise)
             
         Returns:
             Diagnostic report data
@@ -983,39 +2143,33 @@ class WebDiagnosticToolkit:
         # Get session data
         session = self.diagnostic_sessions[session_id]
         
-        # Filter artifacts if needed
-        artifacts = session.get('artifacts', [])
+        # Artifacts grouped by type, for one page if requested (indexed as they were collected)
         if page_id:
-            artifacts = [a for a in artifacts if a.get('page_id') == page_id]
+            grouped_artifacts = session.get('artifacts_by_page', {}).get(page_id, {})
+        else:
+            grouped_artifacts = session.get('artifacts_by_type', {})
         
-        # Group artifacts by type
-        artifacts_by_type = {}
-        for artifact in artifacts:
-            artifact_type = artifact.get('type', 'unknown')
-            if artifact_type not in artifacts_by_type:
-                artifacts_by_type[artifact_type] = []
-            
-            # Include full artifact or just reference
-            if include_artifacts:
-                artifacts_by_type[artifact_type].append(artifact)
-            else:
-                # Include minimal information
-                artifacts_by_type[artifact_type].append({
-                    'timestamp': artifact.get('timestamp'),
-                    'page_id': artifact.get('page_id'),
-                    'path': artifact.get('path')
-                })
+        # Include full artifact or just reference
+        if include_artifacts:
+            artifacts_by_type = await self._load_artifact_contents(grouped_artifacts)
+        else:
+            # Include minimal information
+            artifacts_by_type = {
+                t: [
+                    {
+                        'timestamp': artifact.get('timestamp'),
+                        'page_id': artifact.get('page_id'),
+                        'path': artifact.get('path')
+                    }
+                    for artifact in group
+                ]
+                for t, group in grouped_artifacts.items()
+            }
         
         # Get performance statistics if available
         performance_stats = {}
         if 'performance_samples' in session:
-            samples = []
-            for p_id, page_samples in session['performance_samples'].items():
-                if not page_id or p_id == page_id:
-                    samples.extend(page_samples)
-            
-            if samples:
-                performance_stats = self._calculate_performance_stats(samples)
+            performance_stats = self._session_performance_stats(session_id, page_id)
         
         # Create report
         report = {
@@ -1029,7 +2183,7 @@ class WebDiagnosticToolkit:
             "artifact_counts": {k: len(v) for k, v in artifacts_by_type.items()},
             "artifacts_by_type": artifacts_by_type,
             "performance_stats": performance_stats,
-            "events": session.get('events', [])
+            "events": list(session.get('events', []))
         }
         
         # Save report
@@ -1039,444 +2193,486 @@ class WebDiagnosticToolkit:
         report_name += f"_{int(time.time())}.json"
         
         report_file = self.reports_dir / report_name
-        with open(report_file, 'w') as f:
-            json.dump(report, f, indent=2)
+        await asyncio.to_thread(self._write_report_file, report_file, report)
         
         report["report_path"] = str(report_file)
         
         # Create HTML report
-        html_report = await self._create_html_report(report, session)
+        html_report = await self._create_html_report(report, session, inline_images, compress_html)
         if html_report:
             report["html_report_path"] = html_report
         
         return report
     
-    async def _create_html_report(self, report_data, session):
-        """Create an HTML report from the report data."""
-        try:
-            # Create HTML report filename
-            report_name = f"report_{session['id']}_{int(time.time())}.html"
-            html_path = str(self.reports_dir / report_name)
+    async def _load_artifact_contents(self, grouped_artifacts):
+        """
+        Load the stored payloads of grouped artifacts, reading files concurrently.
+        
+        Args:
+            grouped_artifacts: Artifacts keyed by type
             
-            # Generate HTML content
-            html = f"""
-            <!DOCTYPE html>
-            <html>
-            <head>
-                <title>Diagnostic Report - {session.get('name', 'Unnamed Session')}</title>
-                <style>
-                    body {{ font-family: Arial, sans-serif; margin: 20px; line-height: 1.6; }}
-                    h1, h2, h3 {{ color: #333; }}
-                    .container {{ max-width: 1200px; margin: 0 auto; }}
-                    .card {{ 
-                        border: 1px solid #ddd; 
-                        border-radius: 4px; 
-                        padding: 15px; 
-                        margin-bottom: 20px;
-                        box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-                    }}
-                    .header {{ background-color: #f5f5f5; padding: 15px; border-radius: 4px; margin-bottom: 20px; }}
-                    .stats {{ display: flex; flex-wrap: wrap; gap: 10px; }}
-                    .stat-box {{ 
-                        flex: 1; 
-                        min-width: 200px; 
-                        background-color: #f8f8f8; 
-                        padding: 10px; 
-                        border-radius: 4px;
-                        border-left: 4px solid #007bff;
-                    }}
-                    .artifacts {{ margin-top: 20px; }}
-                    .artifact-group {{ margin-bottom: 30px; }}
-                    .tables {{ border-collapse: collapse; width: 100%; }}
-                    .tables th, .tables td {{ 
-                        border: 1px solid #ddd; 
-                        padding: 8px; 
-                        text-align: left;
-                    }}
-                    .tables th {{ background-color: #f2f2f2; }}
-                    .tables tr:nth-child(even) {{ background-color: #f9f9f9; }}
-                    .screenshot {{ max-width: 300px; border: 1px solid #ddd; margin: 10px 0; }}
-                    .tab {{ overflow: hidden; border: 1px solid #ccc; background-color: #f1f1f1; }}
-                    .tab button {{ 
-                        background-color: inherit; 
-                        float: left; 
-                        border: none; 
-                        outline: none; 
-                        cursor: pointer; 
-                        padding: 14px 16px; 
-                        transition: 0.3s;
-                    }}
-                    .tab button:hover {{ background-color: #ddd; }}
-                    .tab button.active {{ background-color: #ccc; }}
-                    .tabcontent {{ 
-                        display: none; 
-                        padding: 6px 12px; 
-                        border: 1px solid #ccc; 
-                        border-top: none;
-                    }}
-                </style>
-            </head>
-            <body>
-                <div class="container">
-                    <div class="header">
-                        <h1>Diagnostic Report</h1>
-                        <p><strong>Session:</strong> {session.get('name', 'Unnamed')}</p>
-                        <p><strong>Created:</strong> {session.get('created_at', 'Unknown')}</p>
-                        <p><strong>Report Generated:</strong> {report_data.get('generated_at', 'Unknown')}</p>
-                        {f"<p><strong>Page ID:</strong> {report_data.get('page_id', 'All pages')}</p>" if report_data.get('page_id') else ""}
-                    </div>
-                    
-                    <div class="tab">
-                        <button class="tablinks active" onclick="openTab(event, 'Summary')">Summary</button>
-                        <button class="tablinks" onclick="openTab(event, 'Performance')">Performance</button>
-                        <button class="tablinks" onclick="openTab(event, 'Artifacts')">Artifacts</button>
-                        <button class="tablinks" onclick="openTab(event, 'Events')">Events</button>
-                        <button class="tablinks" onclick="openTab(event, 'Screenshots')">Screenshots</button>
-                    </div>
-                    
-                    <div id="Summary" class="tabcontent" style="display: block;">
-                        <h2>Summary</h2>
-                        <div class="card">
-                            <h3>Artifact Counts</h3>
-                            <div class="stats">
-            """
-            
-            # Add artifact count stats
-            for artifact_type, count in report_data.get('artifact_counts', {}).items():
-                html += f"""
-                                <div class="stat-box">
-                                    <div>{artifact_type.replace('_', ' ').title()}</div>
-                                    <div style="font-size: 24px; font-weight: bold;">{count}</div>
-                                </div>
-                """
-            
-            html += """
+        Returns:
+            Artifacts keyed by type, each JSON artifact copied with its payload under "content"
+        """
+        semaphore = asyncio.Semaphore(ARTIFACT_LOAD_CONCURRENCY)
+        
+        async def load(artifact):
+            async with semaphore:
+                return await asyncio.to_thread(self._load_artifact_file, artifact['path'])
+        
+        # Screenshots are images, so only JSON artifacts are loaded
+        loadable = [
+            artifact for group in grouped_artifacts.values() for artifact in group
+            if artifact.get('type') != 'screenshot' and artifact.get('path')
+        ]
+        payloads = await asyncio.gather(*(load(artifact) for artifact in loadable), return_exceptions=True)
+        
+        contents = {}
+        for artifact, payload in zip(loadable, payloads):
+            if isinstance(payload, Exception):
+                logger.error(f"Error loading artifact {artifact['path']}: {str(payload)}")
+            else:
+                contents[id(artifact)] = payload
+        
+        return {
+            t: [
+                {**artifact, "content": contents[id(artifact)]} if id(artifact) in contents else artifact
+                for artifact in group
+            ]
+            for t, group in grouped_artifacts.items()
+        }
+    
+    @classmethod
+    def _write_html_file(cls, html_path, parts):
+        """
+        Write an HTML report to a file (blocking; run via asyncio.to_thread).
+        
+        Args:
+            html_path: Path of the report file; a .zst or .gz suffix compresses it while streaming
+            parts: Fragments from _render_html_report
+        """
+        # Consecutive text fragments are joined and UTF-8 encoded in batches of about
+        # _HTML_ENCODE_BATCH_SIZE characters, so there is one encode and write per batch while
+        # the whole document is never held as one string; inlined screenshots are encoded
+        # straight into the file
+        if html_path.endswith(('.zst', '.gz')):
+            f = cls._open_artifact(html_path, 'wb', threads=-1)
+        else:
+            f = open(html_path, 'wb', buffering=_REPORT_BUFFER_SIZE)
+        
+        with f:
+            f.write(_REPORT_PREFIX_BYTES)
+            
+            pending = []
+            pending_size = 0
+            for part in parts:
+                if isinstance(part, _InlineBase64):
+                    if pending:
+                        f.write(''.join(pending).encode('utf-8'))
+                        pending.clear()
+                        pending_size = 0
+                    try:
+                        st = os.stat(part.path)
+                        if st.st_size <= _BASE64_CACHE_MAX_FILE_SIZE:
+                            f.write(_encode_file_base64(part.path, st.st_mtime_ns, st.st_size))
+                        else:
+                            _write_base64_file(part.path, f)
+                    except OSError as e:
+                        logger.error(f"Error loading screenshot {part.path}: {str(e)}")
+                else:
+                    pending.append(part)
+                    pending_size += len(part)
+                    if pending_size >= _HTML_ENCODE_BATCH_SIZE:
+                        f.write(''.join(pending).encode('utf-8'))
+                        pending.clear()
+                        pending_size = 0
+            if pending:
+                f.write(''.join(pending).encode('utf-8'))
+            
+            f.write(_REPORT_SUFFIX_BYTES)
+    
+    @staticmethod
+    def _truncation_notice(total, report_data):
+        """HTML notice shown when a report section only lists the latest MAX_HTML_ROWS rows."""
+        if total <= MAX_HTML_ROWS:
+            return ""
+        
+        notice = f"Showing the latest {MAX_HTML_ROWS} of {total} rows."
+        report_path = report_data.get('report_path')
+        if report_path:
+            # The HTML report is written next to the JSON report, so a relative link works
+            report_name = _escape_html(os.path.basename(report_path))
+            notice += f' Full report: <a href="{report_name}">{report_name}</a>'
+        return f"<p><em>{notice}</em></p>"
+    
+    def _render_html_report(self, report_data, session, report_dir, inline_images=False):
+        """
+        Render an HTML report as a list of fragments (CPU-bound; run via asyncio.to_thread).
+        
+        Args:
+            report_data: Report data from create_diagnostic_report
+            session: Session the report belongs to
+            report_dir: Directory the HTML file is written to, for relative screenshot links
+            inline_images: Whether to embed screenshots as base64 instead of linking them
+            
+        Returns:
+            List of HTML fragments between the static report prefix and suffix; inlined
+            screenshots appear as _InlineBase64 entries that are encoded while writing
+        """
+        parts = [_REPORT_HEAD.format_map({
+            'title': _escape_html(session.get('name', 'Unnamed Session')),
+            'session_name': _escape_html(session.get('name', 'Unnamed')),
+            'created_at': _escape_html(session.get('created_at', 'Unknown')),
+            'generated_at': _escape_html(report_data.get('generated_at', 'Unknown')),
+            'page_id_line': f"<p><strong>Page ID:</strong> {_escape_html(report_data['page_id'])}</p>" if report_data.get('page_id') else ""
+        })]
+        
+        # Add artifact count stats
+        for artifact_type, count in report_data.get('artifact_counts', {}).items():
+            parts.append(f"""
+                            <div class="stat-box">
+                                <div>{_escape_html(artifact_type.replace('_', ' ').title())}</div>
+                                <div style="font-size: 24px; font-weight: bold;">{count}</div>
                             </div>
+            """)
+        
+        parts.append("""
                         </div>
-            """
-            
-            # Add performance summary if available
-            if report_data.get('performance_stats'):
-                html += """
-                        <div class="card">
-                            <h3>Performance Summary</h3>
-                            <div class="stats">
-                """
-                
-                stats = report_data['performance_stats']
-                
-                # Add load time
-                if 'load_time_ms' in stats:
-                    html += f"""
-                                <div class="stat-box">
-                                    <div>Load Time</div>
-                                    <div style="font-size: 24px; font-weight: bold;">{stats['load_time_ms']['avg']:.0f} ms</div>
-                                    <div>Min: {stats['load_time_ms']['min']:.0f} ms, Max: {stats['load_time_ms']['max']:.0f} ms</div>
-                                </div>
-                    """
-                
-                # Add DOM ready time
-                if 'dom_ready_time_ms' in stats:
-                    html += f"""
-                                <div class="stat-box">
-                                    <div>DOM Ready</div>
-                                    <div style="font-size: 24px; font-weight: bold;">{stats['dom_ready_time_ms']['avg']:.0f} ms</div>
-                                    <div>Min: {stats['dom_ready_time_ms']['min']:.0f} ms, Max: {stats['dom_ready_time_ms']['max']:.0f} ms</div>
-                                </div>
-                    """
-                
-                # Add memory usage
-                if 'memory_used_mb' in stats:
-                    html += f"""
-                                <div class="stat-box">
-                                    <div>Memory Usage</div>
-                                    <div style="font-size: 24px; font-weight: bold;">{stats['memory_used_mb']['avg']:.1f} MB</div>
-                                    <div>Min: {stats['memory_used_mb']['min']:.1f} MB, Max: {stats['memory_used_mb']['max']:.1f} MB</div>
-                                </div>
-                    """
-                
-                # Add element count
-                if 'element_count' in stats:
-                    html += f"""
-                                <div class="stat-box">
-                                    <div>DOM Elements</div>
-                                    <div style="font-size: 24px; font-weight: bold;">{stats['element_count']['avg']:.0f}</div>
-                                    <div>Min: {stats['element_count']['min']:.0f}, Max: {stats['element_count']['max']:.0f}</div>
-                                </div>
-                    """
-                
-                # Add resource count
-                if 'resource_count' in stats:
-                    html += f"""
-                                <div class="stat-box">
-                                    <div>Resources</div>
-                                    <div style="font-size: 24px; font-weight: bold;">{stats['resource_count']['avg']:.0f}</div>
-                                    <div>Min: {stats['resource_count']['min']:.0f}, Max: {stats['resource_count']['max']:.0f}</div>
-                                </div>
-                    """
-                
-                html += """
+                    </div>
+        """)
+        
+        # Add performance summary if available
+        if report_data.get('performance_stats'):
+            parts.append("""
+                    <div class="card">
+                        <h3>Performance Summary</h3>
+                        <div class="stats">
+            """)
+            
+            stats = report_data['performance_stats']
+            
+            # Add load time
+            if 'load_time_ms' in stats:
+                parts.append(f"""
+                            <div class="stat-box">
+                                <div>Load Time</div>
+                                <div style="font-size: 24px; font-weight: bold;">{stats['load_time_ms']['avg']:.0f} ms</div>
+                                <div>Min: {stats['load_time_ms']['min']:.0f} ms, Max: {stats['load_time_ms']['max']:.0f} ms</div>
                             </div>
-                        </div>
-                """
+                """)
+            
+            # Add DOM ready time
+            if 'dom_ready_time_ms' in stats:
+                parts.append(f"""
+                            <div class="stat-box">
+                                <div>DOM Ready</div>
+                                <div style="font-size: 24px; font-weight: bold;">{stats['dom_ready_time_ms']['avg']:.0f} ms</div>
+                                <div>Min: {stats['dom_ready_time_ms']['min']:.0f} ms, Max: {stats['dom_ready_time_ms']['max']:.0f} ms</div>
+                            </div>
+                """)
+            
+            # Add memory usage
+            if 'memory_used_mb' in stats:
+                parts.append(f"""
+                            <div class="stat-box">
+                                <div>Memory Usage</div>
+                                <div style="font-size: 24px; font-weight: bold;">{stats['memory_used_mb']['avg']:.1f} MB</div>
+                                <div>Min: {stats['memory_used_mb']['min']:.1f} MB, Max: {stats['memory_used_mb']['max']:.1f} MB</div>
+                            </div>
+                """)
+            
+            # Add element count
+            if 'element_count' in stats:
+                parts.append(f"""
+                            <div class="stat-box">
+                                <div>DOM Elements</div>
+                                <div style="font-size: 24px; font-weight: bold;">{stats['element_count']['avg']:.0f}</div>
+                                <div>Min: {stats['element_count']['min']:.0f}, Max: {stats['element_count']['max']:.0f}</div>
+                            </div>
+                """)
+            
+            # Add resource count
+            if 'resource_count' in stats:
+                parts.append(f"""
+                            <div class="stat-box">
+                                <div>Resources</div>
+                                <div style="font-size: 24px; font-weight: bold;">{stats['resource_count']['avg']:.0f}</div>
+                                <div>Min: {stats['resource_count']['min']:.0f}, Max: {stats['resource_count']['max']:.0f}</div>
+                            </div>
+                """)
             
-            html += """
+            parts.append("""
+                        </div>
                     </div>
-                    
-                    <div id="Performance" class="tabcontent">
-                        <h2>Performance Metrics</h2>
-            """
-            
-            # Add performance details
-            if report_data.get('performance_stats'):
-                html += """
-                        <div class="card">
-                            <h3>Performance Statistics</h3>
-                            <table class="tables">
-                                <tr>
-                                    <th>Metric</th>
-                                    <th>Average</th>
-                                    <th>Minimum</th>
-                                    <th>Maximum</th>
-                                </tr>
-                """
-                
-                stats = report_data['performance_stats']
-                
-                # Add load time
-                if 'load_time_ms' in stats:
-                    html += f"""
-                                <tr>
-                                    <td>Page Load Time</td>
-                                    <td>{stats['load_time_ms']['avg']:.1f} ms</td>
-                                    <td>{stats['load_time_ms']['min']:.1f} ms</td>
-                                    <td>{stats['load_time_ms']['max']:.1f} ms</td>
-                                </tr>
-                    """
-                
-                # Add DOM ready time
-                if 'dom_ready_time_ms' in stats:
-                    html += f"""
-                                <tr>
-                                    <td>DOM Content Loaded</td>
-                                    <td>{stats['dom_ready_time_ms']['avg']:.1f} ms</td>
-                                    <td>{stats['dom_ready_time_ms']['min']:.1f} ms</td>
-                                    <td>{stats['dom_ready_time_ms']['max']:.1f} ms</td>
-                                </tr>
-                    """
-                
-                # Add memory usage
-                if 'memory_used_mb' in stats:
-                    html += f"""
-                                <tr>
-                                    <td>Memory Usage</td>
-                                    <td>{stats['memory_used_mb']['avg']:.1f} MB</td>
-                                    <td>{stats['memory_used_mb']['min']:.1f} MB</td>
-                                    <td>{stats['memory_used_mb']['max']:.1f} MB</td>
-                                </tr>
-                    """
-                
-                # Add element count
-                if 'element_count' in stats:
-                    html += f"""
-                                <tr>
-                                    <td>DOM Elements</td>
-                                    <td>{stats['element_count']['avg']:.0f}</td>
-                                    <td>{stats['element_count']['min']:.0f}</td>
-                                    <td>{stats['element_count']['max']:.0f}</td>
-                                </tr>
-                    """
-                
-                # Add resource count
-                if 'resource_count' in stats:
-                    html += f"""
-                                <tr>
-                                    <td>Resource Count</td>
-                                    <td>{stats['resource_count']['avg']:.0f}</td>
-                                    <td>{stats['resource_count']['min']:.0f}</td>
-                                    <td>{stats['resource_count']['max']:.0f}</td>
-                                </tr>
-                    """
+            """)
+        
+        parts.append("""
+                </div>
                 
-                html += """
-                            </table>
-                        </div>
-                """
-            else:
-                html += """
-                        <div class="card">
-                            <p>No performance metrics available.</p>
-                        </div>
-                """
-            
-            html += """
+                <div id="Performance" class="tabcontent">
+                    <h2>Performance Metrics</h2>
+        """)
+        
+        # Add performance details
+        if report_data.get('performance_stats'):
+            parts.append("""
+                    <div class="card">
+                        <h3>Performance Statistics</h3>
+                        <table class="tables">
+                            <tr>
+                                <th>Metric</th>
+                                <th>Average</th>
+                                <th>Minimum</th>
+                                <th>Maximum</th>
+                            </tr>
+            """)
+            
+            stats = report_data['performance_stats']
+            
+            # Add load time
+            if 'load_time_ms' in stats:
+                parts.append(f"""
+                            <tr>
+                                <td>Page Load Time</td>
+                                <td>{stats['load_time_ms']['avg']:.1f} ms</td>
+                                <td>{stats['load_time_ms']['min']:.1f} ms</td>
+                                <td>{stats['load_time_ms']['max']:.1f} ms</td>
+                            </tr>
+                """)
+            
+            # Add DOM ready time
+            if 'dom_ready_time_ms' in stats:
+                parts.append(f"""
+                            <tr>
+                                <td>DOM Content Loaded</td>
+                                <td>{stats['dom_ready_time_ms']['avg']:.1f} ms</td>
+                                <td>{stats['dom_ready_time_ms']['min']:.1f} ms</td>
+                                <td>{stats['dom_ready_time_ms']['max']:.1f} ms</td>
+                            </tr>
+                """)
+            
+            # Add memory usage
+            if 'memory_used_mb' in stats:
+                parts.append(f"""
+                            <tr>
+                                <td>Memory Usage</td>
+                                <td>{stats['memory_used_mb']['avg']:.1f} MB</td>
+                                <td>{stats['memory_used_mb']['min']:.1f} MB</td>
+                                <td>{stats['memory_used_mb']['max']:.1f} MB</td>
+                            </tr>
+                """)
+            
+            # Add element count
+            if 'element_count' in stats:
+                parts.append(f"""
+                            <tr>
+                                <td>DOM Elements</td>
+                                <td>{stats['element_count']['avg']:.0f}</td>
+                                <td>{stats['element_count']['min']:.0f}</td>
+                                <td>{stats['element_count']['max']:.0f}</td>
+                            </tr>
+                """)
+            
+            # Add resource count
+            if 'resource_count' in stats:
+                parts.append(f"""
+                            <tr>
+                                <td>Resource Count</td>
+                                <td>{stats['resource_count']['avg']:.0f}</td>
+                                <td>{stats['resource_count']['min']:.0f}</td>
+                                <td>{stats['resource_count']['max']:.0f}</td>
+                            </tr>
+                """)
+            
+            parts.append("""
+                        </table>
                     </div>
-                    
-                    <div id="Artifacts" class="tabcontent">
-                        <h2>Collected Artifacts</h2>
-            """
-            
-            # Add artifacts by type
-            artifacts_by_type = report_data.get('artifacts_by_type', {})
-            for artifact_type, artifacts in artifacts_by_type.items():
-                if not artifacts:
-                    continue
+            """)
+        else:
+            parts.append("""
+                    <div class="card">
+                        <p>No performance metrics available.</p>
+                    </div>
+            """)
+        
+        parts.append("""
+                </div>
                 
-                html += f"""
-                        <div class="artifact-group card">
-                            <h3>{artifact_type.replace('_', ' ').title()} ({len(artifacts)})</h3>
-                            <table class="tables">
-                                <tr>
-                                    <th>Timestamp</th>
-                                    <th>Page ID</th>
-                                    <th>File Path</th>
-                                </tr>
-                """
+                <div id="Artifacts" class="tabcontent">
+                    <h2>Collected Artifacts</h2>
+        """)
+        
+        # Add artifacts by type (latest rows only)
+        artifacts_by_type = report_data.get('artifacts_by_type', {})
+        for artifact_type, artifacts in artifacts_by_type.items():
+            if not artifacts:
+                continue
+            
+            parts.append(f"""
+                    <div class="artifact-group card">
+                        <h3>{_escape_html(artifact_type.replace('_', ' ').title())} ({len(artifacts)})</h3>
+                        {self._truncation_notice(len(artifacts), report_data)}
+                        <table class="tables">
+                            <tr>
+                                <th>Timestamp</th>
+                                <th>Page ID</th>
+                                <th>File Path</th>
+                            </tr>
+            """)
+            
+            for artifact in artifacts[-MAX_HTML_ROWS:]:
+                timestamp_str = _format_timestamp(artifact.get('timestamp'))
                 
-                for artifact in artifacts:
-                    timestamp_str = datetime.fromtimestamp(artifact.get('timestamp', 0) / 1000).strftime('%Y-%m-%d %H:%M:%S') if artifact.get('timestamp') else 'Unknown'
-                    
-                    html += f"""
-                                <tr>
-                                    <td>{timestamp_str}</td>
-                                    <td>{artifact.get('page_id', 'Unknown')}</td>
-                                    <td>{artifact.get('path', 'N/A')}</td>
-                                </tr>
-                    """
+                parts.append(f"""
+                            <tr>
+                                <td>{timestamp_str}</td>
+                                <td>{_escape_html(artifact.get('page_id', 'Unknown'))}</td>
+                                <td>{_escape_html(artifact.get('path', 'N/A'))}</td>
+                            </tr>
+                """)
+            
+            parts.append("""
+                        </table>
+                    </div>
+            """)
+        
+        parts.append("""
+                </div>
                 
-                html += """
-                            </table>
-                        </div>
-                """
-            
-            html += """
+                <div id="Events" class="tabcontent">
+                    <h2>Session Events</h2>
+        """)
+        
+        # Add events (latest rows only)
+        events = report_data.get('events', [])
+        if events:
+            parts.append(f"""
+                    <div class="card">
+                        {self._truncation_notice(len(events), report_data)}
+                        <table class="tables">
+                            <tr>
+                                <th>Timestamp</th>
+                                <th>Type</th>
+                                <th>Page ID</th>
+                                <th>Details</th>
+                            </tr>
+            """)
+            
+            for event in events[-MAX_HTML_ROWS:]:
+                # Each row, details included, becomes a single fragment
+                details = ''.join(
+                    f"<strong>{_escape_html(key)}:</strong> {_escape_html(value)}<br>"
+                    for key, value in event.items()
+                    if key not in _EVENT_COLUMN_KEYS
+                )
+                parts.append(f"""
+                            <tr>
+                                <td>{_escape_html(event.get('timestamp', 'Unknown'))}</td>
+                                <td>{_escape_html(event.get('type', 'Unknown').replace('_', ' ').title())}</td>
+                                <td>{_escape_html(event.get('page_id', 'N/A'))}</td>
+                                <td>
+                {details}
+                                </td>
+                            </tr>
+                """)
+            
+            parts.append("""
+                        </table>
                     </div>
-                    
-                    <div id="Events" class="tabcontent">
-                        <h2>Session Events</h2>
-            """
-            
-            # Add events
-            events = report_data.get('events', [])
-            if events:
-                html += """
-                        <div class="card">
-                            <table class="tables">
-                                <tr>
-                                    <th>Timestamp</th>
-                                    <th>Type</th>
-                                    <th>Page ID</th>
-                                    <th>Details</th>
-                                </tr>
-                """
+            """)
+        else:
+            parts.append("""
+                    <div class="card">
+                        <p>No session events recorded.</p>
+                    </div>
+            """)
+        
+        parts.append("""
+                </div>
                 
-                for event in events:
-                    html += f"""
-                                <tr>
-                                    <td>{event.get('timestamp', 'Unknown')}</td>
-                                    <td>{event.get('type', 'Unknown').replace('_', ' ').title()}</td>
-                                    <td>{event.get('page_id', 'N/A')}</td>
-                                    <td>
-                    """
+                <div id="Screenshots" class="tabcontent">
+                    <h2>Screenshots</h2>
+        """)
+        
+        # Add screenshots
+        screenshots = artifacts_by_type.get('screenshot', [])[-MAX_HTML_ROWS:]
+        if screenshots:
+            parts.append("""
+                    <div class="card">
+                        <div style="display: flex; flex-wrap: wrap; gap: 20px;">
+            """)
+            
+            for screenshot in screenshots:
+                if 'path' in screenshot:
+                    timestamp_str = _format_timestamp(screenshot.get('timestamp'))
                     
-                    # Add event details
-                    for key, value in event.items():
-                        if key not in ['timestamp', 'type', 'page_id']:
-                            html += f"<strong>{key}:</strong> {value}<br>"
-                    
-                    html += """
-                                    </td>
-                                </tr>
-                    """
-                
-                html += """
-                            </table>
-                        </div>
-                """
-            else:
-                html += """
-                        <div class="card">
-                            <p>No session events recorded.</p>
-                        </div>
-                """
-            
-            html += """
-                    </div>
+                    if not os.path.isfile(screenshot['path']):
+                        logger.error(f"Error loading screenshot {screenshot['path']}: file not found")
+                        continue
                     
-                    <div id="Screenshots" class="tabcontent">
-                        <h2>Screenshots</h2>
-            """
-            
-            # Add screenshots
-            screenshots = artifacts_by_type.get('screenshot', [])
-            if screenshots:
-                html += """
-                        <div class="card">
-                            <div style="display: flex; flex-wrap: wrap; gap: 20px;">
-                """
-                
-                for screenshot in screenshots:
-                    if 'path' in screenshot:
-                        timestamp_str = datetime.fromtimestamp(screenshot.get('timestamp', 0) / 1000).strftime('%Y-%m-%d %H:%M:%S') if screenshot.get('timestamp') else 'Unknown'
-                        
-                        # Read the image as base64
-                        try:
-                            with open(screenshot['path'], 'rb') as img_file:
-                                img_data = base64.b64encode(img_file.read()).decode('utf-8')
-                            
-                            html += f"""
-                                <div style="width: 300px; margin-bottom: 20px;">
-                                    <img src="data:image/png;base64,{img_data}" class="screenshot" />
-                                    <div>Page: {screenshot.get('page_id', 'Unknown')}</div>
-                                    <div>Time: {timestamp_str}</div>
-                                </div>
-                            """
-                        except Exception as e:
-                            logger.error(f"Error loading screenshot {screenshot['path']}: {str(e)}")
-                
-                html += """
+                    parts.append("""
+                            <div style="width: 300px; margin-bottom: 20px;">
+                                <img src=\"""")
+                    if inline_images:
+                        # The image data is base64-encoded into the file by _write_html_file
+                        parts.append(f"data:image/{_escape_html(screenshot.get('format', 'png'))};base64,")
+                        parts.append(_InlineBase64(screenshot['path']))
+                    else:
+                        # Linked relative to the report, so the browser loads the file itself
+                        relative_path = Path(os.path.relpath(screenshot['path'], report_dir)).as_posix()
+                        parts.append(_escape_html(quote(relative_path)))
+                    parts.append(f"""" class="screenshot" />
+                                <div>Page: {_escape_html(screenshot.get('page_id', 'Unknown'))}</div>
+                                <div>Time: {timestamp_str}</div>
                             </div>
-                        </div>
-                """
-            else:
-                html += """
-                        <div class="card">
-                            <p>No screenshots available.</p>
-                        </div>
-                """
+                        """)
             
-            html += """
+            parts.append("""
+                        </div>
                     </div>
-                </div>
-                
-                <script>
-                    function openTab(evt, tabName) {
-                        var i, tabcontent, tablinks;
-                        tabcontent = document.getElementsByClassName("tabcontent");
-                        for (i = 0; i < tabcontent.length; i++) {
-                            tabcontent[i].style.display = "none";
-                        }
-                        tablinks = document.getElementsByClassName("tablinks");
-                        for (i = 0; i < tablinks.length; i++) {
-                            tablinks[i].className = tablinks[i].className.replace(" active", "");
-                        }
-                        document.getElementById(tabName).style.display = "block";
-                        evt.currentTarget.className += " active";
-                    }
-                </script>
-            </body>
-            </html>
-            """
+            """)
+        else:
+            parts.append("""
+                    <div class="card">
+                        <p>No screenshots available.</p>
+                    </div>
+            """)
+        
+        return parts
+    
+    async def _create_html_report(self, report_data, session, inline_images=False, compress_html=False):
+        """Create an HTML report from the report data."""
+        try:
+            # Create HTML report filename
+            report_name = f"report_{session['id']}_{int(time.time())}.html"
+            if compress_html:
+                report_name += ".zst" if zstandard else ".gz"
+            html_path = str(self.reports_dir / report_name)
             
-            # Write HTML to file
-            with open(html_path, 'w') as f:
-                f.write(html)
+            # Render and write off the event loop, as separate CPU and IO steps
+            parts = await asyncio.to_thread(self._render_html_report, report_data, session,
+                                            self.reports_dir, inline_images)
+            await asyncio.to_thread(self._write_html_file, html_path, parts)
             
             return html_path
         except Exception as e:
             logger.error(f"Error creating HTML report: {str(e)}")
             return None
     
+    @staticmethod
+    def _session_summary(session, active_session_id):
+        """Summary of an in-memory session, as listed by get_all_sessions."""
+        return {
+            "id": session["id"],
+            "name": session.get('name'),
+            "description": session.get('description'),
+            "created_at": session.get('created_at'),
+            "artifact_count": len(session.get('artifacts', ())),
+            "artifact_counts_by_type": dict(session.get('artifact_counts', ())),
+            "event_count": session.get('event_count', 0),
+            "is_active": session["id"] == active_session_id
+        }
+    
     async def get_all_sessions(self):
         """
         Get all diagnostic sessions.
@@ -1484,29 +2680,27 @@ class WebDiagnosticToolkit:
         Returns:
             Dict with session information
         """
-        # Create a summary of sessions
-        sessions_summary = []
-        for session_id, session in self.diagnostic_sessions.items():
-            # Calculate artifact counts by type
-            artifact_counts = {}
-            for artifact in session.get('artifacts', []):
-                artifact_type = artifact.get('type', 'unknown')
-                artifact_counts[artifact_type] = artifact_counts.get(artifact_type, 0) + 1
-            
-            # Add session summary
-            sessions_summary.append({
-                "id": session_id,
-                "name": session.get('name'),
-                "description": session.get('description'),
-                "created_at": session.get('created_at'),
-                "artifact_count": len(session.get('artifacts', [])),
-                "artifact_counts_by_type": artifact_counts,
-                "event_count": len(session.get('events', [])),
-                "is_active": session_id == self.active_session_id
-            })
-        
-        # Sort by creation time (newest first)
-        sessions_summary.sort(key=lambda s: s.get('created_at', ''), reverse=True)
+        # Newest first from the index; sessions loaded in memory report their live counts
+        active_session_id = self.active_session_id
+        sessions = self.diagnostic_sessions
+        with self._session_index_lock:
+            rows = self._session_index.execute(
+                "SELECT id, name, description, created_at, artifact_count, artifact_counts, event_count "
+                "FROM sessions ORDER BY created_at_ns DESC"
+            ).fetchall()
+        sessions_summary = [
+            self._session_summary(sessions[row[0]], active_session_id) if row[0] in sessions else {
+                "id": row[0],
+                "name": row[1],
+                "description": row[2],
+                "created_at": row[3],
+                "artifact_count": row[4],
+                "artifact_counts_by_type": _json_loads(row[5] or '{}'),
+                "event_count": row[6],
+                "is_active": row[0] == active_session_id
+            }
+            for row in rows
+        ]
         
         return {
             "sessions": sessions_summary,
@@ -1514,6 +2708,24 @@ class WebDiagnosticToolkit:
             "count": len(sessions_summary)
         }
     
+    @staticmethod
+    def _remove_session_dir(session_dir):
+        """Delete a session directory tree (blocking; run via asyncio.to_thread)."""
+        # Session directories are flat, so files are unlinked straight from the scandir
+        # listing without per-entry stat probes; anything unexpected falls back to rmtree
+        try:
+            with os.scandir(session_dir) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        shutil.rmtree(entry.path, ignore_errors=True)
+                    else:
+                        os.unlink(entry.path)
+            os.rmdir(session_dir)
+        except FileNotFoundError:
+            pass
+        except OSError:
+            shutil.rmtree(session_dir, ignore_errors=True)
+    
     async def clean_up_sessions(self, older_than_days=None, session_ids=None):
         """
         Clean up old diagnostic sessions.
@@ -1528,17 +2740,29 @@ class WebDiagnosticToolkit:
         sessions_to_clean = []
         
         if session_ids:
-            # Clean specific sessions
-            sessions_to_clean = [s_id for s_id in session_ids if s_id in self.diagnostic_sessions]
-        elif older_than_days:
-            # Clean sessions older than threshold
-            threshold = datetime.now() - timedelta(days=older_than_days)
-            threshold_str = threshold.isoformat()
-            
+            # Clean specific sessions, whether loaded in memory or only known to the index
+            placeholders = ', '.join('?' * len(session_ids))
+            with self._session_index_lock:
+                indexed = {
+                    row[0] for row in self._session_index.execute(
+                        f"SELECT id FROM sessions WHERE id IN ({placeholders})", list(session_ids)
+                    )
+                }
             sessions_to_clean = [
-                s_id for s_id, session in self.diagnostic_sessions.items()
-                if session.get('created_at', '') < threshold_str and s_id != self.active_session_id
+                s_id for s_id in session_ids
+                if s_id in self.diagnostic_sessions or s_id in indexed
             ]
+        elif older_than_days:
+            # Clean sessions older than threshold, compared as epoch nanoseconds
+            threshold_ns = time.time_ns() - int(older_than_days * 86400 * 1_000_000_000)
+            
+            with self._session_index_lock:
+                sessions_to_clean = [
+                    row[0] for row in self._session_index.execute(
+                        "SELECT id FROM sessions WHERE created_at_ns < ? AND id IS NOT ?",
+                        (threshold_ns, self.active_session_id)
+                    )
+                ]
         
         if not sessions_to_clean:
             return {
@@ -1547,22 +2771,37 @@ class WebDiagnosticToolkit:
                 "cleaned_count": 0
             }
         
-        # Delete sessions
-        cleaned_count = 0
+        # Remove from memory and the index on the event loop, then delete the directories
+        # concurrently in threads
+        session_dirs = []
         for session_id in sessions_to_clean:
-            try:
-                # Remove from memory
-                if session_id in self.diagnostic_sessions:
-                    del self.diagnostic_sessions[session_id]
-                    cleaned_count += 1
-                
-                # Remove directory
-                session_dir = self.diagnostic_dir / session_id
-                if session_dir.exists():
-                    import shutil
-                    shutil.rmtree(session_dir)
-            except Exception as e:
-                logger.error(f"Error cleaning session {session_id}: {str(e)}")
+            session = self.diagnostic_sessions.pop(session_id, None)
+            session_dir = session.get("_dir") if session is not None else None
+            session_dirs.append((session_id, session_dir or self._session_dir(session_id)))
+            
+            # Keep the delayed flush from writing into a removed directory
+            self._dirty_sessions.discard(session_id)
+            if session_id == self.active_session_id:
+                self.active_session_id = None
+        
+        # A write queued before the sessions were removed would bring back their rows and directories
+        await self._wait_for_metadata_writes()
+        with self._session_index_lock:
+            self._session_index.executemany(
+                "DELETE FROM sessions WHERE id = ?", [(session_id,) for session_id in sessions_to_clean]
+            )
+        cleaned_ids = set(sessions_to_clean)
+        for cache_key in [key for key in self._stats_cache if key[0] in cleaned_ids]:
+            del self._stats_cache[cache_key]
+        cleaned_count = len(session_dirs)
+        
+        results = await asyncio.gather(
+            *(asyncio.to_thread(self._remove_session_dir, session_dir) for _, session_dir in session_dirs),
+            return_exceptions=True
+        )
+        for (session_id, _), result in zip(session_dirs, results):
+            if isinstance(result, Exception):
+                logger.error(f"Error cleaning session {session_id}: {str(result)}")
         
         return {
             "success": True,
@@ -1570,6 +2809,208 @@ class WebDiagnosticToolkit:
             "cleaned_count": cleaned_count,
             "cleaned_sessions": sessions_to_clean
         }
+    
+    async def close(self):
+        """Stop monitoring, write pending session metadata and release CDP sessions, sample logs and the session index."""
+        await self.stop_performance_monitoring()
+        await asyncio.gather(*(self._detach_cdp_session(page_id) for page_id in list(self._cdp_sessions)))
+        
+        # The delayed flush may never fire (e.g. at exit), so pending metadata is written now
+        if self._metadata_flush_handle is not None:
+            self._metadata_flush_handle.cancel()
+            self._metadata_flush_handle = None
+        await self._wait_for_metadata_writes()
+        try:
+            self._write_session_metadata(self._take_dirty_metadata())
+        except Exception as e:
+            logger.error(f"Error saving session metadata: {str(e)}")
+        
+        with self._session_index_lock:
+            self._session_index.close()
+
+
+# Read-only response templates; _tool_response copies one and fills in a fresh content list
+_OK_TEMPLATE = MappingProxyType({"content": None, "success": True})
+_ERROR_TEMPLATE = MappingProxyType({"content": None, "success": False})
+
+
+def _tool_response(template, text, fields):
+    """
+    Build an MCP tool response from a module-level template.
+    
+    Args:
+        template: _OK_TEMPLATE or _ERROR_TEMPLATE
+        text: Text of the single content item
+        fields: Result fields added after the success flag
+        
+    Returns:
+        Dict with text content, the success flag and the given fields
+    """
+    response = template.copy()
+    response["content"] = [{"type": "text", "text": text}]
+    response.update(fields)
+    return response
+
+
+def _target(args, default):
+    """Describe the page a tool call targets, or ``default`` when it names none."""
+    page_id = args.get('page_id')
+    return f"page {page_id}" if page_id else default
+
+
+def _reported(result):
+    """Whether a toolkit result dict did not explicitly report failure."""
+    return result.get('success') != False
+
+
+@dataclass(frozen=True)
+class _DiagnosticTool:
+    """Logging and response building for one diagnostic MCP tool."""
+    method: str
+    action: str
+    log_message: Any
+    success: Any
+    succeeded: Any = None
+    failure: Any = None
+
+
+# Per-tool data driving the shared _invoke_tool coroutine. ``log_message`` takes the call
+# arguments, ``success``/``failure`` take the arguments and the toolkit result and return
+# (text, fields) and (text, error) respectively; ``succeeded`` defaults to always true.
+_DIAGNOSTIC_TOOLS = {
+    "create_diagnostic_session": _DiagnosticTool(
+        method="create_diagnostic_session",
+        action="creating diagnostic session",
+        log_message=lambda args: f"Creating diagnostic session: {args['name'] or 'Unnamed'}",
+        success=lambda args, session_id: (
+            f"Diagnostic session created: {session_id}",
+            {"session_id": session_id, "name": args['name'] or f"Diagnostic Session {session_id}"}
+        )
+    ),
+    "collect_web_diagnostics": _DiagnosticTool(
+        method="collect_full_diagnostic",
+        action="collecting web diagnostics",
+        log_message=lambda args: f"Collecting web diagnostics for page {args['page_id']}",
+        succeeded=lambda results: results.get('success'),
+        success=lambda args, results: (
+            f"Collected {len(results.get('artifacts', []))} diagnostic artifacts for page {args['page_id']}",
+            {
+                "session_id": results.get('session_id'),
+                "page_id": args['page_id'],
+                "artifacts_count": len(results.get('artifacts', [])),
+                "artifacts": results.get('artifacts', [])
+            }
+        ),
+        failure=lambda args, results: (
+            f"Error collecting diagnostics: {results.get('error', 'Unknown error')}",
+            results.get('error', 'Unknown error')
+        )
+    ),
+    "start_performance_monitoring": _DiagnosticTool(
+        method="start_performance_monitoring",
+        action="starting performance monitoring",
+        log_message=lambda args: f"Starting performance monitoring for page {args['page_id']}",
+        succeeded=bool,
+        success=lambda args, _: (
+            f"Performance monitoring started for page {args['page_id']} "
+            f"with {args['interval_seconds']}s interval",
+            {"page_id": args['page_id'], "interval_seconds": args['interval_seconds']}
+        ),
+        failure=lambda args, _: (
+            f"Failed to start performance monitoring for page {args['page_id']}",
+            "Page not found or monitoring already active"
+        )
+    ),
+    "stop_performance_monitoring": _DiagnosticTool(
+        method="stop_performance_monitoring",
+        action="stopping performance monitoring",
+        log_message=lambda args: f"Stopping performance monitoring for {_target(args, 'all pages')}",
+        succeeded=bool,
+        success=lambda args, _: (
+            f"Performance monitoring stopped for {_target(args, 'all pages')}",
+            {"page_id": args['page_id']}
+        ),
+        failure=lambda args, _: (
+            f"No active monitoring found for page {args['page_id']}",
+            "No active monitoring found"
+        )
+    ),
+    "get_performance_report": _DiagnosticTool(
+        method="get_performance_report",
+        action="generating performance report",
+        log_message=lambda args: f"Generating performance report for {_target(args, 'active session')}",
+        succeeded=_reported,
+        success=lambda args, report: (
+            f"Performance report generated with {report.get('sample_count', 0)} samples",
+            {
+                "page_id": args['page_id'],
+                "session_id": report.get('session_id'),
+                "sample_count": report.get('sample_count', 0),
+                "stats": report.get('stats', {})
+            }
+        ),
+        failure=lambda args, report: (
+            f"Error generating performance report: {report.get('error', 'No samples found')}",
+            report.get('error', 'No samples found')
+        )
+    ),
+    "create_web_diagnostic_report": _DiagnosticTool(
+        method="create_diagnostic_report",
+        action="creating web diagnostic report",
+        log_message=lambda args: f"Creating web diagnostic report for {_target(args, 'active session')}",
+        succeeded=_reported,
+        success=lambda args, report: (
+            "Diagnostic report created successfully",
+            {
+                "page_id": args['page_id'],
+                "session_id": report.get('session_id'),
+                "report_path": report.get('report_path'),
+                "html_report_path": report.get('html_report_path'),
+                "artifact_counts": report.get('artifact_counts', {})
+            }
+        ),
+        failure=lambda args, report: (
+            f"Error creating diagnostic report: {report.get('error', 'No valid session found')}",
+            report.get('error', 'No valid session found')
+        )
+    ),
+    "list_diagnostic_sessions": _DiagnosticTool(
+        method="get_all_sessions",
+        action="listing diagnostic sessions",
+        log_message=lambda args: "Listing diagnostic sessions",
+        success=lambda args, sessions: (
+            f"Found {sessions.get('count', 0)} diagnostic sessions",
+            {"sessions": sessions.get('sessions', []), "active_session_id": sessions.get('active_session_id')}
+        )
+    ),
+}
+
+
+async def _invoke_tool(toolkit, tool_name, **args):
+    """
+    Run a diagnostic MCP tool: log the call, await the toolkit method and build the response.
+    
+    Args:
+        toolkit: WebDiagnosticToolkit the tool delegates to
+        tool_name: Key of the tool in _DIAGNOSTIC_TOOLS
+        **args: Tool arguments, passed to the toolkit method as keywords
+        
+    Returns:
+        MCP tool response dict
+    """
+    tool = _DIAGNOSTIC_TOOLS[tool_name]
+    logger.info(tool.log_message(args))
+    try:
+        result = await getattr(toolkit, tool.method)(**args)
+        
+        if tool.succeeded is None or tool.succeeded(result):
+            text, fields = tool.success(args, result)
+            return _tool_response(_OK_TEMPLATE, text, fields)
+        text, error = tool.failure(args, result)
+        return _tool_response(_ERROR_TEMPLATE, text, {"error": error})
+    except Exception as e:
+        logger.error(f"Error {tool.action}: {str(e)}")
+        return _tool_response(_ERROR_TEMPLATE, f"Error {tool.action}: {str(e)}", {"error": str(e)})
 
 
 def register_web_diagnostic_tools(mcp, browser_manager):
@@ -1610,33 +3051,9 @@ def register_web_diagnostic_tools(mcp, browser_manager):
         Returns:
             Dict with session information
         """
-        logger.info(f"Creating diagnostic session: {name or 'Unnamed'}")
-        try:
-            session_id = await diagnostic_toolkit.create_diagnostic_session(name, description)
-            
-            return {
-                "content": [
-                    {
-                        "type": "text",
-                        "text": f"Diagnostic session created: {session_id}"
-                    }
-                ],
-                "success": True,
-                "session_id": session_id,
-                "name": name or f"Diagnostic Session {session_id}"
-            }
-        except Exception as e:
-            logger.error(f"Error creating diagnostic session: {str(e)}")
-            return {
-                "content": [
-                    {
-                        "type": "text",
-                        "text": f"Error creating diagnostic session: {str(e)}"
-                    }
-                ],
-                "success": False,
-                "error": str(e)
-            }
+        return await _invoke_tool(
+            diagnostic_toolkit, "create_diagnostic_session", name=name, description=description
+        )
     
     @mcp.tool()
     async def collect_web_diagnostics(page_id: str, options: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
@@ -1658,47 +3075,7 @@ def register_web_diagnostic_tools(mcp, browser_manager):
         Returns:
             Dict with diagnostic results
         """
-        logger.info(f"Collecting web diagnostics for page {page_id}")
-        try:
-            results = await diagnostic_toolkit.collect_full_diagnostic(page_id, options)
-            
-            if results.get('success'):
-                return {
-                    "content": [
-                        {
-                            "type": "text",
-                            "text": f"Collected {len(results.get('artifacts', []))} diagnostic artifacts for page {page_id}"
-                        }
-                    ],
-                    "success": True,
-                    "session_id": results.get('session_id'),
-                    "page_id": page_id,
-                    "artifacts_count": len(results.get('artifacts', [])),
-                    "artifacts": results.get('artifacts', [])
-                }
-            else:
-                return {
-                    "content": [
-                        {
-                            "type": "text",
-                            "text": f"Error collecting diagnostics: {results.get('error', 'Unknown error')}"
-                        }
-                    ],
-                    "success": False,
-                    "error": results.get('error', 'Unknown error')
-                }
-        except Exception as e:
-            logger.error(f"Error collecting web diagnostics: {str(e)}")
-            return {
-                "content": [
-                    {
-                        "type": "text",
-                        "text": f"Error collecting web diagnostics: {str(e)}"
-                    }
-                ],
-                "success": False,
-                "error": str(e)
-            }
+        return await _invoke_tool(diagnostic_toolkit, "collect_web_diagnostics", page_id=page_id, options=options)
     
     @mcp.tool()
     async def start_performance_monitoring(page_id: str, interval_seconds: int = 5) -> Dict[str, Any]:
@@ -1712,45 +3089,10 @@ def register_web_diagnostic_tools(mcp, browser_manager):
         Returns:
             Dict with monitoring status
         """
-        logger.info(f"Starting performance monitoring for page {page_id}")
-        try:
-            success = await diagnostic_toolkit.start_performance_monitoring(page_id, interval_seconds)
-            
-            if success:
-                return {
-                    "content": [
-                        {
-                            "type": "text",
-                            "text": f"Performance monitoring started for page {page_id} with {interval_seconds}s interval"
-                        }
-                    ],
-                    "success": True,
-                    "page_id": page_id,
-                    "interval_seconds": interval_seconds
-                }
-            else:
-                return {
-                    "content": [
-                        {
-                            "type": "text",
-                            "text": f"Failed to start performance monitoring for page {page_id}"
-                        }
-                    ],
-                    "success": False,
-                    "error": "Page not found or monitoring already active"
-                }
-        except Exception as e:
-            logger.error(f"Error starting performance monitoring: {str(e)}")
-            return {
-                "content": [
-                    {
-                        "type": "text",
-                        "text": f"Error starting performance monitoring: {str(e)}"
-                    }
-                ],
-                "success": False,
-                "error": str(e)
-            }
+        return await _invoke_tool(
+            diagnostic_toolkit, "start_performance_monitoring",
+            page_id=page_id, interval_seconds=interval_seconds
+        )
     
     @mcp.tool()
     async def stop_performance_monitoring(page_id: Optional[str] = None) -> Dict[str, Any]:
@@ -1763,44 +3105,7 @@ def register_web_diagnostic_tools(mcp, browser_manager):
         Returns:
             Dict with stopping status
         """
-        logger.info(f"Stopping performance monitoring for {'page ' + page_id if page_id else 'all pages'}")
-        try:
-            success = await diagnostic_toolkit.stop_performance_monitoring(page_id)
-            
-            if success:
-                return {
-                    "content": [
-                        {
-                            "type": "text",
-                            "text": f"Performance monitoring stopped for {'page ' + page_id if page_id else 'all pages'}"
-                        }
-                    ],
-                    "success": True,
-                    "page_id": page_id
-                }
-            else:
-                return {
-                    "content": [
-                        {
-                            "type": "text",
-                            "text": f"No active monitoring found for page {page_id}"
-                        }
-                    ],
-                    "success": False,
-                    "error": "No active monitoring found"
-                }
-        except Exception as e:
-            logger.error(f"Error stopping performance monitoring: {str(e)}")
-            return {
-                "content": [
-                    {
-                        "type": "text",
-                        "text": f"Error stopping performance monitoring: {str(e)}"
-                    }
-                ],
-                "success": False,
-                "error": str(e)
-            }
+        return await _invoke_tool(diagnostic_toolkit, "stop_performance_monitoring", page_id=page_id)
     
     @mcp.tool()
     async def get_performance_report(page_id: Optional[str] = None, session_id: Optional[str] = None) -> Dict[str, Any]:
@@ -1814,50 +3119,18 @@ def register_web_diagnostic_tools(mcp, browser_manager):
         Returns:
             Dict with performance report
         """
-        logger.info(f"Generating performance report for {'page ' + page_id if page_id else 'active session'}")
-        try:
-            report = await diagnostic_toolkit.get_performance_report(page_id, session_id)
-            
-            if report.get('success') != False:
-                return {
-                    "content": [
-                        {
-                            "type": "text",
-                            "text": f"Performance report generated with {report.get('sample_count', 0)} samples"
-                        }
-                    ],
-                    "success": True,
-                    "page_id": page_id,
-                    "session_id": report.get('session_id'),
-                    "sample_count": report.get('sample_count', 0),
-                    "stats": report.get('stats', {})
-                }
-            else:
-                return {
-                    "content": [
-                        {
-                            "type": "text",
-                            "text": f"Error generating performance report: {report.get('error', 'No samples found')}"
-                        }
-                    ],
-                    "success": False,
-                    "error": report.get('error', 'No samples found')
-                }
-        except Exception as e:
-            logger.error(f"Error generating performance report: {str(e)}")
-            return {
-                "content": [
-                    {
-                        "type": "text",
-                        "text": f"Error generating performance report: {str(e)}"
-                    }
-                ],
-                "success": False,
-                "error": str(e)
-            }
+        return await _invoke_tool(
+            diagnostic_toolkit, "get_performance_report", page_id=page_id, session_id=session_id
+        )
     
     @mcp.tool()
-    async def create_web_diagnostic_report(page_id: Optional[str] = None, session_id: Optional[str] = None, include_artifacts: bool = False) -> Dict[str, Any]:
+    async def create_web_diagnostic_report(
+        page_id: Optional[str] = None,
+        session_id: Optional[str] = None,
+        include_artifacts: bool = False,
+        inline_images: bool = False,
+        compress_html: bool = False
+    ) -> Dict[str, Any]:
         """
         Create a comprehensive diagnostic report.
         
@@ -1865,52 +3138,18 @@ def register_web_diagnostic_tools(mcp, browser_manager):
             page_id: Optional page ID to focus report on
             session_id: Optional session ID (uses active session if not specified)
             include_artifacts: Whether to include full artifacts or just references
+            inline_images: Whether to embed screenshots in the HTML report (self-contained file)
+                instead of linking the screenshot files
+            compress_html: Whether to write the HTML report compressed (.html.zst or .html.gz)
             
         Returns:
             Dict with report information
         """
-        logger.info(f"Creating web diagnostic report for {'page ' + page_id if page_id else 'active session'}")
-        try:
-            report = await diagnostic_toolkit.create_diagnostic_report(page_id, session_id, include_artifacts)
-            
-            if report.get('success') != False:
-                return {
-                    "content": [
-                        {
-                            "type": "text",
-                            "text": f"Diagnostic report created successfully"
-                        }
-                    ],
-                    "success": True,
-                    "page_id": page_id,
-                    "session_id": report.get('session_id'),
-                    "report_path": report.get('report_path'),
-                    "html_report_path": report.get('html_report_path'),
-                    "artifact_counts": report.get('artifact_counts', {})
-                }
-            else:
-                return {
-                    "content": [
-                        {
-                            "type": "text",
-                            "text": f"Error creating diagnostic report: {report.get('error', 'No valid session found')}"
-                        }
-                    ],
-                    "success": False,
-                    "error": report.get('error', 'No valid session found')
-                }
-        except Exception as e:
-            logger.error(f"Error creating web diagnostic report: {str(e)}")
-            return {
-                "content": [
-                    {
-                        "type": "text",
-                        "text": f"Error creating web diagnostic report: {str(e)}"
-                    }
-                ],
-                "success": False,
-                "error": str(e)
-            }
+        return await _invoke_tool(
+            diagnostic_toolkit, "create_web_diagnostic_report",
+            page_id=page_id, session_id=session_id, include_artifacts=include_artifacts,
+            inline_images=inline_images, compress_html=compress_html
+        )
     
     @mcp.tool()
     async def list_diagnostic_sessions() -> Dict[str, Any]:
@@ -1920,33 +3159,10 @@ def register_web_diagnostic_tools(mcp, browser_manager):
         Returns:
             Dict with session information
         """
-        logger.info("Listing diagnostic sessions")
-        try:
-            sessions = await diagnostic_toolkit.get_all_sessions()
-            
-            return {
-                "content": [
-                    {
-                        "type": "text",
-                        "text": f"Found {sessions.get('count', 0)} diagnostic sessions"
-                    }
-                ],
-                "success": True,
-                "sessions": sessions.get('sessions', []),
-                "active_session_id": sessions.get('active_session_id')
-            }
-        except Exception as e:
-            logger.error(f"Error listing diagnostic sessions: {str(e)}")
-            return {
-                "content": [
-                    {
-                        "type": "text",
-                        "text": f"Error listing diagnostic sessions: {str(e)}"
-                    }
-                ],
-                "success": False,
-                "error": str(e)
-            }
+        return await _invoke_tool(diagnostic_toolkit, "list_diagnostic_sessions")
+    
+    # Release the toolkit's resources when the process ends
+    atexit.register(lambda: asyncio.run(diagnostic_toolkit.close()))
     
     logger.info("Web diagnostic tools registered")
     
@@ -1960,4 +3176,4 @@ def register_web_diagnostic_tools(mcp, browser_manager):
         "get_performance_report": get_performance_report,
         "create_web_diagnostic_report": create_web_diagnostic_report,
         "list_diagnostic_sessions": list_diagnostic_sessions
-    }
\ No newline at end of file
+    }
@@ -1,12 +1,422 @@
 """Advanced Workflow Tools for Web Interaction."""
 
+import json
 import logging
 import asyncio
+import itertools
+import re
+from functools import lru_cache
 from typing import Dict, List, Optional, Any
 
+# C-backed HTML parser for structured extraction, with BeautifulSoup as fallback
+try:
+    from selectolax.parser import HTMLParser
+except ImportError:
+    HTMLParser = None
+
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Visible text content and meta tags of the current page, collected in one evaluate call
+_EXTRACT_CONTENT_SCRIPT = '''() => {
+    // Walk elements once with a tag check instead of matching div:not(:has(*)) per div
+    const ALLOWED_TAGS = new Set(['P', 'H1', 'H2', 'H3', 'H4', 'H5', 'H6', 'SPAN', 'A', 'LI', 'TD', 'TH']);
+    const walker = document.createTreeWalker(document.body, NodeFilter.SHOW_ELEMENT, {
+        acceptNode: el => (ALLOWED_TAGS.has(el.tagName) ||
+                           (el.tagName === 'DIV' && el.firstElementChild === null))
+            ? NodeFilter.FILTER_ACCEPT
+            : NodeFilter.FILTER_SKIP
+    });
+    
+    const lines = [];
+    for (let el = walker.nextNode(); el !== null; el = walker.nextNode()) {
+        if (el.offsetWidth === 0 || el.offsetHeight === 0) {
+            continue;
+        }
+        const content = el.textContent.trim();
+        if (content.length === 0) {
+            continue;
+        }
+        const style = window.getComputedStyle(el);
+        if (style.display !== 'none' && style.visibility !== 'hidden') {
+            lines.push(content);
+        }
+    }
+    const text = lines.join('\\n');
+    
+    const metadata = {};
+    
+    // Get meta tags
+    const metaTags = document.querySelectorAll('meta');
+    metaTags.forEach(tag => {
+        const name = tag.getAttribute('name') || tag.getAttribute('property');
+        const content = tag.getAttribute('content');
+        if (name && content) {
+            metadata[name] = content;
+        }
+    });
+    
+    return { text, metadata };
+}'''
+
+# Load state navigations wait for unless an action asks for another one
+# ("load", "networkidle", ...); networkidle can add seconds on pages with beacons
+DEFAULT_WAIT_UNTIL = "domcontentloaded"
+
+# First element whose own text contains one of the given lowercased keywords, found in
+# one pass over the text nodes instead of a :text-matches() query per keyword
+_FIND_BY_TEXT_SCRIPT = '''(keywords) => {
+    const root = document.body || document.documentElement;
+    const walker = document.createTreeWalker(root, NodeFilter.SHOW_TEXT);
+    for (let node = walker.nextNode(); node !== null; node = walker.nextNode()) {
+        const parent = node.parentElement;
+        if (parent === null || parent.tagName === 'SCRIPT' || parent.tagName === 'STYLE') {
+            continue;
+        }
+        const text = node.data.toLowerCase();
+        if (keywords.some(keyword => text.includes(keyword))) {
+            return parent;
+        }
+    }
+    return null;
+}'''
+
+# Structured data collectors run in the page, so only the extracted JSON crosses over
+# instead of the serialized document
+_JSON_LD_SCRIPT = '''() => Array.from(document.querySelectorAll('script[type="application/ld+json"]'))
+    .map(script => {
+        try {
+            return JSON.parse(script.textContent);
+        } catch (e) {
+            return null;
+        }
+    })
+    .filter(item => item !== null)'''
+
+_MICRODATA_SCRIPT = '''() => Array.from(document.querySelectorAll('[itemscope]:not([itemprop])'))
+    .map(item => {
+        const properties = {};
+        item.querySelectorAll('[itemprop]').forEach(prop => {
+            properties[prop.getAttribute('itemprop')] = prop.getAttribute('content') ||
+                prop.getAttribute('href') || prop.getAttribute('src') || prop.textContent.trim();
+        });
+        return { type: item.getAttribute('itemtype'), properties };
+    })'''
+
+# Extractor per structured data type; unknown types use "auto"
+_STRUCTURED_EXTRACT_SCRIPTS = {
+    "json-ld": f"() => ({{ 'json-ld': ({_JSON_LD_SCRIPT})() }})",
+    "microdata": f"() => ({{ microdata: ({_MICRODATA_SCRIPT})() }})",
+    "auto": f"() => ({{ 'json-ld': ({_JSON_LD_SCRIPT})(), microdata: ({_MICRODATA_SCRIPT})() }})"
+}
+
+# Seconds a single page operation of a workflow step may take unless the action sets "timeout"
+DEFAULT_ACTION_TIMEOUT = 30
+
+# Seconds to wait for a target element to be attached, since navigations no longer wait for
+# the network to go idle and content rendered by scripts may still be on its way
+DEFAULT_ELEMENT_WAIT = 5
+
+# Maximum number of pages a parallel workflow drives at once
+WORKFLOW_PARALLEL_PAGES = 4
+
+# Numbers for the IDs of workflow pages opened directly on the browser context
+_workflow_page_numbers = itertools.count(1)
+
+# Common element types and their selectors
+_ELEMENT_TYPES = {
+    "button": ("button", "input[type='button']", "input[type='submit']",
+               "[role='button']", "a.btn", ".button", ".btn"),
+    "link": ("a", "[role='link']"),
+    "input": ("input[type='text']", "input:not([type='button']):not([type='submit'])",
+              "textarea", "[contenteditable='true']"),
+    "search": ("input[type='search']", "input[placeholder*='search' i]",
+               "input[name*='search' i]", "input[aria-label*='search' i]"),
+    "menu": ("nav", "[role='navigation']", "ul.menu", ".navigation"),
+    "article": ("article", ".article", ".post", "main", "[role='main']", ".content"),
+    "image": ("img", "[role='img']", "svg", "figure")
+}
+
+# Element type selectors by description word, including plurals ("buttons")
+_ELEMENT_TYPE_INDEX = {
+    **{f"{elem_type}s": elem_selectors for elem_type, elem_selectors in _ELEMENT_TYPES.items()},
+    **_ELEMENT_TYPES
+}
+
+# Words of a description, without surrounding punctuation ("button." -> "button")
+_WORD_PATTERN = re.compile(r"[\w-]+")
+
+# Bare tag names used as selectors as-is; element-type keywords keep their richer selectors
+_TAG_NAMES = frozenset({
+    "a", "abbr", "address", "aside", "audio", "b", "blockquote", "body", "canvas",
+    "caption", "code", "dd", "details", "dialog", "div", "dl", "dt", "em", "fieldset",
+    "figcaption", "figure", "footer", "h1", "h2", "h3", "h4", "h5", "h6", "header",
+    "hr", "i", "iframe", "img", "label", "legend", "li", "main", "nav", "ol", "option",
+    "p", "picture", "pre", "section", "select", "small", "span", "strong", "summary",
+    "table", "tbody", "td", "textarea", "tfoot", "th", "thead", "tr", "ul", "video"
+}) - _ELEMENT_TYPES.keys()
+
+# Filler words that never identify an element on their own
+_STOPWORDS = frozenset({
+    "a", "an", "the", "at", "in", "on", "of", "to", "for", "with", "by", "from",
+    "and", "or", "this", "that", "its", "it", "is", "top", "bottom", "left", "right",
+    "page", "element", "field", "box", "big", "small", "main"
+})
+
+# Maximum number of description keywords turned into selectors and text matches
+_MAX_KEYWORDS = 3
+
+# Selector templates filled in per description keyword
+_ATTRIBUTE_SELECTOR_TEMPLATES = (
+    "[aria-label*='{k}' i]", "[placeholder*='{k}' i]", "[title*='{k}' i]",
+    "[alt*='{k}' i]", "[name*='{k}' i]"
+)
+_ID_CLASS_SELECTOR_TEMPLATES = ("#{k}", ".{k}", "[id*='{k}']", "[class*='{k}']")
+
+# Distinct element descriptions whose keywords and selectors stay cached at module level
+_SELECTOR_CACHE_SIZE = 1024
+
+# Descriptions starting with one of these are already CSS selectors (#id, .class, [attr])
+_SELECTOR_PREFIXES = ("#", ".", "[")
+
+
+@lru_cache(maxsize=_SELECTOR_CACHE_SIZE)
+def _description_keywords(description_lower):
+    """
+    Pick the keywords of a lowercased description worth matching against.
+    
+    Repeated words and stopwords are dropped and at most _MAX_KEYWORDS of the longest
+    remaining words are kept, in their original order; if only stopwords remain, all
+    words are used.
+    """
+    words = list(dict.fromkeys(description_lower.split()))
+    keywords = [word for word in words if word not in _STOPWORDS] or words
+    if len(keywords) > _MAX_KEYWORDS:
+        longest = set(sorted(keywords, key=len, reverse=True)[:_MAX_KEYWORDS])
+        keywords = [word for word in keywords if word in longest][:_MAX_KEYWORDS]
+    return tuple(keywords)
+
+
+@lru_cache(maxsize=_SELECTOR_CACHE_SIZE)
+def _selector_tiers(description_lower):
+    """
+    Generate CSS selectors for a lowercased element description, grouped by priority.
+    
+    Workflows often target the same description on every page, so results are
+    cached; tuples are returned so the cached value cannot be modified.
+    
+    Returns:
+        Tuple of selector tuples: element-type selectors and keyword attribute/ID/class
+        selectors (visible text is matched separately by _find_by_text)
+    """
+    type_selectors = []
+    keyword_selectors = []
+    
+    # Add type-based selectors; every word counts here, including ones dropped as keywords
+    for word in _WORD_PATTERN.findall(description_lower):
+        elem_selectors = _ELEMENT_TYPE_INDEX.get(word)
+        if elem_selectors is not None:
+            type_selectors.extend(elem_selectors)
+    
+    # Fall back to substring matching for compound words such as "searchbar"
+    if not type_selectors:
+        for elem_type, elem_selectors in _ELEMENT_TYPES.items():
+            if elem_type in description_lower:
+                type_selectors.extend(elem_selectors)
+    
+    # Add selectors for other keywords in the description
+    keywords = _description_keywords(description_lower)
+    keyword_selectors.extend(
+        template.format(k=keyword) for keyword in keywords for template in _ATTRIBUTE_SELECTOR_TEMPLATES
+    )
+    
+    # Add selectors for ID or class that might match
+    keyword_selectors.extend(
+        template.format(k=keyword) for keyword in keywords for template in _ID_CLASS_SELECTOR_TEMPLATES
+    )
+    
+    # Drop repeats, including keyword selectors already checked in the type tier
+    type_selectors = tuple(dict.fromkeys(type_selectors))
+    keyword_selectors = tuple(
+        selector for selector in dict.fromkeys(keyword_selectors) if selector not in type_selectors
+    )
+    return (type_selectors, keyword_selectors)
+
+
+def _is_selector_description(description):
+    """Whether a description already is a selector (#id, .class, [attr] or a bare tag name)."""
+    return description.startswith(_SELECTOR_PREFIXES) or description.lower() in _TAG_NAMES
+
+
+@lru_cache(maxsize=_SELECTOR_CACHE_SIZE)
+def _selector_batches(description):
+    """
+    Selector tiers for a description, each joined into one selector list: ((joined, selectors), ...).
+    
+    Descriptions that already are a selector (#id, .class, [attr] or a bare tag name)
+    are used as the only selector instead of generating tiers from their keywords.
+    """
+    if _is_selector_description(description):
+        return ((description, (description,)),)
+    return tuple((", ".join(tier), tier) for tier in _selector_tiers(description.lower()) if tier)
+
+
+def _parse_html(html_content):
+    """Parse page HTML with selectolax when installed, otherwise with BeautifulSoup and lxml."""
+    if HTMLParser is not None:
+        return HTMLParser(html_content)
+    
+    from bs4 import BeautifulSoup
+    return BeautifulSoup(html_content, 'lxml')
+
+
+def _json_ld_from_html(html_content):
+    """Collect the JSON-LD blocks of a page from its HTML, skipping blocks that fail to parse."""
+    tree = _parse_html(html_content)
+    selector = 'script[type="application/ld+json"]'
+    if HTMLParser is not None:
+        blocks = [node.text() for node in tree.css(selector)]
+    else:
+        blocks = [element.get_text() for element in tree.select(selector)]
+    
+    items = []
+    for block in blocks:
+        try:
+            items.append(json.loads(block))
+        except ValueError:
+            pass
+    return items
+
+
+async def _bounded(awaitable, timeout, operation):
+    """
+    Await a page operation for at most timeout seconds.
+    
+    Raises:
+        asyncio.TimeoutError: With a message naming the operation, so step errors stay readable
+    """
+    try:
+        return await asyncio.wait_for(awaitable, timeout)
+    except asyncio.TimeoutError:
+        raise asyncio.TimeoutError(f"{operation} timed out after {timeout} seconds") from None
+
+
+def _text_result(text, **fields):
+    """Build a step or tool result with a single text content item followed by the given fields."""
+    return {"content": [{"type": "text", "text": text}], **fields}
+
+
+async def _find_by_text(page, keywords):
+    """
+    Find the first element whose own text contains any of the keywords.
+    
+    Args:
+        page: Page to search
+        keywords: Lowercased keywords
+        
+    Returns:
+        Element handle, or None if no text matched
+    """
+    handle = await page.evaluate_handle(_FIND_BY_TEXT_SCRIPT, keywords)
+    element = handle.as_element()
+    if element is None:
+        await handle.dispose()
+    return element
+
+
+async def _release_element(element):
+    """Dispose an element handle from the text scan; locators hold no remote object."""
+    if not hasattr(element, "dispose"):
+        return
+    try:
+        await element.dispose()
+    except Exception as e:
+        logger.debug("Failed to dispose element handle: %s", e)
+
+
+async def _first_match(page, selector):
+    """Locator for the first element matching a selector, or None if nothing matches."""
+    locator = page.locator(selector).first
+    if await locator.count():
+        return locator
+    return None
+
+
+async def _wait_for_attached(page, selector, wait):
+    """
+    Wait up to wait seconds for an element matching a selector to be attached.
+    
+    Returns:
+        Whether a match appeared; timeouts and selectors that fail to parse both count as no
+    """
+    try:
+        await page.locator(selector).first.wait_for(state="attached", timeout=wait * 1000)
+        return True
+    except Exception:
+        return False
+
+
+async def _find_element(page, description, selector_cache=None, wait=DEFAULT_ELEMENT_WAIT):
+    """
+    Find the element best matching a description.
+    
+    The page is first given up to wait seconds for an element of the primary tier to
+    be attached, as elements rendered by scripts can appear after DOMContentLoaded.
+    Each priority tier is then checked as one comma-joined selector list, so the
+    browser matches a whole tier in a single round-trip; the first element in document
+    order from the highest tier with a match wins. If a tier's list fails to parse (for
+    example a keyword that is not a valid CSS identifier), its selectors are tried one
+    by one instead. Descriptions that are not selectors themselves then fall back to a
+    single text scan for their keywords.
+    
+    Matches are returned as locators, whose click() and fill() wait for the element
+    to be actionable and scroll it into view as part of the same call.
+    
+    Args:
+        page: Page to search
+        description: Element description
+        selector_cache: Optional dict mapping descriptions to their selector batches,
+            scoped to one workflow so repeated targets skip the shared cache lookup
+        wait: Seconds to wait for the primary tier to match
+        
+    Returns:
+        Locator (element handle for text-scan matches), or None if nothing matched
+    """
+    if selector_cache is None:
+        batches = _selector_batches(description)
+    else:
+        batches = selector_cache.get(description)
+        if batches is None:
+            batches = selector_cache[description] = _selector_batches(description)
+    
+    if batches and wait > 0:
+        await _wait_for_attached(page, batches[0][0], wait)
+    
+    for joined, selectors in batches:
+        try:
+            element = await _first_match(page, joined)
+        except Exception:
+            element = None
+            for selector in selectors:
+                try:
+                    element = await _first_match(page, selector)
+                    if element:
+                        break
+                except Exception:
+                    pass
+        if element:
+            return element
+    
+    if _is_selector_description(description):
+        return None
+    
+    try:
+        return await _find_by_text(page, list(_description_keywords(description.lower())))
+    except Exception as e:
+        logger.debug("Text scan for '%s' failed: %s", description, e)
+        return None
+
+
 def register_workflow_tools(mcp, browser_manager):
     """Register workflow tools with the MCP server."""
     
@@ -20,7 +430,8 @@ def register_workflow_tools(mcp, browser_manager):
     async def run_web_workflow(
         urls: List[str], 
         actions: List[Dict[str, Any]], 
-        data_extraction: Optional[Dict[str, Any]] = None
+        data_extraction: Optional[Dict[str, Any]] = None,
+        parallel: bool = False
     ) -> Dict[str, Any]:
         """
         Run a complete workflow across multiple pages.
@@ -29,32 +440,56 @@ def register_workflow_tools(mcp, browser_manager):
             urls: List of starting URLs for the workflow
             actions: List of actions to perform (see format below)
             data_extraction: Optional specifications for data to extract
+            parallel: Run the full action list against every URL concurrently, each on
+                its own page (up to WORKFLOW_PARALLEL_PAGES at a time). Only used when
+                the actions are URL-scoped, i.e. every navigate action names its URL.
             
         Action format:
             {
                 "type": "navigate"|"click"|"type"|"extract",
                 "target": "element description" (if applicable),
                 "value": "text to type" (if applicable),
-                "wait_after": seconds to wait (default: 1)
+                "wait_after": seconds to wait (default: 1),
+                "wait_until": load state for navigate actions (default: "domcontentloaded"),
+                "timeout": seconds each page operation may take (default: 30),
+                "element_wait": seconds to wait for a click or type target to appear (default: 5),
+                "focus_click": click the element before typing into it (default: false)
             }
             
         Returns:
             Dict with workflow results and extracted data
         """
-        logger.info(f"Running web workflow with {len(urls)} URLs and {len(actions)} actions")
+        logger.info("Running web workflow with %d URLs and %d actions", len(urls), len(actions))
+        if parallel and len(urls) > 1:
+            # Navigate actions without a value advance through urls, which ties the steps together
+            if all(action.get("value") for action in actions if action.get("type", "").lower() == "navigate"):
+                return await _run_parallel_workflow(urls, actions, data_extraction)
+            logger.warning("Workflow actions navigate through the URL list; running sequentially")
+        
+        page = None
+        page_id = None
+        managed_page = False
         try:            
-            # Create a new browser page for this workflow
-            page, page_id = await browser_manager.get_page()
+            # Open a short-lived page on the shared context when the manager exposes it. The
+            # manager does not track it, so it gets its own ID for the results and is closed below
+            if hasattr(browser_manager, "get_context"):
+                context = await browser_manager.get_context()
+                page = await context.new_page()
+                page_id = f"workflow-{next(_workflow_page_numbers)}"
+            else:
+                page, page_id = await browser_manager.get_page()
+                managed_page = True
             
             workflow_results = []
             extracted_data = []
+            selector_cache = {}
             
             # Track the current URL in the workflow
             current_url = ""
             
             # Start with the first URL
             if urls:
-                logger.info(f"Starting workflow with initial URL: {urls[0]}")
+                logger.info("Starting workflow with initial URL: %s", urls[0])
                 # Navigate directly using page object
                 try:
                     # Validate the URL
@@ -63,23 +498,18 @@ def register_workflow_tools(mcp, browser_manager):
                         url = f"https://{url}"
                     
                     # Navigate to the URL
-                    await page.goto(url, wait_until="networkidle")
+                    await _bounded(page.goto(url, wait_until=DEFAULT_WAIT_UNTIL), DEFAULT_ACTION_TIMEOUT, "Navigation")
                     
                     # Get page information
                     title = await page.title()
                     current_url = page.url
                     
-                    navigate_result = {
-                        "content": [
-                            {
-                                "type": "text",
-                                "text": f"Successfully navigated to {current_url} (Title: {title})"
-                            }
-                        ],
-                        "page_id": page_id,
-                        "url": current_url,
-                        "title": title
-                    }
+                    navigate_result = _text_result(
+                        f"Successfully navigated to {current_url} (Title: {title})",
+                        page_id=page_id,
+                        url=current_url,
+                        title=title
+                    )
                     
                     workflow_results.append({
                         "step": "initial_navigation",
@@ -87,15 +517,11 @@ def register_workflow_tools(mcp, browser_manager):
                         "result": navigate_result
                     })
                 except Exception as e:
-                    logger.error(f"Error navigating to {urls[0]}: {str(e)}")
-                    return {
-                        "content": [
-                            {
-                                "type": "text", 
-                                "text": f"Error running workflow: Failed to navigate to {urls[0]}: {str(e)}"
-                            }
-                        ]
-                    }
+                    logger.error("Error navigating to %s: %s", urls[0], e)
+                    return _text_result(
+                        f"Error running workflow: Failed to navigate to {urls[0]}: {str(e)}",
+                        page_id=page_id
+                    )
             
             # Execute each action in sequence
             for i, action in enumerate(actions):
@@ -103,8 +529,10 @@ def register_workflow_tools(mcp, browser_manager):
                 target = action.get("target", "")
                 value = action.get("value", "")
                 wait_after = action.get("wait_after", 1)
+                timeout = action.get("timeout", DEFAULT_ACTION_TIMEOUT)
+                element_wait = action.get("element_wait", DEFAULT_ELEMENT_WAIT)
                 
-                logger.info(f"Executing workflow action {i+1}: {action_type} {target} {value}")
+                logger.info("Executing workflow action %d: %s %s %s", i + 1, action_type, target, value)
                 step_result = None
                 
                 if action_type == "navigate":
@@ -117,192 +545,101 @@ def register_workflow_tools(mcp, browser_manager):
                                 nav_url = f"https://{nav_url}"
                             
                             # Navigate to the URL
-                            await page.goto(nav_url, wait_until="networkidle")
+                            await _bounded(
+                                page.goto(nav_url, wait_until=action.get("wait_until", DEFAULT_WAIT_UNTIL)),
+                                timeout,
+                                "Navigation"
+                            )
                             
                             # Get page information
                             title = await page.title()
                             current_url = page.url
                             
-                            step_result = {
-                                "content": [
-                                    {
-                                        "type": "text",
-                                        "text": f"Successfully navigated to {current_url} (Title: {title})"
-                                    }
-                                ],
-                                "page_id": page_id,
-                                "url": current_url,
-                                "title": title
-                            }
+                            step_result = _text_result(
+                                f"Successfully navigated to {current_url} (Title: {title})",
+                                page_id=page_id,
+                                url=current_url,
+                                title=title
+                            )
                         except Exception as e:
-                            logger.error(f"Error navigating to {nav_url}: {str(e)}")
-                            step_result = {
-                                "content": [
-                                    {
-                                        "type": "text", 
-                                        "text": f"Error navigating to {nav_url}: {str(e)}"
-                                    }
-                                ]
-                            }
+                            logger.error("Error navigating to %s: %s", nav_url, e)
+                            step_result = _text_result(f"Error navigating to {nav_url}: {str(e)}")
                 
                 elif action_type == "click" and target:
                     # Click on an element
                     try:
-                        # Find element with the description
-                        selectors = get_selectors_for_description(target)
-                        element = None
-                        
-                        # Try each selector until we find the element
-                        for selector in selectors:
-                            try:
-                                element = await page.query_selector(selector)
-                                if element:
-                                    break
-                            except:
-                                pass
+                        # Find element with the description, one check per selector tier
+                        element = await _bounded(_find_element(page, target, selector_cache, element_wait), timeout, f"Finding '{target}'")
                         
                         if element:
-                            # Ensure element is visible and scrolled into view
-                            await element.scroll_into_view_if_needed()
-                            await element.click()
+                            # click() waits for the element to be visible and scrolls it into view
+                            try:
+                                await _bounded(element.click(), timeout, "Click")
+                            finally:
+                                await _release_element(element)
                             
                             # Get updated page information
                             title = await page.title()
                             current_url = page.url
                             
-                            step_result = {
-                                "content": [
-                                    {
-                                        "type": "text",
-                                        "text": f"Clicked on {target}\nCurrent page: {title} ({current_url})"
-                                    }
-                                ],
-                                "action_performed": "click",
-                                "element_description": target,
-                                "url_after": current_url,
-                                "title_after": title
-                            }
+                            step_result = _text_result(
+                                f"Clicked on {target}\nCurrent page: {title} ({current_url})",
+                                action_performed="click",
+                                element_description=target,
+                                url_after=current_url,
+                                title_after=title
+                            )
                         else:
-                            step_result = {
-                                "content": [
-                                    {
-                                        "type": "text",
-                                        "text": f"No elements found matching '{target}'"
-                                    }
-                                ]
-                            }
+                            step_result = _text_result(f"No elements found matching '{target}'")
                     except Exception as e:
-                        logger.error(f"Error clicking on {target}: {str(e)}")
-                        step_result = {
-                            "content": [
-                                {
-                                    "type": "text", 
-                                    "text": f"Error clicking on {target}: {str(e)}"
-                                }
-                            ]
-                        }
+                        logger.error("Error clicking on %s: %s", target, e)
+                        step_result = _text_result(f"Error clicking on {target}: {str(e)}")
                 
                 elif action_type == "type" and target:
                     # Type into an element
                     try:
-                        # Find element with the description
-                        selectors = get_selectors_for_description(target)
-                        element = None
-                        
-                        # Try each selector until we find the element
-                        for selector in selectors:
-                            try:
-                                element = await page.query_selector(selector)
-                                if element:
-                                    break
-                            except:
-                                pass
+                        # Find element with the description, one check per selector tier
+                        element = await _bounded(_find_element(page, target, selector_cache, element_wait), timeout, f"Finding '{target}'")
                         
                         if element:
-                            await element.click()
-                            await element.fill(value)
+                            # fill() focuses the element itself; click first only when asked to
+                            try:
+                                if action.get("focus_click"):
+                                    await _bounded(element.click(), timeout, "Click")
+                                await _bounded(element.fill(value), timeout, "Typing")
+                            finally:
+                                await _release_element(element)
                             
-                            step_result = {
-                                "content": [
-                                    {
-                                        "type": "text",
-                                        "text": f"Typed '{value}' into {target}"
-                                    }
-                                ],
-                                "action_performed": "type",
-                                "element_description": target,
-                                "text_input": value
-                            }
+                            step_result = _text_result(
+                                f"Typed '{value}' into {target}",
+                                action_performed="type",
+                                element_description=target,
+                                text_input=value
+                            )
                         else:
-                            step_result = {
-                                "content": [
-                                    {
-                                        "type": "text",
-                                        "text": f"No elements found matching '{target}'"
-                                    }
-                                ]
-                            }
+                            step_result = _text_result(f"No elements found matching '{target}'")
                     except Exception as e:
-                        logger.error(f"Error typing into {target}: {str(e)}")
-                        step_result = {
-                            "content": [
-                                {
-                                    "type": "text", 
-                                    "text": f"Error typing into {target}: {str(e)}"
-                                }
-                            ]
-                        }
+                        logger.error("Error typing into %s: %s", target, e)
+                        step_result = _text_result(f"Error typing into {target}: {str(e)}")
                 
                 elif action_type == "extract":
                     # Extract data from the current page
                     if target == "content":
                         try:
-                            # Extract the visible text content
-                            text_content = await page.evaluate('''() => {
-                                return Array.from(document.body.querySelectorAll('p, h1, h2, h3, h4, h5, h6, span, a, li, td, th, div:not(:has(*))'))
-                                    .filter(el => {
-                                        const style = window.getComputedStyle(el);
-                                        return style.display !== 'none' && 
-                                               style.visibility !== 'hidden' && 
-                                               el.offsetWidth > 0 && 
-                                               el.offsetHeight > 0 &&
-                                               el.textContent.trim().length > 0;
-                                    })
-                                    .map(el => el.textContent.trim())
-                                    .join('\\n');
-                            }''')
-                            
-                            # Extract metadata
-                            metadata = await page.evaluate('''() => {
-                                const metadata = {};
-                                
-                                // Get meta tags
-                                const metaTags = document.querySelectorAll('meta');
-                                metaTags.forEach(tag => {
-                                    const name = tag.getAttribute('name') || tag.getAttribute('property');
-                                    const content = tag.getAttribute('content');
-                                    if (name && content) {
-                                        metadata[name] = content;
-                                    }
-                                });
-                                
-                                return metadata;
-                            }''')
+                            # Extract the visible text content and metadata in one round-trip
+                            extracted = await _bounded(page.evaluate(_EXTRACT_CONTENT_SCRIPT), timeout, "Content extraction")
+                            text_content = extracted['text']
+                            metadata = extracted['metadata']
                             
                             title = await page.title()
                             
-                            step_result = {
-                                "content": [
-                                    {
-                                        "type": "text",
-                                        "text": f"Content extracted from {current_url} (Title: {title})\n\nPage contains approximately {len(text_content.split())} words."
-                                    }
-                                ],
-                                "url": current_url,
-                                "title": title,
-                                "text_content": text_content,
-                                "metadata": metadata
-                            }
+                            step_result = _text_result(
+                                f"Content extracted from {current_url} (Title: {title})\n\nPage contains approximately {len(text_content.split())} words.",
+                                url=current_url,
+                                title=title,
+                                text_content=text_content,
+                                metadata=metadata
+                            )
                             
                             extracted_data.append({
                                 "url": current_url,
@@ -310,43 +647,36 @@ def register_workflow_tools(mcp, browser_manager):
                                 "data": step_result
                             })
                         except Exception as e:
-                            logger.error(f"Error extracting content: {str(e)}")
-                            step_result = {
-                                "content": [
-                                    {
-                                        "type": "text", 
-                                        "text": f"Error extracting content: {str(e)}"
-                                    }
-                                ]
-                            }
+                            logger.error("Error extracting content: %s", e)
+                            step_result = _text_result(f"Error extracting content: {str(e)}")
                     elif target == "structured":
                         try:
-                            from bs4 import BeautifulSoup
-                            
                             data_type = value if value else "auto"
-                            html_content = await page.content()
                             
-                            # Use BeautifulSoup for parsing
-                            soup = BeautifulSoup(html_content, 'lxml')
+                            # Extract in the page; if the script fails, JSON-LD (but not microdata,
+                            # which needs the live DOM) can still be parsed from the HTML
+                            script = _STRUCTURED_EXTRACT_SCRIPTS.get(data_type, _STRUCTURED_EXTRACT_SCRIPTS["auto"])
+                            try:
+                                data = await _bounded(page.evaluate(script), timeout, "Structured extraction")
+                            except Exception as e:
+                                if data_type == "microdata":
+                                    raise
+                                logger.warning("In-page structured extraction failed, parsing JSON-LD from HTML: %s", e)
+                                html_content = await _bounded(page.content(), timeout, "Reading page HTML")
+                                data = {"json-ld": _json_ld_from_html(html_content)}
                             
-                            # Extract structured data based on type (simplified version)
                             structured_data = {
                                 "type": data_type,
-                                "data": {},
+                                "data": data,
                                 "url": current_url,
                                 "title": await page.title()
                             }
                             
-                            step_result = {
-                                "content": [
-                                    {
-                                        "type": "text",
-                                        "text": f"Extracted structured data of type '{data_type}' from the page."
-                                    }
-                                ],
-                                "data_type": data_type,
-                                "structured_data": structured_data
-                            }
+                            step_result = _text_result(
+                                f"Extracted structured data of type '{data_type}' from the page.",
+                                data_type=data_type,
+                                structured_data=structured_data
+                            )
                             
                             extracted_data.append({
                                 "url": current_url,
@@ -354,15 +684,8 @@ def register_workflow_tools(mcp, browser_manager):
                                 "data": step_result
                             })
                         except Exception as e:
-                            logger.error(f"Error extracting structured data: {str(e)}")
-                            step_result = {
-                                "content": [
-                                    {
-                                        "type": "text", 
-                                        "text": f"Error extracting structured data: {str(e)}"
-                                    }
-                                ]
-                            }
+                            logger.error("Error extracting structured data: %s", e)
+                            step_result = _text_result(f"Error extracting structured data: {str(e)}")
                 
                 # Wait after interaction if specified
                 if wait_after > 0:
@@ -376,82 +699,50 @@ def register_workflow_tools(mcp, browser_manager):
                         "result": step_result
                     })
             
-            # Close the page when done
-            await page.close()
-            
-            logger.info(f"Workflow completed with {len(workflow_results)} steps and {len(extracted_data)} extracted data items")
-            return {
-                "content": [
-                    {
-                        "type": "text",
-                        "text": f"Completed web workflow with {len(workflow_results)} steps and extracted data from {len(extracted_data)} pages."
-                    }
-                ],
-                "workflow_results": workflow_results,
-                "extracted_data": extracted_data
-            }
+            logger.info("Workflow completed with %d steps and %d extracted data items", len(workflow_results), len(extracted_data))
+            return _text_result(
+                f"Completed web workflow with {len(workflow_results)} steps and extracted data from {len(extracted_data)} pages.",
+                page_id=page_id,
+                workflow_results=workflow_results,
+                extracted_data=extracted_data
+            )
         except Exception as e:
-            logger.error(f"Error running web workflow: {str(e)}")
-            return {
-                "content": [
-                    {
-                        "type": "text",
-                        "text": f"Error running web workflow: {str(e)}"
-                    }
-                ]
-            }
+            logger.error("Error running web workflow: %s", e)
+            return _text_result(f"Error running web workflow: {str(e)}", page_id=page_id)
+        finally:
+            # Close the page when done, including after errors
+            if managed_page:
+                await browser_manager.close_page(page_id)
+            elif page is not None:
+                await page.close()
     
-    # Helper function for element finding
-    def get_selectors_for_description(description):
-        """Generate a list of CSS selectors for an element description."""
-        description_lower = description.lower()
-        
-        # Common element types and their selectors
-        element_types = {
-            "button": ["button", "input[type='button']", "input[type='submit']", 
-                       "[role='button']", "a.btn", ".button", ".btn"],
-            "link": ["a", "[role='link']"],
-            "input": ["input[type='text']", "input:not([type='button']):not([type='submit'])", 
-                      "textarea", "[contenteditable='true']"],
-            "search": ["input[type='search']", "input[placeholder*='search' i]", 
-                       "input[name*='search' i]", "input[aria-label*='search' i]"],
-            "menu": ["nav", "[role='navigation']", "ul.menu", ".navigation"],
-            "article": ["article", ".article", ".post", "main", "[role='main']", ".content"],
-            "image": ["img", "[role='img']", "svg", "figure"]
-        }
-        
-        selectors = []
+    async def _run_parallel_workflow(urls, actions, data_extraction):
+        """Run the action list against each URL on its own page and merge the results."""
+        semaphore = asyncio.Semaphore(WORKFLOW_PARALLEL_PAGES)
         
-        # Add type-based selectors
-        for elem_type, elem_selectors in element_types.items():
-            if elem_type in description_lower:
-                selectors.extend(elem_selectors)
-        
-        # Add selectors for other keywords in the description
-        keywords = description_lower.split()
-        for keyword in keywords:
-            # Text selectors
-            selectors.append(f"*:text-matches('{keyword}', 'i')")
-            selectors.append(f"*[text*='{keyword}' i]")
-            
-            # Attribute selectors
-            selectors.append(f"[aria-label*='{keyword}' i]")
-            selectors.append(f"[placeholder*='{keyword}' i]")
-            selectors.append(f"[title*='{keyword}' i]")
-            selectors.append(f"[alt*='{keyword}' i]")
-            selectors.append(f"[name*='{keyword}' i]")
+        async def run_single_url(url):
+            async with semaphore:
+                return await run_web_workflow([url], actions, data_extraction)
         
-        # Add selectors for ID or class that might match
-        for keyword in keywords:
-            selectors.append(f"#{keyword}")
-            selectors.append(f".{keyword}")
-            selectors.append(f"[id*='{keyword}']")
-            selectors.append(f"[class*='{keyword}']")
+        url_results = await asyncio.gather(*(run_single_url(url) for url in urls))
         
-        # Add the most generic selector that might catch visible text
-        selectors.append("body")
+        workflow_results = []
+        extracted_data = []
+        for i, (url, url_result) in enumerate(zip(urls, url_results)):
+            workflow_results.append({
+                "step": f"url_{i+1}",
+                "url": url,
+                "page_id": url_result.get("page_id"),
+                "result": url_result
+            })
+            extracted_data.extend(url_result.get("extracted_data", []))
         
-        return selectors
+        logger.info("Parallel workflow completed for %d URLs with %d extracted data items", len(urls), len(extracted_data))
+        return _text_result(
+            f"Completed web workflow on {len(urls)} URLs in parallel and extracted data from {len(extracted_data)} pages.",
+            workflow_results=workflow_results,
+            extracted_data=extracted_data
+        )
     
     logger.info("Workflow tools registered")
     return {